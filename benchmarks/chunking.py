@@ -0,0 +1,74 @@
+"""
+Chunking benchmark: fixed 1200/200 character windows (clean_text + chunk_text)
+vs the sentence-aware, token-budgeted chunk_document.
+
+Uses the cached pages under data/cache as sample text, repeated up to the
+requested size. No network or Ollama needed.
+
+Run:
+    python benchmarks/chunking.py --megabytes 8
+"""
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import trafilatura
+import typer
+from rich.console import Console
+from rich.table import Table
+from src.utils.config import settings
+from src.utils.text import chunk_document, chunk_text, clean_text, token_budget
+
+app = typer.Typer(add_completion=False)
+console = Console()
+
+
+def sample_text(megabytes: float) -> str:
+    pages = []
+    for path in sorted(Path(settings.cache_dir).glob("*.html")):
+        text = trafilatura.extract(path.read_bytes(), include_comments=False, include_tables=False)
+        if text:
+            pages.append(text)
+    if not pages:
+        raise typer.Exit("No cached pages found in data/cache.")
+    base = "\n\n".join(pages)
+    return "\n\n".join([base] * max(1, int(megabytes * 1024 * 1024 / len(base))))
+
+
+def measure(fn, text: str, repeat: int) -> tuple[list[str], float]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chunks = fn(text)
+        best = min(best, time.perf_counter() - start)
+    return chunks, best
+
+
+@app.command()
+def main(megabytes: float = 8.0, repeat: int = 3, overlap_tokens: int = settings.chunk_overlap_tokens):
+    text = sample_text(megabytes)
+    size_mb = len(text) / (1024 * 1024)
+    budget = token_budget(settings.emb_model, settings.chunk_tokens)
+
+    table = Table(title=f"Chunking {size_mb:.1f} MB ({settings.emb_model}, {budget}-token budget)")
+    for col in ("Chunker", "Chunks", "Embedded chars / source", "Seconds", "MB/s"):
+        table.add_column(col, justify="right" if col != "Chunker" else "left")
+
+    runs = [
+        ("clean_text + chunk_text", lambda t: chunk_text(clean_text(t))),
+        (f"chunk_document (overlap={overlap_tokens})", lambda t: chunk_document(t, budget, overlap_tokens)),
+    ]
+    cleaned_len = len(clean_text(text))
+    for name, fn in runs:
+        chunks, secs = measure(fn, text, repeat)
+        ratio = sum(len(c) for c in chunks) / cleaned_len
+        table.add_row(name, str(len(chunks)), f"{ratio:.2f}", f"{secs:.3f}", f"{size_mb / secs:.1f}")
+    console.print(table)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,265 @@
+"""
+Local stand-in for the Ollama HTTP API, for benchmarks and offline runs.
+
+Implements /api/tags, /api/embeddings, /api/embed and /api/generate (NDJSON
+streaming or not). Embeddings are deterministic hashed bag-of-words vectors,
+so texts sharing words are close and repeated runs give identical results.
+Generation returns a canned report built from the TITLE/URL lines of the
+prompt. Latency is configurable per request, per embedded text and per token.
+
+Run standalone and point OLLAMA_HOST at it:
+    python benchmarks/fake_ollama.py --port 11435 --embed-latency 0.02 --tokens-per-s 150
+"""
+import json
+import math
+import re
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import typer
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def fake_embedding(text: str, dim: int = 768) -> list[float]:
+    """Feature-hashed, L2-normalized word counts; stable across processes."""
+    vec = [0.0] * dim
+    for word, count in Counter(_WORD_RE.findall(text.lower())).items():
+        h = zlib.crc32(word.encode("utf-8"))
+        vec[h % dim] += count if (h >> 31) & 1 else -count
+    norm = math.sqrt(sum(v * v for v in vec))
+    if not norm:
+        vec[0], norm = 1.0, 1.0
+    return [v / norm for v in vec]
+
+
+def fake_report(prompt: str) -> str:
+    """Report-shaped answer citing the passages in the prompt."""
+    titles = re.findall(r"^TITLE: (.*)$", prompt, re.M)
+    urls = re.findall(r"^URL: (.*)$", prompt, re.M)
+    if prompt.rstrip().endswith("Bullet points:"):
+        return "\n".join(f"- {t} ({u})" for t, u in zip(titles, urls)) or "- No relevant findings."
+
+    query = re.search(r'User Query:\s*"(.*)"', prompt)
+    body = {
+        "query": query.group(1) if query else "",
+        "date_utc": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "key_findings": titles[:5],
+        "evidence": [{"title": t, "url": u, "published": None, "support": t} for t, u in zip(titles, urls)][:5],
+        "limitations": ["Generated by the local fake Ollama server."],
+    }
+    bullets = "\n".join(f"- [{t}]({u})" for t, u in zip(titles, urls)) or "- No passages."
+    return f"```json\n{json.dumps(body, indent=2)}\n```\n\n## Summary\n\n{bullets}\n"
+
+
+class FakeOllama:
+    """
+    Threaded fake Ollama server. Use as a context manager or call start()/stop().
+
+    Args:
+        port: 0 picks a free port; see `url` once started.
+        embed_latency: Seconds added to every embedding request.
+        embed_per_text: Extra seconds per text in an embedding request.
+        generate_ttft: Seconds before the first generated token.
+        tokens_per_s: Generation speed; 0 streams without delay.
+        dim: Embedding dimension.
+        batch_endpoint: False answers /api/embed with 404, like Ollama < 0.2.
+        models: Names listed by /api/tags.
+        fail_first: Answer the first N POST requests with 503, to exercise retries.
+        drop_stream_after: Close the connection after N streamed tokens (0 = never),
+            like Ollama crashing mid-generation.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        embed_latency: float = 0.0,
+        embed_per_text: float = 0.0,
+        generate_ttft: float = 0.0,
+        tokens_per_s: float = 0.0,
+        dim: int = 768,
+        batch_endpoint: bool = True,
+        models: tuple[str, ...] = ("gemma3:270m", "nomic-embed-text:latest"),
+        fail_first: int = 0,
+        drop_stream_after: int = 0,
+    ):
+        self.embed_latency = embed_latency
+        self.embed_per_text = embed_per_text
+        self.generate_ttft = generate_ttft
+        self.tokens_per_s = tokens_per_s
+        self.dim = dim
+        self.batch_endpoint = batch_endpoint
+        self.models = models
+        self.fail_first = fail_first
+        self.drop_stream_after = drop_stream_after
+        self.requests: Counter = Counter()
+        # Last request body per endpoint
+        self.bodies: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeOllama":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serves on the calling thread until interrupted."""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeOllama":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def count(self, endpoint: str):
+        with self._lock:
+            self.requests[endpoint] += 1
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                fake.count(self.path)
+                if self.path == "/api/tags":
+                    self._json({"models": [{"name": m, "model": m} for m in fake.models]})
+                else:
+                    self._json({"error": "not found"}, 404)
+
+            def do_POST(self):
+                fake.count(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                with fake._lock:
+                    fake.bodies[self.path] = body
+                    failing = fake.fail_first > 0
+                    fake.fail_first -= failing
+                if failing:
+                    self._json({"error": "server busy"}, 503)
+                    return
+                if self.path == "/api/embeddings":
+                    time.sleep(fake.embed_latency + fake.embed_per_text)
+                    self._json({"embedding": fake_embedding(body.get("prompt", ""), fake.dim)})
+                elif self.path == "/api/embed" and fake.batch_endpoint:
+                    texts = body.get("input", [])
+                    texts = [texts] if isinstance(texts, str) else texts
+                    time.sleep(fake.embed_latency + fake.embed_per_text * len(texts))
+                    self._json({
+                        "model": body.get("model"),
+                        "embeddings": [fake_embedding(t, fake.dim) for t in texts],
+                    })
+                elif self.path == "/api/generate":
+                    self._generate(body)
+                else:
+                    self._json({"error": "404 page not found"}, 404)
+
+            def _generate(self, body: dict):
+                start = time.perf_counter()
+                text = fake_report(body.get("prompt", ""))
+                tokens = re.findall(r"\S+\s*|\s+", text)
+                time.sleep(fake.generate_ttft)
+                delay = 1.0 / fake.tokens_per_s if fake.tokens_per_s > 0 else 0.0
+                done = {
+                    "model": body.get("model"),
+                    "done": True,
+                    "prompt_eval_count": len(body.get("prompt", "")) // 4,
+                    "eval_count": len(tokens),
+                }
+                if not body.get("stream", True):
+                    time.sleep(delay * len(tokens))
+                    done["eval_duration"] = int((time.perf_counter() - start) * 1e9)
+                    done["total_duration"] = done["eval_duration"]
+                    self._json({**done, "response": text})
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for n, tok in enumerate(tokens):
+                    if fake.drop_stream_after and n >= fake.drop_stream_after:
+                        # No terminating chunk: the client sees a truncated body
+                        self.close_connection = True
+                        return
+                    if delay:
+                        time.sleep(delay)
+                    self._chunk({"model": body.get("model"), "response": tok, "done": False})
+                done["eval_duration"] = int((time.perf_counter() - start) * 1e9)
+                done["total_duration"] = done["eval_duration"]
+                self._chunk({**done, "response": ""})
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _chunk(self, obj: dict):
+                data = (json.dumps(obj) + "\n").encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+            def _json(self, obj: dict, status: int = 200):
+                data = json.dumps(obj).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+app = typer.Typer(add_completion=False)
+
+
+@app.command()
+def main(
+    host: str = "127.0.0.1",
+    port: int = 11435,
+    embed_latency: float = 0.0,
+    embed_per_text: float = 0.0,
+    generate_ttft: float = 0.0,
+    tokens_per_s: float = 0.0,
+    dim: int = 768,
+    batch_endpoint: bool = True,
+):
+    fake = FakeOllama(
+        host, port, embed_latency, embed_per_text, generate_ttft, tokens_per_s, dim, batch_endpoint
+    )
+    typer.echo(f"Fake Ollama listening on {fake.url} (Ctrl+C to stop)")
+    try:
+        fake.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    app()
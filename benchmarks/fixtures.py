@@ -0,0 +1,381 @@
+"""
+Recorded source fixtures and a local server that replays them.
+
+Fixtures are built from the sample report in data/samples (arXiv entries and
+RSS items) and the cached pages in data/cache (Crossref works whose URLs
+resolve to those pages). The server answers the arXiv Atom API, the Crossref
+works API, an RSS feed, the linked HTML pages and small PDFs for the arXiv
+entries, so the whole pipeline can run without internet access. Publication
+dates are re-stamped relative to now so `days` filters keep the items.
+
+Point the connectors at a running server:
+    python benchmarks/fixtures.py --port 8765 --scale 4
+    ARXIV_API_URL=http://127.0.0.1:8765/arxiv/query \\
+    CROSSREF_API_URL=http://127.0.0.1:8765/crossref/works python src/main.py report "..."
+
+Dump the recorded responses for inspection:
+    python benchmarks/fixtures.py --dump data/fixtures
+"""
+import json
+import re
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape, quoteattr
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import typer
+
+SAMPLES_DIR = PROJECT_ROOT / "data" / "samples"
+PAGES_DIR = PROJECT_ROOT / "data" / "cache"
+RSS_PATH = "/rss.xml"
+
+
+def _load_samples() -> list[dict]:
+    """Sample reports, with the ```json fence some of them are saved with removed."""
+    reports = []
+    for path in sorted(SAMPLES_DIR.glob("*.json")):
+        text = re.sub(r"^```json\s*|\s*```\s*$", "", path.read_text(encoding="utf-8").strip())
+        reports.append(json.loads(text))
+    return reports
+
+
+def _page_title(html: str, fallback: str) -> str:
+    m = re.search(r'citation_title" content="([^"]+)', html) or re.search(r"<title>\s*([^<]+?)\s*</title>", html)
+    return m.group(1) if m else fallback
+
+
+def _html(title: str, text: str) -> bytes:
+    paragraphs = "".join(f"<p>{escape(p)}</p>" for p in text.split("\n\n"))
+    return (
+        f"<html><head><title>{escape(title)}</title></head>"
+        f"<body><article><h1>{escape(title)}</h1>{paragraphs}</article></body></html>"
+    ).encode("utf-8")
+
+
+def _pdf_escape(text: str) -> str:
+    return text.encode("latin-1", "replace").decode("latin-1").replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def minimal_pdf(pages: list[str], line_chars: int = 90) -> bytes:
+    """A small valid PDF with one Helvetica text page per string (enough for pypdf to extract)."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        words, lines, cur = text.split(), [], ""
+        for w in words:
+            if cur and len(cur) + len(w) + 1 > line_chars:
+                lines.append(cur)
+                cur = ""
+            cur = f"{cur} {w}" if cur else w
+        lines.append(cur)
+        ops = "BT /F1 10 Tf 12 TL 40 800 Td " + " ".join(f"({_pdf_escape(l)}) Tj T*" for l in lines) + " ET"
+        content = ops.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects)
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join(f"{k} 0 R" for k in kids).encode(), len(kids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (i, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % o for o in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def build_fixtures(base_url: str, scale: int = 1, now: datetime | None = None) -> dict:
+    """
+    Builds the recorded responses for a server at `base_url`.
+
+    `scale` repeats every item under distinct ids/URLs to grow the corpus.
+
+    Returns:
+        dict: {"arxiv": [entry], "crossref": [work], "rss": [item], "pages": {path: bytes},
+               "pdfs": {path: bytes}}
+    """
+    now = now or datetime.now(timezone.utc).replace(microsecond=0)
+    reports = _load_samples()
+    pages: dict[str, bytes] = {}
+    pdfs: dict[str, bytes] = {}
+    arxiv, crossref, rss = [], [], []
+
+    for copy in range(max(1, scale)):
+        suffix = f" ({copy + 1})" if copy else ""
+
+        for r_idx, report in enumerate(reports):
+            context = " ".join(report.get("key_findings", []) + report.get("limitations", []))
+            seen = set()
+            for e_idx, ev in enumerate(report.get("evidence", [])):
+                if ev["title"] in seen:
+                    continue
+                seen.add(ev["title"])
+                n = len(arxiv)
+                abs_id = f"{copy:02d}{r_idx:02d}.{e_idx:05d}"
+                title = ev["title"] + suffix
+                abstract = f"{title}. {ev.get('support', '')}. {context} " f"This work studies {report['query']}."
+                published = (now - timedelta(hours=6 * n + 1)).isoformat().replace("+00:00", "Z")
+                arxiv.append({
+                    "id": f"{base_url}/abs/{abs_id}",
+                    "pdf": f"{base_url}/pdf/{abs_id}",
+                    "title": title,
+                    "summary": abstract,
+                    "published": published,
+                })
+                pages[f"/abs/{abs_id}"] = _html(title, abstract)
+                pdfs[f"/pdf/{abs_id}"] = minimal_pdf([
+                    f"{title}. Abstract. {abstract}",
+                    f"Method. {ev.get('support', '')}. {context}",
+                    f"Limitations and discussion. {' '.join(report.get('limitations', []))}",
+                ])
+
+                rss_path = f"/rss/{abs_id}"
+                rss.append({
+                    "title": f"Blog: {title}",
+                    "link": base_url + rss_path,
+                    "summary": ev.get("support", ""),
+                    "published": now - timedelta(hours=6 * n + 2),
+                })
+                pages[rss_path] = _html(f"Blog: {title}", f"{abstract}\n\n{context}")
+
+        for p_idx, path in enumerate(sorted(PAGES_DIR.glob("*.html"))):
+            html = path.read_bytes()
+            doi = path.stem.replace("https_doi.org_", "").replace("_", "/", 1)
+            page_path = f"/pages/{copy}/{path.name}"
+            pages[page_path] = html
+            created = now - timedelta(days=1 + p_idx + copy * len(arxiv))
+            crossref.append({
+                "DOI": f"{doi}{'.' + str(copy) if copy else ''}",
+                "title": [_page_title(html.decode("utf-8", "ignore"), doi) + suffix],
+                "URL": base_url + page_path,
+                "type": "journal-article",
+                "created": {"date-time": created.isoformat().replace("+00:00", "Z")},
+                "published-online": {"date-parts": [[created.year, created.month, created.day]]},
+            })
+
+    return {"arxiv": arxiv, "crossref": crossref, "rss": rss, "pages": pages, "pdfs": pdfs}
+
+
+def arxiv_atom(entries: list[dict], start: int, max_results: int) -> bytes:
+    page = entries[start:start + max_results]
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<feed xmlns="http://www.w3.org/2005/Atom" '
+        'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/" '
+        'xmlns:arxiv="http://arxiv.org/schemas/atom">',
+        "<title>ArXiv Query (fixture)</title>",
+        f"<opensearch:totalResults>{len(entries)}</opensearch:totalResults>",
+        f"<opensearch:startIndex>{start}</opensearch:startIndex>",
+        f"<opensearch:itemsPerPage>{max_results}</opensearch:itemsPerPage>",
+    ]
+    for e in page:
+        parts.append(
+            f"<entry><id>{escape(e['id'])}</id>"
+            f"<updated>{e['published']}</updated><published>{e['published']}</published>"
+            f"<title>{escape(e['title'])}</title><summary>{escape(e['summary'])}</summary>"
+            "<author><name>Fixture Author</name></author>"
+            f'<link href={quoteattr(e["id"])} rel="alternate" type="text/html"/>'
+            f'<link title="pdf" href={quoteattr(e["pdf"])} rel="related" type="application/pdf"/>'
+            '<arxiv:primary_category term="cs.LG" scheme="http://arxiv.org/schemas/atom"/>'
+            '<category term="cs.LG" scheme="http://arxiv.org/schemas/atom"/></entry>'
+        )
+    parts.append("</feed>")
+    return "\n".join(parts).encode("utf-8")
+
+
+def rss_xml(items: list[dict]) -> bytes:
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>', '<rss version="2.0"><channel>', "<title>Fixture feed</title>"]
+    for it in items:
+        parts.append(
+            f"<item><title>{escape(it['title'])}</title><link>{escape(it['link'])}</link>"
+            f"<guid>{escape(it['link'])}</guid><description>{escape(it['summary'])}</description>"
+            f"<pubDate>{it['published'].strftime('%a, %d %b %Y %H:%M:%S +0000')}</pubDate></item>"
+        )
+    parts.append("</channel></rss>")
+    return "\n".join(parts).encode("utf-8")
+
+
+class FixtureServer:
+    """
+    Threaded server replaying the fixtures. Use as a context manager or call
+    start()/stop(); `arxiv_url`, `crossref_url` and `rss_url` are the endpoints
+    to configure. Pages honour If-None-Match so cache revalidation is exercised.
+
+    `page_delay` maps a hostname the server is reached by (e.g. "localhost"
+    vs "127.0.0.1") to seconds added to each page response, so one server can
+    stand in for slow and fast hosts; `max_in_flight` records the most page
+    requests seen at once per hostname.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, scale: int = 1, page_delay: dict | None = None):
+        self.requests: Counter = Counter()
+        self.page_delay = dict(page_delay or {})
+        self.max_in_flight: Counter = Counter()
+        self._in_flight: Counter = Counter()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self.fixtures = build_fixtures(self.url, scale)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def arxiv_url(self) -> str:
+        return f"{self.url}/arxiv/query"
+
+    @property
+    def crossref_url(self) -> str:
+        return f"{self.url}/crossref/works"
+
+    @property
+    def rss_url(self) -> str:
+        return self.url + RSS_PATH
+
+    def start(self) -> "FixtureServer":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def serve_forever(self):
+        """Serves on the calling thread until interrupted."""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def dump(self, out_dir: Path):
+        """Writes the recorded responses (first page of each API) to `out_dir`."""
+        out_dir.mkdir(parents=True, exist_ok=True)
+        fx = self.fixtures
+        (out_dir / "arxiv.atom").write_bytes(arxiv_atom(fx["arxiv"], 0, len(fx["arxiv"])))
+        (out_dir / "crossref.json").write_text(json.dumps(self._crossref(len(fx["crossref"])), indent=2))
+        (out_dir / "rss.xml").write_bytes(rss_xml(fx["rss"]))
+        for path, body in {**fx["pages"], **{p + ".pdf": b for p, b in fx["pdfs"].items()}}.items():
+            target = out_dir / path.lstrip("/")
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(body)
+
+    def _crossref(self, rows: int, cursor: str | None = None, select: str | None = None) -> dict:
+        """A works page; cursors are opaque "c<offset>" tokens, `select` projects fields."""
+        items = self.fixtures["crossref"]
+        offset = int(cursor[1:]) if cursor and cursor.startswith("c") else 0
+        page = items[offset:offset + rows]
+        if select:
+            fields = select.split(",")
+            page = [{k: v for k, v in it.items() if k in fields} for it in page]
+        message = {"total-results": len(items), "items": page}
+        if cursor:
+            message["next-cursor"] = f"c{offset + len(page)}"
+        return {"status": "ok", "message-type": "work-list", "message": message}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                qs = {k: v[0] for k, v in parse_qs(url.query).items()}
+                with server._lock:
+                    server.requests[url.path.split("/")[1]] += 1
+                fx = server.fixtures
+
+                if url.path == "/arxiv/query":
+                    start, rows = int(qs.get("start", 0)), int(qs.get("max_results", 10))
+                    self._send(arxiv_atom(fx["arxiv"], start, rows), "application/atom+xml")
+                elif url.path == "/crossref/works":
+                    rows = int(qs.get("rows", 20))
+                    body = server._crossref(rows, qs.get("cursor"), qs.get("select"))
+                    self._send(json.dumps(body).encode("utf-8"), "application/json")
+                elif url.path == RSS_PATH:
+                    self._send(rss_xml(fx["rss"]), "application/rss+xml")
+                elif url.path in fx["pdfs"]:
+                    self._send(fx["pdfs"][url.path], "application/pdf")
+                elif url.path in fx["pages"]:
+                    host = (self.headers.get("Host") or "").rsplit(":", 1)[0]
+                    with server._lock:
+                        server._in_flight[host] += 1
+                        server.max_in_flight[host] = max(server.max_in_flight[host], server._in_flight[host])
+                    try:
+                        time.sleep(server.page_delay.get(host, 0.0))
+                    finally:
+                        with server._lock:
+                            server._in_flight[host] -= 1
+                    body = fx["pages"][url.path]
+                    etag = f'"{zlib.crc32(body):08x}"'
+                    if self.headers.get("If-None-Match") == etag:
+                        self.send_response(304)
+                        self.send_header("ETag", etag)
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                    else:
+                        self._send(body, "text/html; charset=utf-8", {"ETag": etag})
+                else:
+                    self._send(b"not found", "text/plain", status=404)
+
+            def _send(self, body: bytes, ctype: str, headers: dict | None = None, status: int = 200):
+                self.send_response(status)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+app = typer.Typer(add_completion=False)
+
+
+@app.command()
+def main(host: str = "127.0.0.1", port: int = 8765, scale: int = 1, dump: Path | None = None):
+    server = FixtureServer(host, port, scale)
+    if dump:
+        server.dump(dump)
+        typer.echo(f"Wrote fixtures to {dump}")
+        return
+    typer.echo(f"Fixture sources on {server.url}")
+    typer.echo(f"  ARXIV_API_URL={server.arxiv_url}")
+    typer.echo(f"  CROSSREF_API_URL={server.crossref_url}")
+    typer.echo(f"  RSS feed: {server.rss_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    app()
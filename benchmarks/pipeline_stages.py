@@ -0,0 +1,254 @@
+"""
+Stage benchmark for Orchestrator.run against local stand-ins.
+
+Starts the fake Ollama server and the fixture source server, points every
+setting at them and at a throwaway data directory, then times each pipeline
+stage: harvest, scrape, pdf (with --pdf), chunk, embed, upsert, query and summarize. Times are
+exclusive (embedding inside an upsert counts as embed, not upsert). The first
+run is cold; later runs skip harvesting via the harvest log (or hit the
+connector, page, embedding and manifest caches with --no-harvest-log) and are
+reported as the warm median. The report cache is disabled.
+
+Results are written as JSON; pass a previous file as --baseline to compare and
+--max-regression to fail on slowdowns.
+
+Run:
+    python benchmarks/pipeline_stages.py --scale 4 --runs 3 --embed-latency 0.01 --tokens-per-s 200
+    python benchmarks/pipeline_stages.py --baseline benchmarks/results/<previous>.json --max-regression 0.25
+"""
+import functools
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import typer
+from rich.console import Console
+from rich.table import Table
+from benchmarks.fake_ollama import FakeOllama
+from benchmarks.fixtures import FixtureServer
+
+app = typer.Typer(add_completion=False)
+console = Console()
+
+STAGES = ("harvest", "scrape", "pdf", "chunk", "embed", "upsert", "query", "summarize")
+# Stages faster than this are too noisy to flag as regressions
+MIN_COMPARABLE_S = 0.05
+
+
+class StageTimer:
+    """Accumulates exclusive wall time per stage across wrapped callables."""
+
+    def __init__(self):
+        self.totals: dict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def wrap(self, stage: str, fn):
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            stack = self._local.__dict__.setdefault("stack", [])
+            stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                nested = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+                with self._lock:
+                    self.totals[stage] += elapsed - nested
+
+        return timed
+
+    def wrap_iter(self, stage: str, fn):
+        """Like `wrap` for a generator function: each step of the returned iterator is timed."""
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            it = self.wrap(stage, fn)(*args, **kwargs)
+            step = self.wrap(stage, next)
+            while True:
+                try:
+                    yield step(it)
+                except StopIteration:
+                    return
+
+        return timed
+
+    def take(self) -> dict[str, float]:
+        with self._lock:
+            totals = {s: round(self.totals.get(s, 0.0), 4) for s in STAGES}
+            self.totals.clear()
+        return totals
+
+
+def configure(workdir: Path, ollama: FakeOllama, sources: FixtureServer):
+    """Settings are read from the environment at import, so this runs before importing src."""
+    os.environ.update({
+        "OLLAMA_HOST": ollama.url,
+        "ARXIV_API_URL": sources.arxiv_url,
+        "CROSSREF_API_URL": sources.crossref_url,
+        "DATA_DIR": str(workdir),
+        "CACHE_DIR": str(workdir / "cache"),
+        "CHROMA_DIR": str(workdir / "chroma"),
+        "COMPACT_DIR": str(workdir / "compact"),
+        "EMB_CACHE_PATH": str(workdir / "embeddings.sqlite3"),
+        "MANIFEST_PATH": str(workdir / "manifest.sqlite3"),
+        "BM25_PATH": str(workdir / "bm25.sqlite3"),
+        "RESPONSE_CACHE_PATH": str(workdir / "responses.sqlite3"),
+        "HARVEST_LOG_PATH": str(workdir / "harvests.sqlite3"),
+        "REPORT_CACHE_ENABLED": "false",
+        "SCRAPE_HOST_INTERVAL": "0",
+        "SCRAPE_HOST_CONCURRENCY": "8",
+    })
+
+
+def instrument(orch, timer: StageTimer):
+    import src.agents.researcher as researcher_mod
+    import src.retrieval.indexer as indexer_mod
+
+    researcher_mod.scrape_many = timer.wrap("scrape", researcher_mod.scrape_many)
+    researcher_mod.fetch_pdfs = timer.wrap("pdf", researcher_mod.fetch_pdfs)
+    indexer_mod.chunk_document = timer.wrap("chunk", indexer_mod.chunk_document)
+    orch.researcher.harvest_stream = timer.wrap_iter("harvest", orch.researcher.harvest_stream)
+    orch.store.embed._embed = timer.wrap("embed", orch.store.embed._embed)
+    orch.store.upsert = timer.wrap("upsert", orch.store.upsert)
+    orch.indexer.lexical.upsert = timer.wrap("upsert", orch.indexer.lexical.upsert)
+    orch.indexer.search = timer.wrap("query", orch.indexer.search)
+    orch.summarizer.summarize = timer.wrap("summarize", orch.summarizer.summarize)
+
+
+def git_revision() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=10
+        )
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def fmt_delta(now: float, base: float | None) -> str:
+    if base is None:
+        return "-"
+    if base < MIN_COMPARABLE_S:
+        return f"{now - base:+.3f}s"
+    return f"{(now - base) / base:+.0%}"
+
+
+@app.command()
+def main(
+    query: str = "graph neural networks for recommender systems",
+    scale: int = 2,
+    runs: int = 3,
+    max_results: int = 20,
+    top_k: int = 10,
+    embed_latency: float = 0.005,
+    embed_per_text: float = 0.001,
+    generate_ttft: float = 0.1,
+    tokens_per_s: float = 0.0,
+    out: Path | None = None,
+    baseline: Path | None = None,
+    max_regression: float = 0.0,
+    harvest_log: bool = True,
+    pdf: bool = typer.Option(False, help="Also index the fixture PDFs (PDF_INGEST)."),
+):
+    workdir = Path(tempfile.mkdtemp(prefix="pra-bench-"))
+    ollama = FakeOllama(
+        embed_latency=embed_latency, embed_per_text=embed_per_text,
+        generate_ttft=generate_ttft, tokens_per_s=tokens_per_s,
+    ).start()
+    sources = FixtureServer(scale=scale).start()
+    configure(workdir, ollama, sources)
+    if not harvest_log:
+        os.environ["HARVEST_FRESH_HOURS"] = "0"
+    if pdf:
+        os.environ["PDF_INGEST"] = "true"
+
+    from src.agents.orchestrator import Orchestrator
+
+    orch = Orchestrator()
+    timer = StageTimer()
+    instrument(orch, timer)
+
+    results = []
+    for i in range(max(1, runs)):
+        start = time.perf_counter()
+        orch.run(query, max_results=max_results, top_k=top_k, rss_feeds=[sources.rss_url])
+        total = time.perf_counter() - start
+        stages = timer.take()
+        stages["other"] = round(total - sum(stages.values()), 4)
+        stages["total"] = round(total, 4)
+        results.append(stages)
+        console.print(f"Run {i + 1}/{runs} ({'cold' if i == 0 else 'warm'}): {total:.2f}s")
+
+    ollama.stop()
+    sources.stop()
+
+    cold = results[0]
+    warm = {s: round(statistics.median(r[s] for r in results[1:]), 4) for s in cold} if len(results) > 1 else {}
+    record = {
+        "benchmark": "pipeline_stages",
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "config": {
+            "query": query, "scale": scale, "runs": runs, "max_results": max_results, "top_k": top_k,
+            "embed_latency": embed_latency, "embed_per_text": embed_per_text,
+            "generate_ttft": generate_ttft, "tokens_per_s": tokens_per_s, "harvest_log": harvest_log, "pdf": pdf,
+        },
+        "requests": {"ollama": dict(ollama.requests), "sources": dict(sources.requests)},
+        "cold": cold,
+        "warm": warm,
+        "runs": results,
+    }
+
+    out = out or PROJECT_ROOT / "benchmarks" / "results" / f"pipeline_stages-{datetime.now():%Y%m%d-%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(record, indent=2))
+
+    base = json.loads(baseline.read_text()) if baseline else None
+    table = Table(title=f"Pipeline stages (scale={scale}, {runs} runs)")
+    table.add_column("Stage")
+    for col in ("Cold s", "Warm s") + (("Cold vs base", "Warm vs base") if base else ()):
+        table.add_column(col, justify="right")
+
+    regressions = []
+    for stage in (*STAGES, "other", "total"):
+        row = [stage, f"{cold[stage]:.3f}", f"{warm[stage]:.3f}" if warm else "-"]
+        if base:
+            for kind, current in (("cold", cold), ("warm", warm)):
+                prev = base.get(kind, {}).get(stage)
+                if stage not in current:
+                    row.append("-")
+                    continue
+                row.append(fmt_delta(current[stage], prev))
+                if (
+                    max_regression > 0 and prev is not None and prev >= MIN_COMPARABLE_S
+                    and current[stage] > prev * (1 + max_regression)
+                ):
+                    regressions.append(f"{kind} {stage}: {prev:.3f}s -> {current[stage]:.3f}s")
+        table.add_row(*row)
+    console.print(table)
+    console.print(f"Results written to {out}")
+
+    if regressions:
+        console.print("[bold red]Regressions over the allowed threshold:[/bold red]")
+        for line in regressions:
+            console.print(f"  {line}")
+        raise typer.Exit(1)
+
+
+if __name__ == "__main__":
+    app()
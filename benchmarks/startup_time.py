@@ -0,0 +1,119 @@
+"""
+Startup-time benchmark for the CLI and the API module.
+
+Runs each target in a fresh interpreter with `python -X importtime`, reports
+the median wall time over several runs and the slowest imports (cumulative),
+and fails when a target is over its budget. Nothing is fetched or written:
+the targets only parse arguments or import modules.
+
+Run:
+    python benchmarks/startup_time.py
+    python benchmarks/startup_time.py --runs 7 --top 15 --budget-scale 1.5
+"""
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+app = typer.Typer(add_completion=False)
+console = Console()
+
+# name -> (interpreter arguments, wall-time budget in ms)
+TARGETS = {
+    "cli --help": (["src/main.py", "--help"], 1000),
+    "cli search --help": (["src/main.py", "search", "--help"], 1000),
+    "cli report --help": (["src/main.py", "report", "--help"], 1000),
+    "import src.api.server": (["-c", "import src.api.server"], 1500),
+}
+
+_IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def run_once(args: list[str]) -> tuple[float, list[tuple[int, int, str]]]:
+    """Wall seconds and (self µs, cumulative µs, module) rows for one run."""
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, env=env,
+    )
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} exited with {proc.returncode}:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = _IMPORT_LINE.match(line)
+        if m:
+            rows.append((int(m.group(1)), int(m.group(2)), m.group(4)))
+    return wall, rows
+
+
+def top_level(rows: list[tuple[int, int, str]], top: int) -> list[tuple[str, float]]:
+    """Slowest top-level packages by cumulative import time (ms)."""
+    best: dict[str, int] = {}
+    for _, cumulative, module in rows:
+        root = module.split(".")[0] if not module.startswith("src.") else ".".join(module.split(".")[:3])
+        best[root] = max(best.get(root, 0), cumulative)
+    ranked = sorted(best.items(), key=lambda kv: kv[1], reverse=True)[:top]
+    return [(name, us / 1000) for name, us in ranked]
+
+
+@app.command()
+def main(
+    runs: int = 5,
+    top: int = 8,
+    budget_scale: float = typer.Option(1.0, help="Multiply every budget, e.g. for slow CI machines."),
+    target: list[str] = typer.Option(None, help="Only run these targets (repeatable)."),
+):
+    selected = {k: v for k, v in TARGETS.items() if not target or k in target}
+    # Warm the OS file cache and bytecode once so the runs are comparable
+    for args, _ in selected.values():
+        run_once(args)
+
+    summary = Table(title=f"Startup time ({runs} runs, median)")
+    summary.add_column("Target")
+    for col in ("Median ms", "Min ms", "Budget ms", "Status"):
+        summary.add_column(col, justify="right")
+
+    over = []
+    for name, (args, budget_ms) in selected.items():
+        walls, rows = [], []
+        for _ in range(max(1, runs)):
+            wall, rows = run_once(args)
+            walls.append(wall * 1000)
+        median = statistics.median(walls)
+        budget = budget_ms * budget_scale
+        ok = median <= budget
+        if not ok:
+            over.append(name)
+        summary.add_row(
+            name, f"{median:.0f}", f"{min(walls):.0f}", f"{budget:.0f}",
+            "[green]ok[/green]" if ok else "[bold red]over[/bold red]",
+        )
+
+        slowest = Table(title=f"Slowest imports: {name}")
+        slowest.add_column("Module")
+        slowest.add_column("Cumulative ms", justify="right")
+        for module, ms in top_level(rows, top):
+            slowest.add_row(module, f"{ms:.1f}")
+        console.print(slowest)
+
+    console.print(summary)
+    if over:
+        console.print(f"[bold red]Over budget:[/bold red] {', '.join(over)}")
+        raise typer.Exit(1)
+
+
+if __name__ == "__main__":
+    app()
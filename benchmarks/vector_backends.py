@@ -0,0 +1,159 @@
+"""
+Vector backend benchmark: Chroma vs the compact engine (float16 and int8).
+
+Builds a synthetic corpus of clustered unit vectors, loads it into each
+backend in a throwaway directory, then reports load throughput, cold open time
+(a fresh interpreter importing the backend and opening the collection), query
+latency, recall@k against exact float32 search, and size on disk.
+
+Run:
+    python benchmarks/vector_backends.py --n 20000 --dim 768 --queries 200
+    python benchmarks/vector_backends.py --backend compact-int8 --n 100000
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import numpy as np
+import typer
+from rich.console import Console
+from rich.table import Table
+
+app = typer.Typer(add_completion=False)
+console = Console()
+
+# name -> (VECTOR_BACKEND, COMPACT_DTYPE)
+VARIANTS = {
+    "chroma": ("chroma", "float16"),
+    "compact-float16": ("compact", "float16"),
+    "compact-int8": ("compact", "int8"),
+}
+
+_OPEN_SNIPPET = """
+import sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+from src.retrieval.vector_store import BACKENDS
+backend = BACKENDS[{backend!r}]("bench", None)
+backend.count()
+print(time.perf_counter() - start)
+"""
+
+
+def corpus(n: int, dim: int, clusters: int, seed: int = 0) -> np.ndarray:
+    """Unit vectors scattered around `clusters` centres, like topical embeddings."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    x = centres[rng.integers(0, clusters, n)] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+def dir_bytes(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def configure(workdir: Path, dtype: str):
+    os.environ.update({
+        "CHROMA_DIR": str(workdir / "chroma"),
+        "COMPACT_DIR": str(workdir / "compact"),
+        "COMPACT_DTYPE": dtype,
+        "DATA_DIR": str(workdir),
+        "CACHE_DIR": str(workdir / "cache"),
+    })
+
+
+def run_variant(name: str, vectors: np.ndarray, queries: np.ndarray, k: int, batch: int) -> dict:
+    backend_name, dtype = VARIANTS[name]
+    workdir = Path(tempfile.mkdtemp(prefix=f"pra-vec-{name}-"))
+    configure(workdir, dtype)
+    # Run in a child so settings are read with this variant's environment
+    script = f"""
+import json, sys, time
+import numpy as np
+sys.path.insert(0, {str(PROJECT_ROOT)!r})
+from src.retrieval.vector_store import BACKENDS
+vectors = np.load({str(workdir / "vectors.npy")!r})
+queries = np.load({str(workdir / "queries.npy")!r})
+backend = BACKENDS[{backend_name!r}]("bench", None)
+ids = [f"doc{{i}}::chunk::0" for i in range(len(vectors))]
+start = time.perf_counter()
+for i in range(0, len(vectors), {batch}):
+    backend.upsert(ids[i:i + {batch}], vectors[i:i + {batch}], ["passage %d" % j for j in range(i, min(i + {batch}, len(vectors)))],
+                   [{{"title": "t%d" % j}} for j in range(i, min(i + {batch}, len(vectors)))])
+load_s = time.perf_counter() - start
+backend.query(queries[0], {k})
+lat, found = [], []
+for q in queries:
+    t = time.perf_counter()
+    res = backend.query(q, {k})
+    lat.append(time.perf_counter() - t)
+    found.append([int(x.split("doc")[1].split("::")[0]) for x in res["ids"][0]])
+print(json.dumps({{"load_s": load_s, "latencies": lat, "found": found}}))
+"""
+    np.save(workdir / "vectors.npy", vectors)
+    np.save(workdir / "queries.npy", queries)
+    out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, env=os.environ.copy())
+    if out.returncode != 0:
+        raise RuntimeError(f"{name} failed:\n{out.stderr[-2000:]}")
+    import json
+
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    opens = []
+    for _ in range(3):
+        o = subprocess.run(
+            [sys.executable, "-c", _OPEN_SNIPPET.format(root=str(PROJECT_ROOT), backend=backend_name)],
+            capture_output=True, text=True, env=os.environ.copy(),
+        )
+        opens.append(float(o.stdout.strip().splitlines()[-1]))
+    store_dir = workdir / ("chroma" if backend_name == "chroma" else "compact")
+    result.update(open_s=statistics.median(opens), disk=dir_bytes(store_dir))
+    return result
+
+
+@app.command()
+def main(
+    n: int = 20000,
+    dim: int = 768,
+    clusters: int = 50,
+    queries: int = 100,
+    k: int = 10,
+    batch: int = 1000,
+    backend: list[str] = typer.Option(None, help="Variants to run (default: all)."),
+):
+    names = backend or list(VARIANTS)
+    vectors = corpus(n, dim, clusters)
+    qs = corpus(queries, dim, clusters, seed=1)
+    exact = np.argsort(-(qs @ vectors.T), axis=1)[:, :k]
+
+    table = Table(title=f"Vector backends ({n:,} x {dim}, k={k}, {queries} queries)")
+    table.add_column("Backend")
+    for col in ("Load rows/s", "Cold open ms", "Query p50 ms", "Query p95 ms", f"Recall@{k}", "Disk MB"):
+        table.add_column(col, justify="right")
+
+    for name in names:
+        console.print(f"Running {name}...")
+        r = run_variant(name, vectors, qs, k, batch)
+        lat = sorted(r["latencies"])
+        recall = np.mean([len(set(f) & set(e)) / k for f, e in zip(r["found"], exact.tolist())])
+        table.add_row(
+            name,
+            f"{n / r['load_s']:,.0f}",
+            f"{r['open_s'] * 1000:.0f}",
+            f"{statistics.median(lat) * 1000:.2f}",
+            f"{lat[int(0.95 * (len(lat) - 1))] * 1000:.2f}",
+            f"{recall:.3f}",
+            f"{r['disk'] / 1e6:.1f}",
+        )
+    console.print(table)
+
+
+if __name__ == "__main__":
+    app()
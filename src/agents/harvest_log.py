@@ -0,0 +1,142 @@
+import json
+import math
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+from src.retrieval.bm25 import tokenize
+
+DAY_S = 86400.0
+
+
+def query_terms(query: str) -> frozenset:
+    """Normalized term set used to match close queries (stopwords and plural "s" dropped)."""
+    return frozenset(t[:-1] if len(t) > 3 and t.endswith("s") and not t.endswith("ss") else t for t in tokenize(query))
+
+
+def _similarity(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 1.0 if a == b else 0.0
+    return len(a & b) / len(a | b)
+
+
+class HarvestLog:
+    """
+    Records which queries were harvested, over which window, when, and which
+    doc ids they produced, so a repeat request can be answered from the local
+    index (or with only the newly published items) instead of a full harvest.
+
+    Entries older than `max_age_s` (0 = never) are pruned on open and after
+    each record.
+    """
+
+    def __init__(self, path: str, fresh_s: float, min_similarity: float = 0.8, max_age_s: float = 0):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.fresh_s = fresh_s
+        self.min_similarity = min_similarity
+        self.max_age_s = max_age_s
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS harvests (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                query TEXT NOT NULL,
+                terms TEXT NOT NULL,
+                feeds TEXT NOT NULL,
+                days INTEGER NOT NULL,
+                max_results INTEGER NOT NULL,
+                harvested_at REAL NOT NULL,
+                doc_ids TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_harvests_time ON harvests(harvested_at)")
+        self._conn.commit()
+        self.prune()
+
+    def record(
+        self,
+        query: str,
+        days: int,
+        max_results: int,
+        rss_feeds: Sequence[str] | None,
+        doc_ids: Sequence[str],
+        harvested_at: float | None = None,
+    ):
+        """Logs a harvest covering the `days` before `harvested_at` (default now)."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO harvests (query, terms, feeds, days, max_results, harvested_at, doc_ids) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    " ".join(query.lower().split()),
+                    " ".join(sorted(query_terms(query))),
+                    json.dumps(sorted(rss_feeds or [])),
+                    days,
+                    max_results,
+                    time.time() if harvested_at is None else harvested_at,
+                    json.dumps(list(dict.fromkeys(doc_ids))),
+                ),
+            )
+            self._conn.commit()
+        self.prune()
+
+    def find(self, query: str, days: int, max_results: int, rss_feeds: Sequence[str] | None) -> Optional[Dict[str, Any]]:
+        """
+        Most recent harvest of a close-enough query (term overlap at least
+        `min_similarity`, same RSS feeds, at least as many results) whose
+        window reached back as far as the requested one; None if there is none.
+        """
+        now = time.time()
+        terms = query_terms(query)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT query, terms, days, max_results, harvested_at, doc_ids FROM harvests "
+                "WHERE feeds = ? AND max_results >= ? AND harvested_at >= ? ORDER BY harvested_at DESC",
+                (json.dumps(sorted(rss_feeds or [])), max_results, now - days * DAY_S),
+            ).fetchall()
+        for q, t, h_days, h_max, harvested_at, doc_ids in rows:
+            if harvested_at - h_days * DAY_S > now - days * DAY_S:
+                continue
+            similarity = _similarity(terms, frozenset(t.split()))
+            if similarity >= self.min_similarity:
+                return {
+                    "query": q,
+                    "similarity": similarity,
+                    "days": h_days,
+                    "max_results": h_max,
+                    "harvested_at": harvested_at,
+                    "age_s": now - harvested_at,
+                    "doc_ids": json.loads(doc_ids),
+                }
+        return None
+
+    def plan(self, query: str, days: int, max_results: int, rss_feeds: Sequence[str] | None) -> Dict[str, Any]:
+        """
+        Freshness policy for a request:
+            {"action": "skip"}                 a match is younger than `fresh_s`;
+            {"action": "delta", "days": n}     an older match exists, fetch the last n days;
+            {"action": "full", "days": days}   no usable match.
+        The matching log entry, if any, is included as "entry".
+        """
+        entry = self.find(query, days, max_results, rss_feeds)
+        if entry is None:
+            return {"action": "full", "days": days, "entry": None}
+        if entry["age_s"] < self.fresh_s:
+            return {"action": "skip", "days": 0, "entry": entry}
+        delta = min(days, max(1, math.ceil(entry["age_s"] / DAY_S)))
+        return {"action": "delta", "days": delta, "entry": entry}
+
+    def prune(self, max_age_s: float | None = None) -> int:
+        """Deletes entries older than `max_age_s` (default: the configured max age); returns how many."""
+        max_age_s = self.max_age_s if max_age_s is None else max_age_s
+        if max_age_s <= 0:
+            return 0
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM harvests WHERE harvested_at < ?", (time.time() - max_age_s,))
+            self._conn.commit()
+            return cur.rowcount
@@ -1,8 +1,17 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterator, List
 from src.retrieval.vector_store import VectorStore
 from src.retrieval.indexer import Indexer
-from src.agents.researcher import ResearcherAgent
+from src.agents.harvest_log import HarvestLog
+from src.agents.report_cache import ReportCache
+from src.agents.researcher import ResearcherAgent, dedupe, doc_id_for
 from src.agents.summarizer import SummarizerAgent
-from src.utils.logging import info
+from src.llm.ollama_client import get_ollama_client
+from src.utils.config import settings
+from src.utils.logging import info, warn
+from src.utils.metrics import observe, span
 
 
 class Orchestrator:
@@ -11,10 +20,30 @@ class Orchestrator:
     """
 
     def __init__(self):
+        if settings.ollama_warmup:
+            # Models load in the background while sources are harvested
+            get_ollama_client().warm_up()
         self.store = VectorStore("papers")
         self.indexer = Indexer(self.store)
         self.researcher = ResearcherAgent(self.indexer)
         self.summarizer = SummarizerAgent()
+        self.reports = (
+            ReportCache(settings.report_cache_path, ttl=settings.report_cache_ttl, swr=settings.report_cache_swr)
+            if settings.report_cache_enabled
+            else None
+        )
+        self.harvests = (
+            HarvestLog(
+                settings.harvest_log_path,
+                fresh_s=settings.harvest_fresh_hours * 3600,
+                min_similarity=settings.harvest_match_threshold,
+                max_age_s=settings.harvest_log_max_days * 86400,
+            )
+            if settings.harvest_fresh_hours > 0
+            else None
+        )
+        self._refreshes: List[threading.Thread] = []
+        self._refresh_lock = threading.Lock()
 
     def run(
         self,
@@ -22,7 +51,9 @@ class Orchestrator:
         max_results: int = 20,
         days: int = 365,
         top_k: int = 10,
-        rss_feeds: list[str] | None = None
+        rss_feeds: list[str] | None = None,
+        on_stage: Callable[[str], None] | None = None,
+        use_cache: bool = True,
     ) -> str:
         """
         Executes the end-to-end pipeline:
@@ -30,16 +61,304 @@ class Orchestrator:
         2. Indexes into Chroma
         3. Retrieves top-k relevant chunks
         4. Summarizes using LLM
+
+        A cached report for the same request is returned instead when available;
+        `use_cache=False` regenerates it and bypasses the connector cache too.
+        `on_stage`, when given, is called with each stage name as it starts.
         """
-        info(f"Running pipeline for: {query}")
+        stage = on_stage or (lambda name: None)
+        params = self._params(query, max_results, days, top_k, rss_feeds)
+        if use_cache:
+            cached = self._cached_report(params)
+            if cached is not None:
+                stage("cached")
+                return cached
+        with span("pipeline"):
+            return self._generate(params, stage, refresh=not use_cache)
+
+    def run_stream(
+        self,
+        query: str,
+        max_results: int = 20,
+        days: int = 365,
+        top_k: int = 10,
+        rss_feeds: list[str] | None = None,
+        stats: dict | None = None,
+        on_stage: Callable[[str], None] | None = None,
+        use_cache: bool = True,
+    ) -> Iterator[str]:
+        """
+        Same pipeline as `run`, but yields the report tokens as the LLM
+        produces them. `stats` receives generation timings when given.
+        A cached report is yielded in one piece.
+        """
+        stage = on_stage or (lambda name: None)
+        params = self._params(query, max_results, days, top_k, rss_feeds)
+        if use_cache:
+            cached = self._cached_report(params)
+            if cached is not None:
+                stage("cached")
+                yield cached
+                return
 
-        items = self.researcher.harvest(query, max_results=max_results, days=days, rss_feeds=rss_feeds)
-        self.researcher.ingest(items)
+        hits = self._retrieve(query, max_results, days, top_k, rss_feeds, stage, refresh=not use_cache)
 
-        info("Performing similarity retrieval...")
-        hits = self.indexer.search(query, k=top_k)
+        info("Summarizing results (streaming)...")
+        stage("summarize")
+        parts = []
+        with span("summarize"):
+            for token in self.summarizer.summarize_stream(query, hits, stats=stats):
+                parts.append(token)
+                yield token
+        self._store_report(params, "".join(parts))
+        info("Pipeline completed.")
+
+    def run_batch(
+        self,
+        queries: List[str],
+        max_results: int = 20,
+        days: int = 365,
+        top_k: int = 10,
+        rss_feeds: list[str] | None = None,
+        use_cache: bool = True,
+        concurrency: int | None = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Reports for many queries with shared work: every query is harvested
+        concurrently, items are deduplicated across the whole batch and ingested
+        once, all query strings are embedded in one call, and summaries run
+        `concurrency` (default BATCH_SUMMARIZE_CONCURRENCY) at a time.
+
+        Yields {"query", "report"} (or {"query", "error"}) as each report
+        finishes; cached reports come first.
+        """
+        queries = list(dict.fromkeys(q.strip() for q in queries if q and q.strip()))
+        todo = []
+        for query in queries:
+            params = self._params(query, max_results, days, top_k, rss_feeds)
+            cached = self._cached_report(params) if use_cache else None
+            if cached is not None:
+                yield {"query": query, "report": cached, "cached": True}
+            else:
+                todo.append(params)
+        if not todo:
+            return
+
+        with span("pipeline"):
+            self._harvest_batch([p["query"] for p in todo], max_results, days, rss_feeds, refresh=not use_cache)
+
+            info(f"Embedding {len(todo)} queries...")
+            try:
+                vectors = self.store.embed([p["query"] for p in todo])
+            except Exception as e:
+                # Retrieval falls back to the lexical index per query
+                warn(f"Query embedding failed ({e}); searching without precomputed vectors.")
+                vectors = [None] * len(todo)
+
+            def report(params: Dict[str, Any], vector) -> str:
+                with span("retrieve"):
+                    hits = self.indexer.search(
+                        params["query"], k=params["top_k"], embedding=vector, days=params["days"]
+                    )
+                with span("summarize"):
+                    text = self.summarizer.summarize(params["query"], hits)
+                self._store_report(params, text)
+                return text
+
+            workers = max(1, concurrency or settings.batch_summarize_concurrency)
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-report") as pool:
+                futures = {pool.submit(report, p, v): p["query"] for p, v in zip(todo, vectors)}
+                for fut in as_completed(futures):
+                    query = futures[fut]
+                    try:
+                        yield {"query": query, "report": fut.result(), "cached": False}
+                    except Exception as e:
+                        warn(f"Report for '{query}' failed: {e}")
+                        yield {"query": query, "error": str(e)}
+        info(f"Batch of {len(queries)} reports completed.")
+
+    def _harvest_batch(self, queries: List[str], max_results: int, days: int, rss_feeds, refresh: bool):
+        """Harvests queries concurrently (honouring the harvest log), then ingests the union once."""
+        plans = {q: self._harvest_plan(q, days, max_results, rss_feeds, refresh) for q in queries}
+        to_fetch = [q for q, plan in plans.items() if plan["action"] != "skip"]
+        info(f"Harvesting {len(to_fetch)} of {len(queries)} queries ({len(queries) - len(to_fetch)} fresh locally).")
+        if not to_fetch:
+            return
+
+        found: Dict[str, List[Dict[str, Any]]] = {}
+        with span("harvest"):
+            with ThreadPoolExecutor(
+                max_workers=max(1, min(settings.batch_harvest_concurrency, len(to_fetch))),
+                thread_name_prefix="batch-harvest",
+            ) as pool:
+                futures = {
+                    pool.submit(
+                        self.researcher.harvest, q, max_results=max_results, days=plans[q]["days"],
+                        rss_feeds=rss_feeds, refresh=refresh,
+                    ): q
+                    for q in to_fetch
+                }
+                for fut in as_completed(futures):
+                    try:
+                        found[futures[fut]] = fut.result()
+                    except Exception as e:
+                        warn(f"Harvest for '{futures[fut]}' failed: {e}")
+                        found[futures[fut]] = []
+
+        # Deduplicate across the whole batch
+        seen: set = set()
+        items = [item for q in to_fetch for item in dedupe(found[q], seen)]
+        total = sum(len(v) for v in found.values())
+        info(f"Batch harvest: {total} items, {len(items)} after cross-query dedup.")
+        with span("ingest"):
+            self.researcher.ingest(items)
+
+        if self.harvests is not None:
+            for q in to_fetch:
+                entry = plans[q]["entry"]
+                if found[q] or plans[q]["action"] == "delta":
+                    doc_ids = [doc_id_for(it) for it in found[q]] + (entry["doc_ids"] if entry else [])
+                    self.harvests.record(q, days, max_results, rss_feeds, doc_ids)
+
+    def _params(self, query, max_results, days, top_k, rss_feeds) -> Dict[str, Any]:
+        return {
+            "query": query,
+            "max_results": max_results,
+            "days": days,
+            "top_k": top_k,
+            "rss_feeds": rss_feeds,
+        }
+
+    def _harvest_plan(self, query, days, max_results, rss_feeds, refresh: bool) -> Dict[str, Any]:
+        """Freshness policy: skip, delta or full harvest (always full on refresh or when disabled)."""
+        if self.harvests is None or refresh:
+            return {"action": "full", "days": days, "entry": None}
+        return self.harvests.plan(query, days, max_results, rss_feeds)
+
+    def _cache_params(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {**params, "gen_model": self.summarizer.llm.model, "emb_model": self.store.embed.model}
+
+    def _cached_report(self, params: Dict[str, Any]) -> str | None:
+        if self.reports is None:
+            return None
+        key_params = self._cache_params(params)
+        entry = self.reports.get(key_params, self.indexer.corpus_version())
+        if entry is None:
+            return None
+        if entry["fresh"]:
+            info(f"Report cache hit ({entry['age_s']:.0f}s old).")
+        else:
+            info(f"Serving stale cached report ({entry['age_s']:.0f}s old); refreshing in background.")
+            if self.reports.try_begin_refresh(key_params):
+                thread = threading.Thread(target=self._refresh, args=(params,), daemon=True)
+                thread.start()
+                with self._refresh_lock:
+                    self._refreshes = [t for t in self._refreshes if t.is_alive()] + [thread]
+        return entry["report"]
+
+    def join_refreshes(self):
+        """
+        Waits for background refreshes of stale reports. Short-lived callers
+        (the CLI) call this before exiting so the revalidation is not killed.
+        """
+        with self._refresh_lock:
+            pending, self._refreshes = self._refreshes, []
+        if pending:
+            info(f"Waiting for {len(pending)} stale report refresh(es) to finish...")
+        for thread in pending:
+            thread.join()
+
+    def _refresh(self, params: Dict[str, Any]):
+        try:
+            self._generate(params, lambda name: None)
+        except Exception as e:
+            warn(f"Background report refresh failed: {e}")
+        finally:
+            self.reports.end_refresh(self._cache_params(params))
+
+    def _generate(self, params: Dict[str, Any], stage: Callable[[str], None], refresh: bool = False) -> str:
+        hits = self._retrieve(
+            params["query"], params["max_results"], params["days"], params["top_k"], params["rss_feeds"],
+            stage, refresh=refresh,
+        )
 
         info("Summarizing results...")
-        report = self.summarizer.summarize(query, hits)
+        stage("summarize")
+        with span("summarize"):
+            report = self.summarizer.summarize(params["query"], hits)
+        self._store_report(params, report)
         info("Pipeline completed.")
-        return report
\ No newline at end of file
+        return report
+
+    def _store_report(self, params: Dict[str, Any], report: str):
+        if self.reports is not None and report:
+            self.reports.put(self._cache_params(params), self.indexer.corpus_version(), report)
+
+    def _harvest_and_ingest(self, query, max_results, days, rss_feeds, refresh, stage) -> List[Dict[str, Any]]:
+        """
+        Ingests harvested batches as they arrive, so embedding overlaps with
+        fetching later pages. Only time spent waiting on sources counts as harvest.
+        """
+        batches = self.researcher.harvest_stream(
+            query, max_results=max_results, days=days, rss_feeds=rss_feeds, refresh=refresh
+        )
+        # Keyed like harvest_stream's dedup, so a replaced item drops out
+        items: Dict[str, Dict[str, Any]] = {}
+        waited = 0.0
+        while True:
+            started = time.perf_counter()
+            batch = next(batches, None)
+            waited += time.perf_counter() - started
+            if batch is None:
+                break
+            if not items:
+                stage("ingest")
+            items.update((it.get("url") or it.get("id"), it) for it in batch)
+            with span("ingest"):
+                self.researcher.ingest(batch)
+        observe("harvest", waited)
+        return list(items.values())
+
+    def _retrieve(
+        self,
+        query: str,
+        max_results: int,
+        days: int,
+        top_k: int,
+        rss_feeds: list[str] | None,
+        stage: Callable[[str], None],
+        refresh: bool = False,
+    ):
+        info(f"Running pipeline for: {query}")
+
+        plan = self._harvest_plan(query, days, max_results, rss_feeds, refresh)
+        entry = plan["entry"]
+        if plan["action"] == "skip":
+            info(
+                f"Local corpus is fresh: '{entry['query']}' was harvested {entry['age_s'] / 60:.0f} min ago; "
+                "skipping harvest."
+            )
+        else:
+            if plan["action"] == "delta":
+                info(
+                    f"'{entry['query']}' was harvested {entry['age_s'] / 3600:.1f}h ago; "
+                    f"fetching only the last {plan['days']} day(s)."
+                )
+            stage("harvest")
+            before = self.store.embed.cache_stats()
+            items = self._harvest_and_ingest(query, max_results, plan["days"], rss_feeds, refresh, stage)
+            after = self.store.embed.cache_stats()
+            if after:
+                # The cache is shared by the process: log only this run's lookups
+                hits, misses = after["hits"] - before["hits"], after["misses"] - before["misses"]
+                if hits + misses:
+                    info(f"Embedding cache: {hits} hits, {misses} misses (hit rate {hits / (hits + misses):.0%}).")
+            # An empty full harvest is not logged so a network outage doesn't mark a new topic fresh
+            if self.harvests is not None and (items or plan["action"] == "delta"):
+                doc_ids = [doc_id_for(it) for it in items] + (entry["doc_ids"] if entry else [])
+                self.harvests.record(query, days, max_results, rss_feeds, doc_ids)
+
+        info("Performing similarity retrieval...")
+        stage("retrieve")
+        with span("retrieve"):
+            return self.indexer.search(query, k=top_k, days=days)
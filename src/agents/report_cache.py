@@ -0,0 +1,110 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+def report_key(params: Dict[str, Any]) -> str:
+    """
+    Stable key for a report request: normalized query, options and model names.
+    The corpus version is tracked per entry rather than in the key, so a report
+    from an older corpus can still be served stale while it is regenerated.
+    """
+    normalized = dict(params)
+    normalized["query"] = " ".join(str(params.get("query", "")).lower().split())
+    if normalized.get("rss_feeds"):
+        normalized["rss_feeds"] = sorted(normalized["rss_feeds"])
+    blob = json.dumps(normalized, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ReportCache:
+    """
+    Persistent cache of generated reports.
+
+    An entry is fresh while it is younger than `ttl` and was built from the
+    current corpus version. Otherwise, when `swr` is positive and the entry is
+    younger than `ttl + swr`, it is returned as stale so the caller can serve it
+    and regenerate in the background (stale-while-revalidate). Everything else,
+    including any non-fresh entry with `swr` at 0, is a miss.
+    """
+
+    def __init__(self, path: str, ttl: float, swr: float = 0.0):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.swr = swr
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._refreshing: set[str] = set()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS reports (
+                key TEXT PRIMARY KEY,
+                params TEXT NOT NULL,
+                corpus_version INTEGER NOT NULL,
+                report TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, params: Dict[str, Any], corpus_version: int) -> Optional[Dict[str, Any]]:
+        """Returns {"report", "fresh", "age_s"} or None on a miss."""
+        key = report_key(params)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT report, corpus_version, created_at FROM reports WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        report, version, created_at = row
+        age = time.time() - created_at
+        if age < self.ttl and version == corpus_version:
+            self.hits += 1
+            return {"report": report, "fresh": True, "age_s": age}
+        if self.swr > 0 and age < self.ttl + self.swr:
+            self.stale_hits += 1
+            return {"report": report, "fresh": False, "age_s": age}
+        self.misses += 1
+        return None
+
+    def put(self, params: Dict[str, Any], corpus_version: int, report: str):
+        key = report_key(params)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO reports (key, params, corpus_version, report, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(params, default=str), corpus_version, report, time.time()),
+            )
+            # Entries past their stale window can never be served again
+            self._conn.execute(
+                "DELETE FROM reports WHERE created_at < ?", (time.time() - self.ttl - self.swr,)
+            )
+            self._conn.commit()
+
+    def try_begin_refresh(self, params: Dict[str, Any]) -> bool:
+        """Claims the background refresh for a key; False if one is already running."""
+        key = report_key(params)
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def end_refresh(self, params: Dict[str, Any]):
+        with self._lock:
+            self._refreshing.discard(report_key(params))
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "stale_hits": self.stale_hits, "misses": self.misses}
@@ -1,10 +1,38 @@
-from typing import List, Dict
-from src.connectors.arxiv_conn import search_arxiv
-from src.connectors.crossref_conn import search_crossref
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+from src.connectors.arxiv_conn import stream_arxiv
+from src.connectors.crossref_conn import stream_crossref
+from src.connectors.pdf_fetcher import fetch_pdfs
 from src.connectors.rss_conn import fetch_rss_feed
-from src.connectors.web_scraper import fetch_and_extract
+from src.connectors.web_scraper import scrape_many
 from src.retrieval.indexer import Indexer
+from src.utils.config import settings
 from src.utils.logging import info, warn
+from src.utils.metrics import observe, span
+
+
+def doc_id_for(item: Dict) -> str:
+    """Index id of a harvested item: its source id, else URL, else title."""
+    return (item.get("id") or item.get("url") or item.get("title"))[:128]
+
+
+def dedupe(items: Iterable[Dict], seen: set) -> List[Dict]:
+    """
+    Items whose URL (else ID) is not in `seen` yet, first occurrence wins;
+    `seen` is updated, so one set can span several calls. Items with neither
+    are dropped.
+    """
+    fresh = []
+    for item in items:
+        key = item.get("url") or item.get("id")
+        if key and key not in seen:
+            seen.add(key)
+            fresh.append(item)
+    return fresh
 
 
 class ResearcherAgent:
@@ -21,53 +49,171 @@ class ResearcherAgent:
         query: str,
         max_results: int = 20,
         days: int = 365,
-        rss_feeds: List[str] | None = None
+        rss_feeds: List[str] | None = None,
+        refresh: bool = False,
     ) -> List[Dict]:
+        """
+        Queries every source concurrently and returns deduplicated items.
+        `refresh` bypasses the arXiv/Crossref response cache.
+        """
+        items: Dict[str, Dict] = {}
+        for batch in self.harvest_stream(query, max_results, days, rss_feeds, refresh):
+            for item in batch:
+                items[item.get("url") or item.get("id")] = item
+        return list(items.values())
+
+    def harvest_stream(
+        self,
+        query: str,
+        max_results: int = 20,
+        days: int = 365,
+        rss_feeds: List[str] | None = None,
+        refresh: bool = False,
+    ) -> Iterator[List[Dict]]:
+        """
+        Queries every source concurrently and yields deduplicated items in
+        batches (up to HARVEST_BATCH_SIZE per source) as pages arrive, so
+        ingestion can start while later pages are still in flight. A source
+        that fails or exceeds its own timeout contributes what it had yielded
+        by then.
+
+        Duplicates (same URL, else ID) resolve by source order (arXiv,
+        Crossref, then RSS feeds as given), not by arrival: when a
+        higher-priority source delivers an item already yielded from a lower
+        one, it is yielded again and, if its doc id differs, carries the
+        replaced doc id in "replaces" (see `ingest`).
+        """
         info(f"Harvesting data for query: '{query}'")
 
-        arxiv_results = search_arxiv(query, max_results=max_results, days=days)
-        crossref_results = search_crossref(query, max_results=max_results, days=days)
+        opts = {"max_results": max_results, "days": days, "refresh": refresh}
+        sources = [
+            ("arxiv", settings.arxiv_timeout, partial(stream_arxiv, query, **opts)),
+            ("crossref", settings.crossref_timeout, partial(stream_crossref, query, **opts)),
+        ]
+        for feed in rss_feeds or []:
+            sources.append(
+                (f"rss:{feed}", settings.rss_timeout, partial(fetch_rss_feed, feed, days=days, max_items=max_results))
+            )
+
+        batch_size = max(1, settings.harvest_batch_size)
+        events: queue.Queue = queue.Queue()
+        stop = threading.Event()
+
+        def run(name: str, fn: Callable[[], Iterable[Dict]]):
+            # Posts (name, items, None) per batch, then (name, items, elapsed) or (name, items, error)
+            start = time.perf_counter()
+            batch: List[Dict] = []
+            try:
+                for item in fn():
+                    if stop.is_set():
+                        return
+                    batch.append(item)
+                    if len(batch) >= batch_size:
+                        events.put((name, batch, None))
+                        batch = []
+            except Exception as e:
+                events.put((name, batch, e))
+                return
+            events.put((name, batch, time.perf_counter() - start))
 
-        rss_results = []
-        if rss_feeds:
-            for feed in rss_feeds:
-                rss_results.extend(fetch_rss_feed(feed, days=days, max_items=max_results))
+        pool = ThreadPoolExecutor(
+            max_workers=max(1, min(settings.harvest_workers, len(sources))),
+            thread_name_prefix="harvest",
+        )
+        start = time.perf_counter()
+        timeouts = {name: timeout for name, timeout, _ in sources}
+        pending = {name: start + timeout for name, timeout, _ in sources}
+        received = {name: 0 for name in pending}
+        rank = {name: i for i, (name, _, _) in enumerate(sources)}
+        # key -> (rank of the source it was yielded from, its doc id)
+        kept: Dict[str, Tuple[int, str]] = {}
+        total = 0
+        for name, _, fn in sources:
+            pool.submit(run, name, fn)
 
-        combined = arxiv_results + crossref_results + rss_results
-        info(f"Total combined results before dedup: {len(combined)}")
+        try:
+            while pending:
+                try:
+                    name, batch, status = events.get(timeout=max(0.0, min(pending.values()) - time.perf_counter()))
+                except queue.Empty:
+                    now = time.perf_counter()
+                    for late in [n for n, end in pending.items() if end <= now]:
+                        warn(f"Source {late} timed out after {timeouts[late]:g}s; continuing without the rest of it.")
+                        del pending[late]
+                    continue
+                if name not in pending:
+                    continue  # arrived after its source timed out
+
+                received[name] += len(batch)
+                if isinstance(status, Exception):
+                    warn(f"Source {name} failed: {status}")
+                    del pending[name]
+                elif status is not None:
+                    observe(f"source.{name.split(':')[0]}", status)
+                    info(f"Source {name}: {received[name]} items in {status:.2f}s")
+                    del pending[name]
 
-        # Deduplicate by URL or ID
-        seen = set()
-        deduped = []
-        for item in combined:
-            key = item.get("url") or item.get("id")
-            if key and key not in seen:
-                seen.add(key)
-                deduped.append(item)
+                fresh = []
+                for item in batch:
+                    key = item.get("url") or item.get("id")
+                    prev = kept.get(key) if key else None
+                    if not key or (prev is not None and prev[0] <= rank[name]):
+                        continue
+                    doc_id = doc_id_for(item)
+                    if prev is not None and prev[1] != doc_id:
+                        item = {**item, "replaces": prev[1]}
+                    kept[key] = (rank[name], doc_id)
+                    fresh.append(item)
+                total += len(batch)
+                if fresh:
+                    yield fresh
+        finally:
+            # Don't wait on stragglers; their results are discarded
+            stop.set()
+            pool.shutdown(wait=False, cancel_futures=True)
 
-        info(f"Deduplicated total: {len(deduped)}")
-        return deduped
+        info(f"Total combined results before dedup: {total}")
+        info(f"Deduplicated total: {len(kept)}")
+        info(f"Harvest finished in {time.perf_counter() - start:.2f}s")
 
-    def ingest(self, items: List[Dict]):
+    def ingest(self, items: List[Dict]) -> Dict[str, int]:
         """
         For each research item, fetches its summary or scrapes text,
-        and indexes into ChromaDB.
+        and indexes into ChromaDB. With PDF_INGEST on, items with a `pdf_url`
+        are indexed from the PDF's full text instead, page by page.
+        Documents whose text is unchanged since the last run are skipped.
+        An item with "replaces" (see `harvest_stream`) removes that document
+        once it is indexed itself.
+
+        Returns:
+            Dict[str, int]: counts of "new", "updated" and "skipped" documents.
         """
+        summary = {"new": 0, "updated": 0, "skipped": 0}
+        replaced = 0
+
+        # Items without a usable abstract (e.g. all Crossref results) get scraped
+        to_scrape = [
+            it["url"] for it in items
+            if it.get("url") and len(it.get("summary") or "") < 500
+        ]
+        with span("scrape"):
+            scraped = scrape_many(to_scrape) if to_scrape else {}
+        pdfs = {}
+        if settings.pdf_ingest:
+            with span("pdf"):
+                pdfs = fetch_pdfs(it["pdf_url"] for it in items if it.get("pdf_url"))
+
         for it in items:
-            text = it.get("summary", "")
-            url = it.get("url")
-            if url and (not text or len(text) < 500):
-                try:
-                    scraped, path = fetch_and_extract(url)
-                    if scraped and len(scraped) > len(text):
-                        text = scraped
-                except Exception as e:
-                    warn(f"Failed scraping {url}: {e}")
+            text = it.get("summary") or ""
+            page = scraped.get(it.get("url"))
+            if page and len(page) > len(text):
+                text = page
 
-            if not text:
+            pages = pdfs.get(it.get("pdf_url"))
+            if not text and not pages:
                 continue
 
-            doc_id = (it.get("id") or it.get("url") or it.get("title"))[:128]
+            doc_id = doc_id_for(it)
             meta = {
                 "title": it.get("title"),
                 "url": it.get("url"),
@@ -76,5 +222,17 @@ class ResearcherAgent:
                 "source": it.get("source"),
                 "type": it.get("type"),
             }
-            self.indexer.add_document(doc_id, text, meta)
-        info("Ingestion completed.")
\ No newline at end of file
+            if pages:
+                status = self.indexer.add_pages(doc_id, pages, meta)
+            else:
+                status = self.indexer.add_document(doc_id, text, meta)
+            summary[status] += 1
+            if it.get("replaces") and it["replaces"] != doc_id:
+                replaced += self.indexer.remove_document(it["replaces"])
+        if summary["new"] or summary["updated"] or replaced:
+            self.indexer.bump_corpus_version()
+        info(
+            f"Ingestion completed: {summary['new']} new, "
+            f"{summary['updated']} updated, {summary['skipped']} skipped."
+        )
+        return summary
\ No newline at end of file
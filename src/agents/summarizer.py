@@ -1,6 +1,11 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Tuple
 from src.llm.ollama_llm import OllamaLLM
 from datetime import datetime
-from src.utils.logging import info
+from src.utils.config import settings
+from src.utils.logging import info, warn
+from src.utils.text import estimate_tokens
 
 # Escape braces {{ }} so .format() doesn't treat them as placeholders
 PROMPT_TMPL = """
@@ -36,27 +41,138 @@ Now produce the JSON block first, then the Markdown summary.
 """
 
 
+MAP_PROMPT_TMPL = """
+You are a research assistant. Extract the findings from the passages below that are
+relevant to the user query. Write short bullet points, each citing the TITLE and URL
+it comes from. Do not add information that is not in the passages.
+
+User Query:
+"{query}"
+
+Passages:
+{passages}
+
+Bullet points:
+"""
+
+
 class SummarizerAgent:
-    """Summarizes retrieved papers into structured JSON + Markdown reports."""
+    """
+    Summarizes retrieved papers into structured JSON + Markdown reports.
+
+    Passages are packed against a token budget derived from the model's context
+    window. When one prompt would leave out more than SUMMARIZE_MAX_DROP of
+    them, groups of passages are summarized concurrently (map) and the partial
+    summaries are combined (reduce); otherwise the lowest-ranked passages that
+    don't fit are dropped and a single prompt is used.
+    """
 
     def __init__(self, model: str | None = None):
         self.llm = OllamaLLM(model)
+        # Room left for passages once the template and the answer are accounted for
+        template_tokens = estimate_tokens(PROMPT_TMPL) + 64
+        self.passage_budget = max(256, self.llm.num_ctx - settings.gen_reserve_tokens - template_tokens)
+
+    def build_prompt(self, query: str, retrieved) -> str:
+        """Single-prompt form: as many passages as fit in the budget, in rank order."""
+        groups = self._pack(self._passages(retrieved))
+        return PROMPT_TMPL.format(query=query, passages="\n".join(groups[0] if groups else []))
 
-    def summarize(self, query: str, retrieved):
+    def summarize(self, query: str, retrieved, stats: Dict | None = None) -> str:
         info("Generating summary report with Ollama LLM...")
+        return "".join(self._run(query, retrieved, stats, stream=False))
+
+    def summarize_stream(self, query: str, retrieved, stats: Dict | None = None) -> Iterator[str]:
+        """Same report as `summarize`, yielded token by token."""
+        info("Streaming summary report with Ollama LLM...")
+        yield from self._run(query, retrieved, stats, stream=True)
+
+    def _run(self, query: str, retrieved, stats: Dict | None, stream: bool) -> Iterator[str]:
+        phases: Dict[str, float] = {}
+        start = time.perf_counter()
+        groups = self._pack(self._passages(retrieved))
+        phases["pack_s"] = round(time.perf_counter() - start, 3)
+        total = sum(len(g) for g in groups)
+        if len(groups) > 1 and (total - len(groups[0])) / total <= settings.summarize_max_drop:
+            info(f"Single pass over the top {len(groups[0])} of {total} passages; the rest exceed the budget.")
+            groups = groups[:1]
 
-        # Build readable passage block
+        if len(groups) <= 1:
+            prompt = PROMPT_TMPL.format(query=query, passages="\n".join(groups[0] if groups else []))
+        else:
+            start = time.perf_counter()
+            partials = self._map(query, groups)
+            phases["map_s"] = round(time.perf_counter() - start, 3)
+            blocks = [f"PARTIAL SUMMARY {n} (passage group {i}):\n{p}\n---" for n, (i, p) in enumerate(partials, 1)]
+            reduce_groups = self._pack(blocks)
+            if len(reduce_groups) > 1:
+                warn(f"Partial summaries exceed the context budget; keeping {len(reduce_groups[0])} of {len(blocks)}.")
+            prompt = PROMPT_TMPL.format(query=query, passages="\n".join(reduce_groups[0]))
+
+        start = time.perf_counter()
+        gen_stats: Dict = {}
+        if stream:
+            yield from self.llm.generate_stream(prompt, stats=gen_stats)
+        else:
+            yield self.llm.generate(prompt, stats=gen_stats)
+        phases["reduce_s" if len(groups) > 1 else "generate_s"] = round(time.perf_counter() - start, 3)
+
+        mode = f"map-reduce over {len(groups)} groups" if len(groups) > 1 else "single prompt"
+        info(f"Summarization ({mode}): " + ", ".join(f"{k[:-2]} {v}s" for k, v in phases.items()))
+        if stats is not None:
+            stats.update(gen_stats)
+            stats.update(phases)
+            stats["groups"] = len(groups)
+
+    def _passages(self, retrieved) -> List[str]:
+        # Build readable passage blocks, capped so no single passage exceeds the budget
+        max_chars = self.passage_budget * 4
         blocks = []
         for docs, metas in zip(retrieved.get("documents", [[]]), retrieved.get("metadatas", [[]])):
             for d, m in zip(docs, metas):
                 title = (m or {}).get("title")
                 url = (m or {}).get("url")
                 published = (m or {}).get("published")
-                snippet = d[:1000].replace("\n", " ")
-                blocks.append(f"TITLE: {title}\nURL: {url}\nPUBLISHED: {published}\nPASSAGE: {snippet}\n---")
+                page = (m or {}).get("page")
+                snippet = (d or "").replace("\n", " ")
+                where = f"URL: {url}\nPAGE: {page}" if page else f"URL: {url}"
+                block = f"TITLE: {title}\n{where}\nPUBLISHED: {published}\nPASSAGE: {snippet}\n---"
+                blocks.append(block[:max_chars])
+        return blocks
+
+    def _pack(self, blocks: List[str]) -> List[List[str]]:
+        """Greedily groups blocks, in order, into lists that fit the passage budget."""
+        groups: List[List[str]] = []
+        cur: List[str] = []
+        used = 0
+        for block in blocks:
+            n = estimate_tokens(block) + 1
+            if cur and used + n > self.passage_budget:
+                groups.append(cur)
+                cur, used = [], 0
+            cur.append(block)
+            used += n
+        if cur:
+            groups.append(cur)
+        return groups
 
-        passages = "\n".join(blocks[:10])
-        prompt = PROMPT_TMPL.format(query=query, passages=passages)
+    def _map(self, query: str, groups: List[List[str]]) -> List[Tuple[int, str]]:
+        """
+        Summarizes each passage group concurrently. Returns (1-based group
+        number, partial summary) pairs; failed groups are dropped.
+        """
+        def summarize_group(group: List[str]) -> str:
+            return self.llm.generate(MAP_PROMPT_TMPL.format(query=query, passages="\n".join(group)))
 
-        result = self.llm.generate(prompt)
-        return result
+        info(f"Passages exceed the {self.passage_budget}-token budget; summarizing {len(groups)} groups in parallel...")
+        partials = []
+        with ThreadPoolExecutor(max_workers=max(1, settings.summarize_concurrency)) as pool:
+            futures = [pool.submit(summarize_group, g) for g in groups]
+            for i, fut in enumerate(futures, 1):
+                try:
+                    partials.append((i, fut.result().strip()))
+                except Exception as e:
+                    warn(f"Partial summary {i} failed: {e}")
+        if not partials:
+            raise RuntimeError("All partial summaries failed.")
+        return partials
@@ -0,0 +1,153 @@
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from src.utils.logging import info, error
+
+
+class QueueFull(Exception):
+    """Raised when the job queue is at capacity."""
+
+
+class Job:
+    """One pipeline run tracked by the JobManager."""
+
+    def __init__(self, key: tuple, params: Dict[str, Any], run_fn: Optional[Callable] = None):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.params = params
+        self.run_fn = run_fn
+        self.status = "queued"  # queued -> running -> done | failed
+        self.stage: Optional[str] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.future: Future = Future()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "query": self.params.get("query"),
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+def job_key(params: Dict[str, Any]) -> tuple:
+    """Identity of a request for coalescing: normalized query plus all options."""
+    query = " ".join(str(params.get("query", "")).lower().split())
+    rest = tuple(
+        (k, tuple(v) if isinstance(v, list) else v)
+        for k, v in sorted(params.items())
+        if k != "query"
+    )
+    return (query,) + rest
+
+
+class JobManager:
+    """
+    Runs pipeline jobs on a bounded worker pool.
+
+    Identical in-flight requests share one job. When queued plus running jobs
+    reach `workers + max_queue`, new submissions raise QueueFull. Finished jobs
+    stay queryable for `ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        run_fn: Callable[[Dict[str, Any], Callable[[str], None]], Any],
+        workers: int,
+        max_queue: int,
+        ttl: float,
+    ):
+        self.run_fn = run_fn
+        self.capacity = max(1, workers) + max(0, max_queue)
+        self.ttl = ttl
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Job] = {}
+        self._inflight: Dict[tuple, Job] = {}
+
+    def submit(
+        self,
+        params: Dict[str, Any],
+        run_fn: Optional[Callable[[Dict[str, Any], Callable[[str], None]], Any]] = None,
+        coalesce: bool = True,
+    ) -> tuple[Job, bool]:
+        """
+        Returns (job, coalesced). `coalesced` is True when an identical
+        in-flight job was reused instead of starting a new run.
+
+        `run_fn` replaces the manager's function for this job (e.g. a batch
+        that streams its results elsewhere); `coalesce=False` always starts a
+        new job. Either way the job counts against the same capacity.
+        """
+        key = job_key(params) if coalesce else (uuid.uuid4().hex,)
+        with self._lock:
+            self._prune()
+            existing = self._inflight.get(key)
+            if existing is not None:
+                return existing, True
+            if len(self._inflight) >= self.capacity:
+                raise QueueFull(f"{len(self._inflight)} jobs in flight (limit {self.capacity})")
+            job = Job(key, params, run_fn)
+            self._jobs[job.id] = job
+            self._inflight[key] = job
+        self._pool.submit(self._execute, job)
+        return job, False
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def depth(self) -> int:
+        with self._lock:
+            return len(self._inflight)
+
+    def _execute(self, job: Job):
+        job.status = "running"
+        job.started_at = time.time()
+
+        def on_stage(stage: str):
+            job.stage = stage
+
+        # Status and result are recorded before the future is resolved; a future
+        # cancelled by a waiter must not turn a finished run into a failure
+        try:
+            job.result = (job.run_fn or self.run_fn)(job.params, on_stage)
+            job.status = "done"
+            if not job.future.done():
+                job.future.set_result(job.result)
+        except Exception as e:
+            error(f"Job {job.id} failed: {e}")
+            job.error = str(e)
+            job.status = "failed"
+            if not job.future.done():
+                job.future.set_exception(e)
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                self._inflight.pop(job.key, None)
+            info(f"Job {job.id} {job.status} in {job.finished_at - job.started_at:.1f}s")
+
+    def _prune(self):
+        cutoff = time.time() - self.ttl
+        expired = [jid for jid, j in self._jobs.items() if j.finished and j.finished_at < cutoff]
+        for jid in expired:
+            del self._jobs[jid]
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -1,16 +1,59 @@
-from fastapi import FastAPI
+import asyncio
+import json
+import queue
+import threading
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from src.agents.orchestrator import Orchestrator
+from src.api.jobs import JobManager, QueueFull
+from src.utils.config import settings
 from src.utils.logging import info
+from src.utils.metrics import metrics
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the Ollama models in the background so the first report does not wait for them
+    if settings.ollama_warmup:
+        from src.llm.ollama_client import get_ollama_client
+
+        get_ollama_client().warm_up()
+    yield
+    # Queued jobs are cancelled; running ones finish on their worker threads
+    jobs.shutdown()
+
 
 app = FastAPI(
     title="Personal Research Assistant (Local Ollama)",
     description="Fully local, free research summarization API using Ollama + ChromaDB",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
-# Initialize once — lightweight reuse between requests
-orch = Orchestrator()
+# Built on first use (not at import) and then reused between requests
+_orch = None
+_orch_lock = threading.Lock()
+
+
+def get_orchestrator():
+    global _orch
+    with _orch_lock:
+        if _orch is None:
+            from src.agents.orchestrator import Orchestrator
+
+            _orch = Orchestrator()
+        return _orch
+
+
+# Pipeline runs happen on worker threads so the event loop stays responsive
+jobs = JobManager(
+    run_fn=lambda params, on_stage: get_orchestrator().run(**params, on_stage=on_stage),
+    workers=settings.job_workers,
+    max_queue=settings.job_max_queue,
+    ttl=settings.job_ttl,
+)
 
 
 class ReportRequest(BaseModel):
@@ -19,6 +62,7 @@ class ReportRequest(BaseModel):
     days: int = 365
     top_k: int = 10
     rss_feeds: list[str] | None = None
+    use_cache: bool = True
 
 
 @app.get("/health")
@@ -27,26 +71,179 @@ async def health_check():
     return {"ok": True, "message": "Research Assistant API is running."}
 
 
+def _submit(params: dict, **kwargs):
+    try:
+        return jobs.submit(params, **kwargs)
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=f"Server busy: {e}. Retry later.")
+
+
 @app.post("/report")
 async def generate_report(req: ReportRequest):
     """Run the full pipeline and return a summarized report."""
     info(f"API request received for query: {req.query}")
-    report = orch.run(
-        query=req.query,
-        max_results=req.max_results,
-        days=req.days,
-        top_k=req.top_k,
-        rss_feeds=req.rss_feeds,
-    )
+    job, _ = _submit(req.model_dump())
+    # Coalesced requests share job.future: a client disconnecting must not cancel it for the others
+    report = await asyncio.shield(asyncio.wrap_future(job.future))
     return {"query": req.query, "report": report}
 
 
+@app.post("/jobs", status_code=202)
+async def create_job(req: ReportRequest):
+    """
+    Queue a report and return its job id immediately. Identical in-flight
+    requests share one job; returns 429 when the queue is full.
+    """
+    info(f"API job received for query: {req.query}")
+    job, coalesced = _submit(req.model_dump())
+    return {"job_id": job.id, "status": job.status, "coalesced": coalesced}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status, current stage and (once done) the report of a queued job."""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job id.")
+    return job.to_dict()
+
+
+@app.post("/report/stream")
+async def generate_report_stream(req: ReportRequest):
+    """
+    Run the full pipeline and stream the report as server-sent events.
+
+    Each token arrives as `data: {"token": ...}`; a final `done` event carries
+    the complete report and generation timings (time to first token,
+    tokens/sec). A failure ends the stream with an `error` event.
+    """
+    info(f"API streaming request received for query: {req.query}")
+
+    # Like a batch, the run is a job (same workers, same 429 limit); tokens
+    # are handed to the response through a queue
+    tokens: queue.Queue = queue.Queue()
+    stats: dict = {}
+
+    def run(params: dict, on_stage) -> str:
+        parts = []
+        for token in get_orchestrator().run_stream(**params, stats=stats, on_stage=on_stage):
+            parts.append(token)
+            tokens.put(token)
+        return "".join(parts)
+
+    job, _ = _submit(req.model_dump(), run_fn=run, coalesce=False)
+
+    # A plain generator: Starlette iterates it in a worker thread
+    def events():
+        while True:
+            try:
+                token = tokens.get(timeout=0.25)
+            except queue.Empty:
+                if job.future.done() and tokens.empty():
+                    break
+                continue
+            yield f"data: {json.dumps({'token': token})}\n\n"
+        if job.status == "failed":
+            yield f"event: error\ndata: {json.dumps({'detail': job.error})}\n\n"
+            return
+        yield f"event: done\ndata: {json.dumps({'query': req.query, 'report': job.result, **stats})}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+class BatchReportRequest(BaseModel):
+    queries: list[str]
+    max_results: int = 20
+    days: int = 365
+    top_k: int = 10
+    rss_feeds: list[str] | None = None
+    use_cache: bool = True
+
+
+@app.post("/report/batch")
+async def generate_report_batch(req: BatchReportRequest):
+    """
+    Reports for many related queries with shared harvesting, ingestion and
+    query embedding, streamed as server-sent events.
+
+    Each finished report arrives as `event: report` with `{"query", "report",
+    "cached"}`; a query that fails arrives as `event: error`; a final `done`
+    event carries the counts and total time.
+    """
+    if not req.queries:
+        raise HTTPException(status_code=422, detail="queries must not be empty.")
+    if len(req.queries) > settings.batch_max_queries:
+        raise HTTPException(status_code=422, detail=f"At most {settings.batch_max_queries} queries per batch.")
+    info(f"API batch request received for {len(req.queries)} queries.")
+
+    # The batch runs as a job, so it shares JOB_WORKERS and the 429 limit with
+    # single reports; finished reports are handed to the response through a queue
+    results: queue.Queue = queue.Queue()
+
+    def run(params: dict, on_stage) -> int:
+        on_stage("batch")
+        count = 0
+        for result in get_orchestrator().run_batch(**params):
+            results.put(result)
+            count += 1
+        return count
+
+    job, _ = _submit(req.model_dump(), run_fn=run, coalesce=False)
+
+    # A plain generator: Starlette iterates it in a worker thread
+    def events():
+        start = time.perf_counter()
+        done = failed = 0
+        while True:
+            try:
+                result = results.get(timeout=0.25)
+            except queue.Empty:
+                if job.future.done() and results.empty():
+                    break
+                continue
+            if "error" in result:
+                failed += 1
+                yield f"event: error\ndata: {json.dumps(result)}\n\n"
+            else:
+                done += 1
+                yield f"event: report\ndata: {json.dumps(result)}\n\n"
+        if job.status == "failed":
+            yield f"event: error\ndata: {json.dumps({'detail': job.error})}\n\n"
+            return
+        summary = {"reports": done, "failed": failed, "total_s": round(time.perf_counter() - start, 3)}
+        yield f"event: done\ndata: {json.dumps(summary)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Stage latency histograms, HTTP/embedding/scrape counters and the number
+    of report jobs in flight, Prometheus text format.
+    """
+    text = metrics.render_prometheus() + (
+        "# HELP pra_jobs_in_flight Report jobs queued or running.\n"
+        "# TYPE pra_jobs_in_flight gauge\n"
+        f"pra_jobs_in_flight {jobs.depth()}\n"
+    )
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+
 @app.get("/")
 async def root():
     """Root index info."""
     return {
         "message": "Welcome to the Local Research Assistant API. Use POST /report to generate summaries.",
-        "endpoints": ["/health", "/report"],
+        "endpoints": ["/health", "/report", "/report/stream", "/report/batch", "/jobs", "/jobs/{job_id}", "/metrics"],
     }
 
 
@@ -1,12 +1,38 @@
 import arxiv
 from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator
+from src.connectors.response_cache import cached_stream
+from src.utils.config import settings
+from src.utils.metrics import inc
 
 
 # Returns list of {id, title, url, pdf_url, published, summary, authors}
-def search_arxiv(query: str, max_results: int = 20, days: int = 365):
+def search_arxiv(query: str, max_results: int = 20, days: int = 365, refresh: bool = False):
+    return list(stream_arxiv(query, max_results, days, refresh))
+
+
+def stream_arxiv(
+    query: str, max_results: int = 20, days: int = 365, refresh: bool = False
+) -> Iterator[Dict[str, Any]]:
+    """Yields `search_arxiv` results as pages arrive (through the response cache)."""
+    return cached_stream(
+        "arxiv", query, days, max_results,
+        ttl=settings.arxiv_cache_ttl,
+        fetch=lambda: _iter_arxiv(query, max_results, days),
+        refresh=refresh,
+    )
+
+
+def _iter_arxiv(query: str, max_results: int, days: int) -> Iterator[Dict[str, Any]]:
+    """
+    Pages through newest-first results, `ARXIV_PAGE_SIZE` entries per request
+    (never more than `max_results`), and stops at the first entry older than
+    the `days` cutoff instead of fetching pages that would be filtered out.
+    """
     after = datetime.utcnow() - timedelta(days=days)
-    results = []
 
+    client = arxiv.Client(page_size=max(1, min(max_results, settings.arxiv_page_size)))
+    client.query_url_format = settings.arxiv_api_url + "?{}"
     search = arxiv.Search(
         query=query,
         max_results=max_results,
@@ -14,18 +40,21 @@ def search_arxiv(query: str, max_results: int = 20, days: int = 365):
         sort_order=arxiv.SortOrder.Descending,
     )
 
-    for r in search.results():
-        if r.published.replace(tzinfo=None) < after:
-            continue
-
-        results.append({
-            "id": r.entry_id,
-            "title": r.title,
-            "url": r.entry_id,
-            "pdf_url": r.pdf_url,
-            "published": r.published.isoformat(),
-            "summary": r.summary,
-            "authors": [a.name for a in r.authors],
-        })
-
-    return results
\ No newline at end of file
+    # The arxiv client fetches the next page lazily; the search counts as one call
+    try:
+        for r in client.results(search):
+            if r.published.replace(tzinfo=None) < after:
+                break
+            yield {
+                "id": r.entry_id,
+                "title": r.title,
+                "url": r.entry_id,
+                "pdf_url": r.pdf_url,
+                "published": r.published.isoformat(),
+                "summary": r.summary,
+                "authors": [a.name for a in r.authors],
+            }
+    except Exception:
+        inc("pra_http_requests_total", target="arxiv", status="error")
+        raise
+    inc("pra_http_requests_total", target="arxiv", status="ok")
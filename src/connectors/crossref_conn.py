@@ -1,15 +1,21 @@
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import Any, Dict, Iterator, List, Optional
+from src.connectors.response_cache import cached_stream
+from src.utils.config import settings
 from src.utils.logging import info, warn, error
+from src.utils.metrics import inc
 
-BASE = "https://api.crossref.org/works"
+# Fields requested from Crossref; everything else in a work record is dropped server-side
+SELECT_FIELDS = ("DOI", "title", "URL", "type", "created", "published-print", "published-online")
 
 
 def search_crossref(
     query: str,
     max_results: int = 20,
-    days: int = 365
+    days: int = 365,
+    refresh: bool = False,
 ) -> List[Dict[str, Any]]:
     """
     Search recent academic works from Crossref API.
@@ -18,6 +24,7 @@ def search_crossref(
         query (str): Research topic or keyword string.
         max_results (int): Maximum number of results to return (default=20).
         days (int): Only include works published within this number of days.
+        refresh (bool): Bypass the response cache and query Crossref.
 
     Returns:
         List[Dict[str, Any]]: Each dict includes:
@@ -31,47 +38,121 @@ def search_crossref(
               "type": Optional[str]
             }
     """
-    from_dt = (datetime.utcnow() - timedelta(days=days)).date().isoformat()
+    return list(stream_crossref(query, max_results, days, refresh))
+
+
+def stream_crossref(
+    query: str,
+    max_results: int = 20,
+    days: int = 365,
+    refresh: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """Yields `search_crossref` results as pages arrive (through the response cache)."""
+    try:
+        yield from cached_stream(
+            "crossref", query, days, max_results,
+            ttl=settings.crossref_cache_ttl,
+            fetch=lambda: _iter_crossref(query, max_results, days),
+            refresh=refresh,
+        )
+    except requests.exceptions.RequestException as e:
+        error(f"Crossref request failed: {e}")
+
+
+def _get_page(session: requests.Session, params: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        r = session.get(settings.crossref_api_url, params=params, timeout=60)
+    except requests.exceptions.RequestException:
+        inc("pra_http_requests_total", target="crossref", status="error")
+        raise
+    inc("pra_http_requests_total", target="crossref", status=r.status_code)
+    r.raise_for_status()
+    return r.json().get("message", {})
+
+
+def _to_item(it: Dict[str, Any]) -> Dict[str, Any]:
+    title = "; ".join(it.get("title", [])) if it.get("title") else "Untitled"
+    pub = (
+        it.get("created", {}).get("date-time")
+        or it.get("published-print", {}).get("date-time")
+        or it.get("published-online", {}).get("date-time")
+    )
+    return {
+        "id": it.get("DOI"),
+        "title": title,
+        "url": it.get("URL") or "",
+        "pdf_url": None,
+        "published": pub,
+        "source": "crossref",
+        "type": it.get("type"),
+    }
+
+
+def _published_date(it: Dict[str, Any]) -> Optional[str]:
+    """
+    Earliest of published-print / published-online as YYYY-MM-DD: the date
+    Crossref's `from-pub-date` filter and `published` sort work on.
+    """
+    dates = []
+    for field in ("published-print", "published-online"):
+        parts = (it.get(field, {}).get("date-parts") or [[]])[0]
+        if parts and parts[0]:
+            year, month, day = (list(parts) + [1, 1])[:3]
+            dates.append(f"{year:04d}-{month:02d}-{day:02d}")
+    return min(dates) if dates else None
+
+
+def _iter_crossref(query: str, max_results: int, days: int) -> Iterator[Dict[str, Any]]:
+    """
+    Cursor-paged (deep paging) newest-first results with a `select=` field
+    projection. The next page is requested while the current one is consumed;
+    paging stops at `max_results`, on an empty page, or once a whole page is
+    older than the `days` cutoff. The cutoff is checked on the publication
+    date, as the server filters; works without one are kept.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    from_dt = cutoff.date().isoformat()
+    page_size = max(1, min(max_results, settings.crossref_page_size))
     params = {
         "query": query,
-        "rows": max_results,
+        "rows": page_size,
         "filter": f"from-pub-date:{from_dt}",
         "sort": "published",
-        "order": "desc"
+        "order": "desc",
+        "select": ",".join(SELECT_FIELDS),
+        "cursor": "*",
     }
 
-    try:
-        info(f"Fetching Crossref results for '{query}' (since {from_dt}) ...")
-        r = requests.get(BASE, params=params, timeout=60)
-        r.raise_for_status()
-    except requests.exceptions.RequestException as e:
-        error(f"Crossref request failed: {e}")
-        return []
-
-    data = r.json()
-    items = data.get("message", {}).get("items", [])
-    out: List[Dict[str, Any]] = []
-
-    for it in items:
-        title = "; ".join(it.get("title", [])) if it.get("title") else "Untitled"
-        url = it.get("URL") or ""
-        pub = (
-            it.get("created", {}).get("date-time")
-            or it.get("published-print", {}).get("date-time")
-            or it.get("published-online", {}).get("date-time")
-        )
-        out.append({
-            "id": it.get("DOI"),
-            "title": title,
-            "url": url,
-            "pdf_url": None, 
-            "published": pub,
-            "source": "crossref",
-            "type": it.get("type"),
-        })
-
-    info(f"Crossref returned {len(out)} results.")
-    return out
+    info(f"Fetching Crossref results for '{query}' (since {from_dt}) ...")
+    yielded = 0
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=1, thread_name_prefix="crossref") as pool:
+        page = pool.submit(_get_page, session, dict(params))
+        while page is not None:
+            message = page.result()
+            items = message.get("items", [])
+            cursor = message.get("next-cursor")
+            remaining = max_results - yielded - len(items)
+            page = None
+            if items and cursor and remaining > 0:
+                params.update(cursor=cursor, rows=min(page_size, remaining))
+                page = pool.submit(_get_page, session, dict(params))
+
+            in_window = 0
+            for it in items:
+                published = _published_date(it)
+                if published and published < from_dt:
+                    continue
+                in_window += 1
+                yield _to_item(it)
+                yielded += 1
+                if yielded >= max_results:
+                    break
+            if yielded >= max_results or (items and not in_window):
+                if page is not None:
+                    page.cancel()
+                break
+
+    info(f"Crossref returned {yielded} results.")
 
 
 if __name__ == "__main__":
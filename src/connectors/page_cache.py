@@ -0,0 +1,152 @@
+import gzip
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+
+def url_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+class PageCache:
+    """
+    Two-level on-disk cache for scraped pages.
+
+    Each URL (keyed by its sha256) keeps the gzip-compressed raw response and,
+    once extracted, the readable text, so a hit costs a file read rather than an
+    HTML parse. An SQLite index tracks validators (ETag / Last-Modified), fetch
+    time for the TTL and last use for LRU eviction above `max_bytes`.
+    """
+
+    def __init__(self, root: str, max_bytes: int, ttl: float):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.root / "index.sqlite3"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                raw_size INTEGER NOT NULL,
+                text_size INTEGER
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_lru ON pages(last_used)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(raw_size + COALESCE(text_size, 0)), 0) FROM pages"
+        ).fetchone()[0]
+
+    def _raw_path(self, key: str) -> Path:
+        return self.root / f"{key}.html.gz"
+
+    def _text_path(self, key: str) -> Path:
+        return self.root / f"{key}.txt"
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        """
+        Returns the index entry for `url` with a `fresh` flag, or None on a miss.
+        `has_text` is False when the page was downloaded but never extracted.
+        """
+        key = url_key(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, fetched_at, text_size FROM pages WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE pages SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return {
+            "key": key,
+            "etag": row[0],
+            "last_modified": row[1],
+            "fresh": time.time() - row[2] < self.ttl,
+            "has_text": row[3] is not None,
+        }
+
+    def read_raw(self, url: str) -> bytes:
+        return gzip.decompress(self._raw_path(url_key(url)).read_bytes())
+
+    def read_text(self, url: str) -> str:
+        return self._text_path(url_key(url)).read_text(encoding="utf-8")
+
+    def raw_path(self, url: str) -> str:
+        return str(self._raw_path(url_key(url)))
+
+    def put_raw(self, url: str, content: bytes, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Stores a freshly downloaded page, invalidating any extracted text."""
+        key = url_key(url)
+        blob = gzip.compress(content, compresslevel=6)
+        self._raw_path(key).write_bytes(blob)
+        self._text_path(key).unlink(missing_ok=True)
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute(
+                "SELECT raw_size + COALESCE(text_size, 0) FROM pages WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages "
+                "(key, url, etag, last_modified, fetched_at, last_used, raw_size, text_size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, NULL)",
+                (key, url, etag, last_modified, now, now, len(blob)),
+            )
+            self._total_bytes += len(blob) - (old[0] if old else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def put_text(self, url: str, text: str):
+        """Stores extracted text next to an already cached raw page."""
+        key = url_key(url)
+        data = text.encode("utf-8")
+        with self._lock:
+            row = self._conn.execute("SELECT text_size FROM pages WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return  # evicted in the meantime
+            self._text_path(key).write_bytes(data)
+            self._conn.execute("UPDATE pages SET text_size = ? WHERE key = ?", (len(data), key))
+            self._total_bytes += len(data) - (row[0] or 0)
+            self._conn.commit()
+
+    def mark_revalidated(self, url: str):
+        """Restarts the TTL after the origin answered 304 Not Modified."""
+        with self._lock:
+            self._conn.execute("UPDATE pages SET fetched_at = ? WHERE key = ?", (time.time(), url_key(url)))
+            self._conn.commit()
+
+    def _evict(self):
+        # Drop least recently used pages until ~90% of the cap
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute(
+            "SELECT key, raw_size + COALESCE(text_size, 0) FROM pages ORDER BY last_used"
+        ).fetchall()
+        drop = []
+        for key, size in rows:
+            if self._total_bytes <= target:
+                break
+            drop.append(key)
+            self._total_bytes -= size
+            self._raw_path(key).unlink(missing_ok=True)
+            self._text_path(key).unlink(missing_ok=True)
+        self._conn.executemany("DELETE FROM pages WHERE key = ?", [(k,) for k in drop])
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "bytes": self._total_bytes}
@@ -0,0 +1,248 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    TimeoutError as FuturesTimeout,
+    as_completed,
+)
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from src.connectors.web_scraper import HEADERS, HostLimiter, _new_session
+from src.utils.config import settings
+from src.utils.logging import info, warn
+from src.utils.metrics import inc
+
+# A single pathological page (e.g. a table dump) can't flood a document
+MAX_PAGE_CHARS = 20_000
+_WS_RE = re.compile(r"[ \t\f\v]+")
+
+Pages = List[Tuple[int, str]]
+
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+_pdf_pool_lock = threading.Lock()
+
+
+def pdf_cache_path(url: str) -> Path:
+    return Path(settings.cache_dir) / "pdfs" / (hashlib.sha256(url.encode("utf-8")).hexdigest()[:32] + ".pdf")
+
+
+def download_pdf(
+    url: str,
+    session: requests.Session | None = None,
+    limiter: HostLimiter | None = None,
+    timeout: float = 60,
+    max_bytes: int = 25 * 1024 * 1024,
+) -> Path:
+    """
+    Streams a PDF to the cache (reused on later runs) without holding it in
+    memory. Raises ValueError for non-PDF responses or files over `max_bytes`.
+    """
+    path = pdf_cache_path(url)
+    if path.exists():
+        return path
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    info(f"Downloading PDF {url}")
+    getter = session.get if session is not None else requests.get
+    tmp = path.with_suffix(".part")
+    try:
+        if limiter is not None:
+            with limiter.slot(urlparse(url).netloc, timeout):
+                resp = getter(url, timeout=timeout, headers=HEADERS, stream=True)
+        else:
+            resp = getter(url, timeout=timeout, headers=HEADERS, stream=True)
+    except (requests.exceptions.RequestException, TimeoutError):
+        inc("pra_http_requests_total", target="pdf", status="error")
+        raise
+
+    with resp:
+        inc("pra_http_requests_total", target="pdf", status=resp.status_code)
+        resp.raise_for_status()
+        if int(resp.headers.get("Content-Length") or 0) > max_bytes:
+            raise ValueError(f"PDF larger than {max_bytes // (1024 * 1024)} MB")
+        size = 0
+        with open(tmp, "wb") as f:
+            for block in resp.iter_content(64 * 1024):
+                if size == 0 and not block.lstrip().startswith(b"%PDF"):
+                    tmp.unlink(missing_ok=True)
+                    raise ValueError("response is not a PDF")
+                size += len(block)
+                if size > max_bytes:
+                    f.close()
+                    tmp.unlink(missing_ok=True)
+                    raise ValueError(f"PDF larger than {max_bytes // (1024 * 1024)} MB")
+                f.write(block)
+    inc("pra_scraped_bytes_total", size)
+    tmp.replace(path)
+    return path
+
+
+def extract_pdf_pages(path: str, max_pages: int, time_limit: float) -> Pages:
+    """
+    Worker-process stage: extracts text one page at a time, stopping after
+    `max_pages` pages or `time_limit` seconds. pypdf parses pages lazily, so
+    only the current page's objects are decoded at any point. The limit is
+    checked between pages; a worker stuck inside one is killed by
+    `fetch_pdfs`.
+
+    Returns:
+        Pages: (1-based page number, text) for pages that yielded text.
+    """
+    from pypdf import PdfReader
+
+    deadline = time.monotonic() + time_limit
+    reader = PdfReader(path)
+    pages: Pages = []
+    for number, page in enumerate(reader.pages, 1):
+        if number > max_pages or time.monotonic() > deadline:
+            break
+        try:
+            text = page.extract_text() or ""
+        except Exception:
+            continue
+        text = _WS_RE.sub(" ", text).strip()[:MAX_PAGE_CHARS]
+        if text:
+            pages.append((number, text))
+    return pages
+
+
+def _extracted_path(path: Path, max_pages: int) -> Path:
+    return path.with_suffix(f".p{max_pages}.json")
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """Process pool for PDF extraction, created once and rebuilt if a worker hangs or dies."""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            _pdf_pool = ProcessPoolExecutor(max_workers=max(1, settings.pdf_workers))
+            # Start the workers now, before any download threads exist
+            _pdf_pool.submit(len, b"").result()
+        return _pdf_pool
+
+
+def _discard_pdf_pool():
+    """
+    Drops the pool and kills its workers; the next call builds a new one.
+    Cancelling does not stop a worker stuck inside pypdf, so it is terminated
+    rather than left holding its CPU.
+    """
+    global _pdf_pool
+    with _pdf_pool_lock:
+        pool, _pdf_pool = _pdf_pool, None
+    if pool is None:
+        return
+    # The executor has no public way to stop a running task
+    processes = list((pool._processes or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for proc in processes:
+        if proc.is_alive():
+            proc.terminate()
+    for proc in processes:
+        proc.join(timeout=5)
+        if proc.is_alive():
+            proc.kill()
+
+
+def fetch_pdfs(urls: Iterable[str], deadline: Optional[float] = None) -> Dict[str, Pages]:
+    """
+    Downloads PDFs concurrently and extracts their text page by page.
+
+    Downloads share one keep-alive session and the scraper's per-host limits;
+    extraction runs in a process pool under the per-document page and time
+    limits from settings. Extracted pages are cached next to the PDF. Once
+    `deadline` seconds have passed, pending work is abandoned.
+
+    Args:
+        urls (Iterable[str]): PDF URLs; duplicates are fetched once.
+        deadline (Optional[float]): Overall budget in seconds (default from settings).
+
+    Returns:
+        Dict[str, Pages]: url -> [(page number, text)], for PDFs that yielded text in time.
+    """
+    urls = list(dict.fromkeys(u for u in urls if u))
+    if not urls:
+        return {}
+
+    budget = settings.pdf_deadline if deadline is None else deadline
+    end = time.monotonic() + budget
+    max_pages = max(1, settings.pdf_max_pages)
+    workers = max(1, min(settings.scrape_workers, len(urls)))
+    session = _new_session(workers)
+    limiter = HostLimiter(settings.scrape_host_concurrency, settings.scrape_host_interval)
+
+    def fetch(url: str) -> Path:
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("PDF deadline reached")
+        return download_pdf(
+            url, session, limiter,
+            timeout=min(settings.scrape_timeout, remaining),
+            max_bytes=settings.pdf_max_mb * 1024 * 1024,
+        )
+
+    cpu_pool = _get_pdf_pool()
+    net_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pdf")
+    results: Dict[str, Pages] = {}
+    extracting = {}
+    start = time.monotonic()
+    try:
+        downloads = {net_pool.submit(fetch, u): u for u in urls}
+        try:
+            for fut in as_completed(downloads, timeout=max(0.0, end - time.monotonic())):
+                url = downloads[fut]
+                try:
+                    path = fut.result()
+                except Exception as e:
+                    warn(f"Failed downloading PDF {url}: {e}")
+                    continue
+                cached = _extracted_path(path, max_pages)
+                if cached.exists():
+                    pages = [tuple(p) for p in json.loads(cached.read_text(encoding="utf-8"))]
+                    if pages:
+                        results[url] = pages
+                    continue
+                job = cpu_pool.submit(extract_pdf_pages, str(path), max_pages, settings.pdf_time_limit)
+                extracting[job] = (url, cached)
+        except FuturesTimeout:
+            warn(f"PDF deadline of {budget:g}s reached during download.")
+
+        # Workers stop themselves at the per-document time limit; allow a little slack on top
+        wait = max(0.0, end - time.monotonic()) + settings.pdf_time_limit
+        try:
+            for fut in as_completed(extracting, timeout=wait):
+                url, cached = extracting[fut]
+                try:
+                    pages = fut.result()
+                except BrokenProcessPool:
+                    warn(f"PDF worker died extracting {url}; restarting the pool.")
+                    _discard_pdf_pool()
+                    continue
+                except Exception as e:
+                    warn(f"Failed extracting PDF {url}: {e}")
+                    pages = []
+                cached.write_text(json.dumps(pages), encoding="utf-8")
+                if pages:
+                    results[url] = pages
+                else:
+                    warn(f"No text extracted from PDF {url}")
+        except FuturesTimeout:
+            warn(f"PDF extraction overran its limit; killing the workers on {sum(not f.done() for f in extracting)} document(s).")
+            _discard_pdf_pool()
+    finally:
+        net_pool.shutdown(wait=False, cancel_futures=True)
+        for fut in extracting:
+            fut.cancel()
+        session.close()
+
+    n_pages = sum(len(p) for p in results.values())
+    info(f"Extracted {n_pages} pages from {len(results)}/{len(urls)} PDFs in {time.monotonic() - start:.2f}s")
+    return results
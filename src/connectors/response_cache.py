@@ -0,0 +1,131 @@
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from src.utils.config import settings
+from src.utils.logging import info, warn
+
+
+class ResponseCache:
+    """
+    On-disk cache of connector results, keyed by
+    (source, normalized query, filter start date, rows).
+    """
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                source TEXT NOT NULL,
+                query TEXT NOT NULL,
+                from_date TEXT NOT NULL,
+                rows INTEGER NOT NULL,
+                results TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (source, query, from_date, rows)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, key: tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT results, fetched_at FROM responses "
+                "WHERE source = ? AND query = ? AND from_date = ? AND rows = ?",
+                key,
+            ).fetchone()
+        if row is None:
+            return None
+        return {"results": json.loads(row[0]), "age_s": time.time() - row[1]}
+
+    def put(self, key: tuple, results: List[Dict[str, Any]]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (source, query, from_date, rows, results, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (*key, json.dumps(results), time.time()),
+            )
+            self._conn.commit()
+
+    def count(self, source: str, outcome: str) -> Dict[str, int]:
+        with self._lock:
+            counts = self.stats.setdefault(source, {"hit": 0, "miss": 0, "stale": 0, "refresh": 0})
+            counts[outcome] += 1
+            return dict(counts)
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(settings.response_cache_path)
+        return _cache
+
+
+def _cache_key(source: str, query: str, days: int, rows: int) -> tuple:
+    from_date = (datetime.utcnow() - timedelta(days=days)).date().isoformat()
+    return (source, " ".join(query.lower().split()), from_date, rows)
+
+
+def cached_stream(
+    source: str,
+    query: str,
+    days: int,
+    rows: int,
+    ttl: float,
+    fetch: Callable[[], Iterable[Dict[str, Any]]],
+    refresh: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yields `fetch()` results through the response cache, as they are
+    produced, and caches the full list once the stream is exhausted.
+
+    Fresh entries (younger than `ttl`) are served without a request unless
+    `refresh` is set. A failure before the first result falls back to any
+    cached entry, however old (otherwise the error propagates); a failure
+    part-way ends the stream after the results already yielded (and nothing
+    is cached). A stream abandoned by the caller is not cached either.
+    """
+    cache = get_response_cache()
+    key = _cache_key(source, query, days, rows)
+    entry = cache.get(key)
+
+    if entry is not None and not refresh and entry["age_s"] < ttl:
+        counts = cache.count(source, "hit")
+        info(f"{source} cache hit ({entry['age_s']:.0f}s old) — {counts['hit']} hits / {counts['miss']} misses.")
+        yield from entry["results"]
+        return
+
+    results: List[Dict[str, Any]] = []
+    try:
+        for item in fetch():
+            results.append(item)
+            yield item
+    except Exception as e:
+        if results:
+            warn(f"{source} stream failed after {len(results)} results ({e}); continuing with those.")
+            return
+        if entry is None:
+            raise
+        counts = cache.count(source, "stale")
+        warn(f"{source} request failed ({e}); serving {entry['age_s']:.0f}s old cached results ({counts['stale']} stale).")
+        yield from entry["results"]
+        return
+
+    cache.put(key, results)
+    counts = cache.count(source, "refresh" if refresh else "miss")
+    info(f"{source} cache {'refreshed' if refresh else 'miss'} — {counts['hit']} hits / {counts['miss']} misses.")
@@ -2,6 +2,7 @@ import feedparser
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
 from src.utils.logging import info, warn
+from src.utils.metrics import inc
 
 
 def fetch_rss_feed(feed_url: str, days: int = 30, max_items: int = 20) -> List[Dict[str, Any]]:
@@ -26,6 +27,7 @@ def fetch_rss_feed(feed_url: str, days: int = 30, max_items: int = 20) -> List[D
     """
     info(f"Fetching RSS feed: {feed_url}")
     feed = feedparser.parse(feed_url)
+    inc("pra_http_requests_total", target="rss", status=feed.get("status", "error"))
     if feed.bozo:
         warn(f"RSS feed parse error: {feed.bozo_exception}")
         return []
@@ -1,12 +1,181 @@
-import requests
-import trafilatura
+import multiprocessing
+import threading
+import time
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    TimeoutError as FuturesTimeout,
+    as_completed,
+)
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from src.connectors.page_cache import PageCache
 from src.utils.config import settings
 from src.utils.logging import info, warn, error
+from src.utils.metrics import inc
 
 CACHE_DIR = Path(settings.cache_dir)
-CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+HEADERS = {"User-Agent": "research-assistant/1.0"}
+
+# Extraction workers are started fresh rather than forked from this (multithreaded) process
+_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+_extract_pool: Optional[ProcessPoolExecutor] = None
+_extract_pool_lock = threading.Lock()
+_page_cache: Optional[PageCache] = None
+_page_cache_lock = threading.Lock()
+
+
+class HostLimiter:
+    """
+    Per-host politeness: caps concurrent requests to one host and spaces
+    request starts at least `min_interval` seconds apart.
+    """
+
+    def __init__(self, max_concurrent: int, min_interval: float):
+        self.max_concurrent = max(1, max_concurrent)
+        self.min_interval = max(0.0, min_interval)
+        self._lock = threading.Lock()
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._next_start: Dict[str, float] = {}
+
+    @contextmanager
+    def slot(self, host: str, timeout: float):
+        """Waits up to `timeout` seconds for a request slot on `host`."""
+        with self._lock:
+            sem = self._slots.setdefault(host, threading.BoundedSemaphore(self.max_concurrent))
+        if not sem.acquire(timeout=max(0.0, timeout)):
+            raise TimeoutError(f"no request slot for {host} within {timeout:.0f}s")
+        try:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(host, 0.0))
+                self._next_start[host] = start + self.min_interval
+            if start > now:
+                time.sleep(start - now)
+            yield
+        finally:
+            sem.release()
+
+
+def _legacy_cache_path(url: str) -> Path:
+    """Flat-file cache layout used before the page cache; read-only now."""
+    fname = (url.replace("://", "_").replace("/", "_").replace("?", "_")[:150]) + ".html"
+    return CACHE_DIR / fname
+
+
+def get_page_cache() -> PageCache:
+    global _page_cache
+    with _page_cache_lock:
+        if _page_cache is None:
+            _page_cache = PageCache(
+                str(CACHE_DIR / "pages"),
+                max_bytes=settings.page_cache_max_mb * 1024 * 1024,
+                ttl=settings.page_cache_ttl_hours * 3600,
+            )
+        return _page_cache
+
+
+def _new_session(pool_size: int) -> requests.Session:
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def extract_html(html: bytes) -> str:
+    """CPU-bound readability extraction; safe to run in a worker process."""
+    # Imported here: trafilatura is slow to load and only extraction workers need it
+    import trafilatura
+
+    text = trafilatura.extract(html, include_comments=False, include_tables=False) or ""
+    return text.strip()
+
+
+def _get_extract_pool() -> ProcessPoolExecutor:
+    """Process pool for extraction, created once and reused across scrapes."""
+    global _extract_pool
+    with _extract_pool_lock:
+        if _extract_pool is None:
+            _extract_pool = ProcessPoolExecutor(
+                max_workers=max(1, settings.scrape_extract_workers),
+                mp_context=multiprocessing.get_context(_START_METHOD),
+            )
+            # Start a worker (and load trafilatura in it) now rather than on the first page
+            _extract_pool.submit(extract_html, b"").result()
+        return _extract_pool
+
+
+def fetch_page(
+    url: str,
+    session: requests.Session | None = None,
+    limiter: HostLimiter | None = None,
+    timeout: float = 60,
+) -> Tuple[Optional[str], Optional[bytes]]:
+    """
+    Resolves a page through the page cache.
+
+    Returns:
+        Tuple[Optional[str], Optional[bytes]]: (text, None) when extracted text is
+        cached and fresh or revalidated; (None, raw_html) when the caller still
+        needs to extract and `store_text` the result.
+    """
+    cache = get_page_cache()
+    entry = cache.lookup(url)
+    headers = dict(HEADERS)
+    if entry is not None:
+        if entry["fresh"]:
+            return (cache.read_text(url), None) if entry["has_text"] else (None, cache.read_raw(url))
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+    else:
+        legacy = _legacy_cache_path(url)
+        if legacy.exists():
+            content = legacy.read_bytes()
+            cache.put_raw(url, content)
+            return None, content
+
+    info(f"Downloading {url}")
+    host = urlparse(url).netloc
+    getter = session.get if session is not None else requests.get
+    try:
+        if limiter is not None:
+            with limiter.slot(host, timeout):
+                resp = getter(url, timeout=timeout, headers=headers)
+        else:
+            resp = getter(url, timeout=timeout, headers=headers)
+    except (requests.exceptions.RequestException, TimeoutError) as e:
+        inc("pra_http_requests_total", target="scrape", status="error")
+        if entry is None:
+            raise
+        warn(f"Revalidation failed for {url} ({e}); serving stale copy.")
+        resp = None
+
+    if resp is not None:
+        inc("pra_http_requests_total", target="scrape", status=resp.status_code)
+        inc("pra_scraped_bytes_total", len(resp.content))
+    if entry is not None and (resp is None or resp.status_code == 304):
+        if resp is not None:
+            cache.mark_revalidated(url)
+        return (cache.read_text(url), None) if entry["has_text"] else (None, cache.read_raw(url))
+
+    resp.raise_for_status()
+    cache.put_raw(url, resp.content, resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+    return None, resp.content
+
+
+def store_text(url: str, text: str):
+    get_page_cache().put_text(url, text)
 
 
 def fetch_and_extract(url: str) -> Tuple[str, str]:
@@ -20,20 +189,95 @@ def fetch_and_extract(url: str) -> Tuple[str, str]:
         Tuple[str, str]: (cleaned_text, saved_file_path)
     """
     try:
-        fname = (url.replace("://", "_").replace("/", "_").replace("?", "_")[:150]) + ".html"
-        fpath = CACHE_DIR / fname
-
-        if not fpath.exists():
-            info(f"Downloading {url}")
-            resp = requests.get(url, timeout=60, headers={"User-Agent": "research-assistant/1.0"})
-            resp.raise_for_status()
-            fpath.write_bytes(resp.content)
-
-        # Compatible with all modern trafilatura versions
-        text = trafilatura.extract_file(str(fpath), include_comments=False, include_tables=False) or ""
+        text, html = fetch_page(url)
+        if text is None:
+            text = extract_html(html)
+            store_text(url, text)
         if not text:
             warn(f"No text extracted from {url}")
-        return text.strip(), str(fpath)
+        return text, get_page_cache().raw_path(url)
     except Exception as e:
         error(f"Web scrape failed for {url}: {e}")
-        return "", ""
\ No newline at end of file
+        return "", ""
+
+
+def scrape_many(urls: Iterable[str], deadline: Optional[float] = None) -> Dict[str, str]:
+    """
+    Downloads and extracts many pages concurrently.
+
+    Downloads run on a bounded thread pool sharing one keep-alive session, with
+    per-host concurrency and rate limits. Extraction runs in a separate process
+    pool so HTML parsing never blocks the network threads. Once `deadline`
+    seconds have passed, pending work is abandoned and whatever text has been
+    extracted so far is returned.
+
+    Args:
+        urls (Iterable[str]): Page URLs; duplicates are fetched once.
+        deadline (Optional[float]): Overall budget in seconds (default from settings).
+
+    Returns:
+        Dict[str, str]: url -> extracted text, for pages that yielded text in time.
+    """
+    urls = list(dict.fromkeys(u for u in urls if u))
+    if not urls:
+        return {}
+
+    budget = settings.scrape_deadline if deadline is None else deadline
+    end = time.monotonic() + budget
+    workers = max(1, min(settings.scrape_workers, len(urls)))
+    session = _new_session(workers)
+    limiter = HostLimiter(settings.scrape_host_concurrency, settings.scrape_host_interval)
+
+    def fetch(url: str) -> Tuple[Optional[str], Optional[bytes]]:
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("scrape deadline reached")
+        return fetch_page(url, session, limiter, timeout=min(settings.scrape_timeout, remaining))
+
+    cpu_pool = _get_extract_pool()
+    net_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scrape")
+    results: Dict[str, str] = {}
+    extracting = {}
+    start = time.monotonic()
+    try:
+        downloads = {net_pool.submit(fetch, u): u for u in urls}
+        try:
+            for fut in as_completed(downloads, timeout=max(0.0, end - time.monotonic())):
+                url = downloads[fut]
+                try:
+                    text, html = fut.result()
+                except Exception as e:
+                    warn(f"Failed scraping {url}: {e}")
+                    continue
+                if text is not None:
+                    if text:
+                        results[url] = text
+                    continue
+                extracting[cpu_pool.submit(extract_html, html)] = url
+        except FuturesTimeout:
+            warn(f"Scrape deadline of {budget:g}s reached; {len(results) + len(extracting)} of {len(urls)} pages fetched.")
+
+        # Extractions already finished are always collected, even past the deadline
+        try:
+            for fut in as_completed(extracting, timeout=max(0.0, end - time.monotonic())):
+                url = extracting[fut]
+                try:
+                    text = fut.result()
+                except Exception as e:
+                    warn(f"Failed extracting {url}: {e}")
+                    continue
+                store_text(url, text)
+                if text:
+                    results[url] = text
+                else:
+                    warn(f"No text extracted from {url}")
+        except FuturesTimeout:
+            warn(f"Scrape deadline of {budget:g}s reached during extraction.")
+    finally:
+        net_pool.shutdown(wait=False, cancel_futures=True)
+        for fut in extracting:
+            fut.cancel()
+        session.close()
+
+    info(f"Scraped {len(results)}/{len(urls)} pages in {time.monotonic() - start:.2f}s")
+    return results
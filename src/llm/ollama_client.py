@@ -0,0 +1,218 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from src.utils.config import settings
+from src.utils.logging import info, warn
+from src.utils.metrics import inc, observe
+
+# Ollama answers these while restarting, loading a model or overloaded
+RETRY_STATUS = {500, 502, 503, 504}
+# Upper bound (seconds) of one backoff sleep
+BACKOFF_MAX = 10.0
+
+
+def _keep_alive(value: str):
+    """KEEP_ALIVE as Ollama expects it: numbers are seconds (-1 = forever), else a duration like "30m"."""
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+class _Slots:
+    """
+    Per-kind concurrency limits. The `priority` kind is admitted first: while
+    any of its requests is waiting for a slot, other kinds do not start new
+    requests, so Ollama's capacity goes to the waiting ones as it frees up.
+    """
+
+    def __init__(self, limits: Dict[str, int], priority: str):
+        self.limits = {kind: max(1, n) for kind, n in limits.items()}
+        self.priority = priority
+        self.active = dict.fromkeys(limits, 0)
+        self.waiting = dict.fromkeys(limits, 0)
+        self._cond = threading.Condition()
+
+    def _admits(self, kind: str) -> bool:
+        if self.active[kind] >= self.limits[kind]:
+            return False
+        return kind == self.priority or self.waiting[self.priority] == 0
+
+    @contextmanager
+    def hold(self, kind: str) -> Iterator[None]:
+        start = time.perf_counter()
+        with self._cond:
+            self.waiting[kind] += 1
+            try:
+                self._cond.wait_for(lambda: self._admits(kind))
+            finally:
+                self.waiting[kind] -= 1
+                # A priority request giving up (or getting in) may unblock others
+                self._cond.notify_all()
+            self.active[kind] += 1
+        observe(f"ollama.{kind}.wait", time.perf_counter() - start)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.active[kind] -= 1
+                self._cond.notify_all()
+
+
+class OllamaClient:
+    """
+    Process-wide HTTP client for the local Ollama server, shared by the
+    generation and embedding wrappers.
+
+    - One pooled keep-alive session for all requests.
+    - Separate limits on concurrent embed and generate requests; queued
+      generation (interactive) is admitted before new embedding batches.
+    - Connection errors and 5xx answers are retried with jittered
+      exponential backoff.
+    - Every request carries `keep_alive` so models stay resident between
+      calls, and `warm_up()` loads the configured models once per process.
+    """
+
+    def __init__(
+        self,
+        base: str | None = None,
+        embed_concurrency: int | None = None,
+        generate_concurrency: int | None = None,
+        retries: int | None = None,
+        backoff: float | None = None,
+        keep_alive: str | None = None,
+    ):
+        self.base = (base or settings.ollama_host).rstrip("/")
+        self.retries = max(0, settings.ollama_retries if retries is None else retries)
+        self.backoff = settings.ollama_backoff if backoff is None else backoff
+        keep_alive = settings.ollama_keep_alive if keep_alive is None else keep_alive
+        self.keep_alive = _keep_alive(keep_alive) if keep_alive else None
+        self.slots = _Slots(
+            {
+                "embed": embed_concurrency or settings.ollama_embed_concurrency,
+                "generate": generate_concurrency or settings.ollama_generate_concurrency,
+            },
+            priority="generate",
+        )
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=sum(self.slots.limits.values()) + 1)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._warmed: set = set()
+        self._warm_lock = threading.Lock()
+
+    @contextmanager
+    def request(
+        self,
+        kind: str,
+        path: str,
+        payload: Dict,
+        target: str,
+        timeout=120,
+        stream: bool = False,
+    ) -> Iterator[requests.Response]:
+        """
+        POSTs `payload` to `path` within a `kind` ("embed" or "generate") slot
+        and yields the response; the slot is held until the block exits, so
+        streamed responses count against the limit while they are read. It is
+        released during retry backoff, so a retrying request does not keep
+        others waiting.
+
+        The response is not checked beyond retrying: callers decide what a
+        4xx means. `target` labels the request counter.
+        """
+        if self.keep_alive is not None:
+            payload = {**payload, "keep_alive": payload.get("keep_alive", self.keep_alive)}
+        attempt = 0
+        while True:
+            with self.slots.hold(kind):
+                resp, reason = self._post(path, payload, target, timeout, stream, last=attempt == self.retries)
+                if resp is not None:
+                    try:
+                        yield resp
+                    finally:
+                        resp.close()
+                    return
+
+            # Full jitter keeps concurrent callers from retrying in lockstep
+            delay = random.uniform(0, min(BACKOFF_MAX, self.backoff * 2 ** attempt))
+            attempt += 1
+            inc("pra_http_retries_total", target=target)
+            warn(f"Ollama {path} failed ({reason}); retry {attempt}/{self.retries} in {delay:.1f}s.")
+            time.sleep(delay)
+
+    def _post(self, path: str, payload: Dict, target: str, timeout, stream: bool, last: bool):
+        """
+        One attempt: (response, None), or (None, reason) when it should be
+        retried. On the `last` attempt the response is returned whatever its
+        status and connection errors are raised.
+        """
+        try:
+            resp = self.session.post(f"{self.base}{path}", json=payload, timeout=timeout, stream=stream)
+        except requests.ConnectionError as e:
+            inc("pra_http_requests_total", target=target, status="error")
+            if last:
+                raise
+            return None, type(e).__name__
+        inc("pra_http_requests_total", target=target, status=resp.status_code)
+        if resp.status_code not in RETRY_STATUS or last:
+            return resp, None
+        resp.close()
+        return None, f"HTTP {resp.status_code}"
+
+    def warm_up(self, gen_model: str | None = None, emb_model: str | None = None, wait: bool = False):
+        """
+        Loads the generation and embedding models (settings defaults) so the
+        first real request does not pay for it. Each model is warmed once per
+        process; runs on a background thread unless `wait` is set. Failures are
+        logged, not raised.
+        """
+        todo = []
+        with self._warm_lock:
+            for kind, model in (("generate", gen_model or settings.gen_model), ("embed", emb_model or settings.emb_model)):
+                if (kind, model) not in self._warmed:
+                    self._warmed.add((kind, model))
+                    todo.append((kind, model))
+        if not todo:
+            return
+
+        def run():
+            for kind, model in todo:
+                start = time.perf_counter()
+                try:
+                    if kind == "generate":
+                        # An empty prompt only loads the model; num_ctx must match later requests
+                        payload = {"model": model, "prompt": "", "stream": False, "options": {"num_ctx": settings.gen_num_ctx}}
+                        path = "/api/generate"
+                    else:
+                        payload, path = {"model": model, "input": ["warm-up"]}, "/api/embed"
+                    with self.request(kind, path, payload, target=f"ollama_{kind}", timeout=(10, 300)) as resp:
+                        resp.raise_for_status()
+                    info(f"Warmed up {model} in {time.perf_counter() - start:.2f}s.")
+                except Exception as e:
+                    warn(f"Ollama warm-up of {model} failed: {e}")
+
+        if wait:
+            run()
+        else:
+            threading.Thread(target=run, name="ollama-warmup", daemon=True).start()
+
+
+_shared: Optional[OllamaClient] = None
+_shared_lock = threading.Lock()
+
+
+def get_ollama_client() -> OllamaClient:
+    """Process-wide client, so every caller shares one pool and one set of limits."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = OllamaClient()
+        return _shared
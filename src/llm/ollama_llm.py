@@ -1,22 +1,87 @@
-import requests
+import json
+import time
+from typing import Dict, Iterator
+
+from src.llm.ollama_client import OllamaClient, get_ollama_client
 from src.utils.config import settings
+from src.utils.logging import info
+from src.utils.metrics import inc, observe
 
 
 class OllamaLLM:
-    def __init__(self, model: str | None = None):
+    def __init__(self, model: str | None = None, num_ctx: int | None = None, client: OllamaClient | None = None):
         self.model = model or settings.gen_model
-        self.base = settings.ollama_host
+        self.client = client or get_ollama_client()
+        # Context window requested from Ollama; prompt budgets are derived from it
+        self.num_ctx = num_ctx or settings.gen_num_ctx
+
+    def generate(self, prompt: str, temperature: float = 0.2, stats: Dict | None = None) -> str:
+        return "".join(self.generate_stream(prompt, temperature=temperature, stats=stats))
+
+    def generate_stream(
+        self,
+        prompt: str,
+        temperature: float = 0.2,
+        stats: Dict | None = None,
+    ) -> Iterator[str]:
+        """
+        Yields response tokens as Ollama produces them.
 
-    def generate(self, prompt: str, temperature: float = 0.2) -> str:
-        resp = requests.post(
-            f"{self.base}/api/generate",
-            json={
+        If `stats` is given it is filled in once generation finishes with
+        `ttft_s` (time to first token), `tokens`, `tokens_per_s` and `total_s`.
+        """
+        start = time.perf_counter()
+        first_token_at = None
+        tokens = 0
+        final: Dict = {}
+
+        with self.client.request(
+            "generate",
+            "/api/generate",
+            {
                 "model": self.model,
                 "prompt": prompt,
-                "temperature": temperature,
-                "stream": False,
+                "stream": True,
+                "options": {"temperature": temperature, "num_ctx": self.num_ctx},
             },
-            timeout=300,
+            target="ollama_generate",
+            # (connect, read) — the read timeout applies between streamed lines
+            timeout=(10, 300),
+            stream=True,
+        ) as resp:
+            resp.raise_for_status()
+            # chunk_size=None hands lines over as they arrive instead of buffering 512 bytes
+            for line in resp.iter_lines(chunk_size=None):
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                token = chunk.get("response", "")
+                if token:
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    tokens += 1
+                    yield token
+                if chunk.get("done"):
+                    final = chunk
+                    break
+
+        total = time.perf_counter() - start
+        ttft = (first_token_at or time.perf_counter()) - start
+        # Prefer Ollama's own counters; fall back to streamed chunk counts
+        eval_count = final.get("eval_count") or tokens
+        eval_secs = (final.get("eval_duration") or 0) / 1e9 or max(total - ttft, 1e-9)
+        result = {
+            "ttft_s": round(ttft, 3),
+            "tokens": eval_count,
+            "tokens_per_s": round(eval_count / eval_secs, 1),
+            "total_s": round(total, 3),
+        }
+        observe("llm.ttft", ttft)
+        observe("llm.generate", total)
+        inc("pra_generated_tokens_total", eval_count)
+        if stats is not None:
+            stats.update(result)
+        info(
+            f"Generation ({self.model}): first token after {result['ttft_s']}s, "
+            f"{result['tokens']} tokens at {result['tokens_per_s']} tok/s."
         )
-        resp.raise_for_status()
-        return resp.json().get("response", "")
\ No newline at end of file
@@ -1,5 +1,6 @@
 import os
 import sys
+import time
 from pathlib import Path
 
 # ---------------------------------------------------------------------
@@ -15,13 +16,15 @@ if str(PROJECT_ROOT) not in sys.path:
 
 # ---------------------------------------------------------------------
 # Imports (after fixing sys.path)
+# Heavy modules (Chroma, trafilatura, the connectors) are imported inside the
+# commands that use them so `--help` and light commands start quickly.
 # ---------------------------------------------------------------------
 import typer
 from rich.console import Console
-from src.agents.orchestrator import Orchestrator
-from src.connectors.arxiv_conn import search_arxiv
-from src.connectors.crossref_conn import search_crossref
+from rich.table import Table
+from src.utils.config import settings
 from src.utils.logging import info
+from src.utils.metrics import metrics
 
 # CLI setup
 app = typer.Typer(add_completion=False)
@@ -32,14 +35,22 @@ console = Console()
 # SEARCH COMMAND
 # ---------------------------------------------------------------------
 @app.command()
-def search(query: str, max_results: int = 20, days: int = 365):
+def search(
+    query: str,
+    max_results: int = 20,
+    days: int = 365,
+    refresh: bool = typer.Option(False, help="Bypass the cached arXiv/Crossref responses."),
+):
     """
     Search papers and articles from arXiv + Crossref.
     Displays metadata but does not summarize.
     """
+    from src.connectors.arxiv_conn import search_arxiv
+    from src.connectors.crossref_conn import search_crossref
+
     info(f"Searching for: {query}")
-    arxiv_results = search_arxiv(query, max_results=max_results, days=days)
-    crossref_results = search_crossref(query, max_results=max_results, days=days)
+    arxiv_results = search_arxiv(query, max_results=max_results, days=days, refresh=refresh)
+    crossref_results = search_crossref(query, max_results=max_results, days=days, refresh=refresh)
 
     combined = arxiv_results + crossref_results
     console.print(f"\n[bold cyan]Found {len(combined)} results[/bold cyan]\n")
@@ -63,22 +74,222 @@ def report(
     days: int = 365,
     top_k: int = 10,
     out: str | None = None,
+    stream: bool = typer.Option(True, help="Print the report live as it is generated."),
+    refresh: bool = typer.Option(False, help="Ignore cached reports and source responses; regenerate."),
+    timings: bool = typer.Option(False, help="Print a per-stage timing summary at the end."),
 ):
     """
     Generate a summarized research report (JSON + Markdown)
     using local Ollama LLM.
     """
+    from src.agents.orchestrator import Orchestrator
+
     info(f"Generating report for: {query}")
     orch = Orchestrator()
-    result = orch.run(query=query, max_results=max_results, days=days, top_k=top_k)
+    before = metrics.snapshot()
+    started = time.perf_counter()
+
+    if stream:
+        parts = []
+        for token in orch.run_stream(
+            query=query, max_results=max_results, days=days, top_k=top_k, use_cache=not refresh
+        ):
+            parts.append(token)
+            sys.stdout.write(token)
+            sys.stdout.flush()
+        sys.stdout.write("\n")
+        result = "".join(parts)
+    else:
+        result = orch.run(query=query, max_results=max_results, days=days, top_k=top_k, use_cache=not refresh)
 
     if out:
         with open(out, "w", encoding="utf-8") as f:
             f.write(result)
         console.print(f"[green]Report saved to:[/green] {out}")
-    else:
+    elif not stream:
         console.print(result)
 
+    # A stale cached report was printed; let its regeneration finish before exiting
+    orch.join_refreshes()
+    if timings:
+        _print_timings(metrics.since(before), time.perf_counter() - started)
+
+
+def _print_timings(delta: dict, wall_s: float):
+    """Stage latencies and counters recorded during one command."""
+    table = Table(title=f"Timings ({wall_s:.2f}s wall clock)")
+    table.add_column("Stage")
+    for col in ("Calls", "Total s", "Mean s", "Max s"):
+        table.add_column(col, justify="right")
+    for name, s in sorted(delta["stages"].items(), key=lambda kv: kv[1]["sum"], reverse=True):
+        table.add_row(name, str(s["count"]), f"{s['sum']:.3f}", f"{s['sum'] / s['count']:.3f}", f"{s['max']:.3f}")
+    console.print(table)
+
+    counters = Table(title="Counters")
+    counters.add_column("Metric")
+    counters.add_column("Value", justify="right")
+    for (name, labels), value in sorted(delta["counters"].items()):
+        label_str = ", ".join(f"{k}={v}" for k, v in labels)
+        counters.add_row(f"{name}{{{label_str}}}" if label_str else name, f"{value:,.0f}")
+    console.print(counters)
+
+
+# ---------------------------------------------------------------------
+# REPORT-BATCH COMMAND
+# ---------------------------------------------------------------------
+@app.command("report-batch")
+def report_batch(
+    queries_file: Path = typer.Option(..., help="One query per line; blank lines and # comments are skipped."),
+    max_results: int = 20,
+    days: int = 365,
+    top_k: int = 10,
+    out_dir: Path | None = typer.Option(None, help="Write each report to <out-dir>/<query-slug>.json."),
+    concurrency: int = typer.Option(settings.batch_summarize_concurrency, help="Reports generated at once."),
+    refresh: bool = typer.Option(False, help="Ignore cached reports and source responses; regenerate."),
+    timings: bool = typer.Option(False, help="Print a per-stage timing summary at the end."),
+):
+    """
+    Generate reports for many related queries, sharing harvesting, ingestion
+    and query embedding across them. Reports are printed as they finish.
+    """
+    from src.agents.orchestrator import Orchestrator
+
+    if not queries_file.exists():
+        raise typer.BadParameter(f"{queries_file} does not exist.", param_hint="--queries-file")
+    lines = queries_file.read_text(encoding="utf-8").splitlines()
+    queries = [q.strip() for q in lines if q.strip() and not q.lstrip().startswith("#")]
+    if not queries:
+        raise typer.BadParameter(f"{queries_file} has no queries.", param_hint="--queries-file")
+    if out_dir:
+        out_dir.mkdir(parents=True, exist_ok=True)
+
+    info(f"Generating {len(queries)} reports from {queries_file}")
+    orch = Orchestrator()
+    before = metrics.snapshot()
+    started = time.perf_counter()
+    failed = 0
+    for n, result in enumerate(
+        orch.run_batch(
+            queries, max_results=max_results, days=days, top_k=top_k, use_cache=not refresh, concurrency=concurrency
+        ),
+        1,
+    ):
+        query = result["query"]
+        if "error" in result:
+            failed += 1
+            console.print(f"[red]({n}/{len(queries)}) {query}: failed — {result['error']}[/red]")
+            continue
+        console.print(f"[bold cyan]({n}/{len(queries)}) {query}[/bold cyan]{' (cached)' if result['cached'] else ''}")
+        if out_dir:
+            path = out_dir / f"{_slug(query)}.json"
+            path.write_text(result["report"], encoding="utf-8")
+            console.print(f"[green]Report saved to:[/green] {path}")
+        else:
+            console.print(result["report"])
+
+    console.print(f"[green]{len(queries) - failed} reports done[/green]" + (f", [red]{failed} failed[/red]" if failed else ""))
+    orch.join_refreshes()
+    if timings:
+        _print_timings(metrics.since(before), time.perf_counter() - started)
+    if failed:
+        raise typer.Exit(1)
+
+
+def _slug(text: str, max_len: int = 80) -> str:
+    return "-".join("".join(c if c.isalnum() else " " for c in text.lower()).split())[:max_len] or "report"
+
+
+# ---------------------------------------------------------------------
+# INGEST COMMAND
+# ---------------------------------------------------------------------
+@app.command()
+def ingest(
+    path: Path,
+    fmt: str = typer.Option("auto", "--format", help="jsonl, arxiv (metadata snapshot) or auto-detect."),
+    collection: str = "papers",
+    batch_docs: int = typer.Option(settings.ingest_batch_docs, help="Records per processing batch."),
+    upsert_batch: int = typer.Option(settings.ingest_upsert_batch, help="Chunks per vector store upsert."),
+    workers: int = typer.Option(settings.ingest_workers, help="Processes for parsing and chunking."),
+    limit: int = typer.Option(0, help="Stop after this many records (0 = all)."),
+    restart: bool = typer.Option(False, help="Ignore the saved checkpoint and start from the beginning."),
+):
+    """
+    Bulk-load papers from a JSONL or arXiv metadata dump (.gz supported)
+    into the vector store. Interrupted runs resume from their checkpoint.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from src.retrieval.bulk_ingest import bulk_ingest
+    from src.retrieval.indexer import Indexer
+    from src.retrieval.vector_store import VectorStore
+
+    if not path.exists():
+        raise typer.BadParameter(f"{path} does not exist.", param_hint="PATH")
+
+    # Start the workers before Chroma and the embedding client spin up threads
+    pool = ProcessPoolExecutor(max_workers=max(1, workers))
+    pool.submit(len, b"").result()
+    try:
+        indexer = Indexer(VectorStore(collection))
+        counts = bulk_ingest(
+            path, indexer, pool, fmt=fmt, batch_docs=batch_docs, upsert_batch=upsert_batch,
+            max_pending=2 * max(1, workers), restart=restart, limit=limit,
+        )
+    except KeyboardInterrupt:
+        raise typer.Exit(130)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    console.print(
+        f"[green]Ingest complete:[/green] {counts['new']:,} new, {counts['updated']:,} updated, "
+        f"{counts['skipped']:,} skipped, {counts['rejected']:,} rejected."
+    )
+
+
+# ---------------------------------------------------------------------
+# COMPACT COMMAND
+# ---------------------------------------------------------------------
+@app.command()
+def compact(
+    older_than_days: int = typer.Option(settings.index_retention_days, help="Retention window in days."),
+    collection: str = "papers",
+    archive: bool = typer.Option(True, help="Save expired documents to ARCHIVE_DIR (re-loadable with `ingest`)."),
+    dry_run: bool = typer.Option(False, help="Only report what would be removed."),
+):
+    """
+    Remove chunks published before the retention window from the vector
+    store and lexical index, then reclaim the space they used.
+    """
+    from src.retrieval.indexer import Indexer
+    from src.retrieval.vector_store import VectorStore
+
+    if older_than_days <= 0:
+        raise typer.BadParameter("must be positive.", param_hint="--older-than-days")
+    indexer = Indexer(VectorStore(collection))
+    result = indexer.expire(
+        time.time() - older_than_days * 86400,
+        archive_dir=settings.archive_dir if archive else None,
+        dry_run=dry_run,
+    )
+
+    verb = "Would remove" if dry_run else "Removed"
+    console.print(
+        f"[green]{verb}[/green] {result['chunks']:,} chunks from {result['documents']:,} documents "
+        f"published more than {older_than_days} days ago."
+    )
+    if result["archive"]:
+        console.print(f"[green]Archived to:[/green] {result['archive']}")
+    if not dry_run and result["chunks"] and not indexer.store.backend.supports_vacuum:
+        console.print(
+            f"[yellow]Vacuum is not supported for the {indexer.store.backend_name} backend:[/yellow] "
+            "the freed space is reused for later inserts but not returned to disk."
+        )
+    elif not dry_run and result["chunks"]:
+        before, after = result["bytes_before"], result["bytes_after"]
+        console.print(
+            f"Index size: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB "
+            f"(reclaimed {max(0, before - after) / 1e6:.1f} MB)"
+        )
+
 
 # ---------------------------------------------------------------------
 # API COMMAND
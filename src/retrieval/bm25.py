@@ -0,0 +1,146 @@
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+# Keeps identifiers such as "gpt-4", "resnet-50" or "bert_base" as single terms
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-_.][a-z0-9]+)*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were "
+    "which with we our their these those can using based via".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+class BM25Index:
+    """
+    Incremental BM25 inverted index persisted in SQLite, one logical index per
+    collection. Chunks are added, replaced and deleted by id alongside the
+    vector store, so lexical search needs no embedding model.
+    """
+
+    def __init__(self, path: str, k1: float = 1.5, b: float = 0.75):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS chunks (
+                collection TEXT NOT NULL,
+                chunk_id TEXT NOT NULL,
+                length INTEGER NOT NULL,
+                PRIMARY KEY (collection, chunk_id)
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                collection TEXT NOT NULL,
+                term TEXT NOT NULL,
+                chunk_id TEXT NOT NULL,
+                tf INTEGER NOT NULL,
+                PRIMARY KEY (collection, term, chunk_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_postings_chunk ON postings(collection, chunk_id);
+            CREATE TABLE IF NOT EXISTS collection_stats (
+                collection TEXT PRIMARY KEY,
+                n_chunks INTEGER NOT NULL,
+                total_length INTEGER NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+
+    def count(self, collection: str) -> int:
+        with self._lock:
+            return self._stats(collection)[0]
+
+    def upsert(self, collection: str, ids: Sequence[str], texts: Sequence[str]):
+        with self._lock:
+            self._delete(collection, ids)
+            postings = []
+            chunks = []
+            for chunk_id, text in zip(ids, texts):
+                terms = tokenize(text)
+                chunks.append((collection, chunk_id, len(terms)))
+                postings.extend((collection, term, chunk_id, tf) for term, tf in Counter(terms).items())
+            self._conn.executemany("INSERT INTO chunks VALUES (?, ?, ?)", chunks)
+            self._conn.executemany("INSERT INTO postings VALUES (?, ?, ?, ?)", postings)
+            self._adjust_stats(collection, len(chunks), sum(c[2] for c in chunks))
+            self._conn.commit()
+
+    def delete(self, collection: str, ids: Sequence[str]):
+        with self._lock:
+            self._delete(collection, ids)
+            self._conn.commit()
+
+    def vacuum(self):
+        """Rebuilds the database file so pages freed by deletes are returned to the filesystem."""
+        with self._lock:
+            self._conn.execute("VACUUM")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def disk_bytes(self) -> int:
+        return sum(p.stat().st_size for p in Path(self.path).parent.glob(Path(self.path).name + "*"))
+
+    def search(self, collection: str, query: str, k: int) -> List[Tuple[str, float]]:
+        """Returns up to k (chunk_id, score) pairs, best first."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        with self._lock:
+            n_chunks, total_length = self._stats(collection)
+            if not n_chunks:
+                return []
+            avg_len = total_length / n_chunks
+            scores: Dict[str, float] = {}
+            for term in terms:
+                rows = self._conn.execute(
+                    "SELECT p.chunk_id, p.tf, c.length FROM postings p "
+                    "JOIN chunks c ON c.collection = p.collection AND c.chunk_id = p.chunk_id "
+                    "WHERE p.collection = ? AND p.term = ?",
+                    (collection, term),
+                ).fetchall()
+                if not rows:
+                    continue
+                idf = math.log(1 + (n_chunks - len(rows) + 0.5) / (len(rows) + 0.5))
+                for chunk_id, tf, length in rows:
+                    norm = tf + self.k1 * (1 - self.b + self.b * length / avg_len)
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+        return sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:k]
+
+    def _delete(self, collection: str, ids: Sequence[str]):
+        removed, removed_len = 0, 0
+        for chunk_id in ids:
+            row = self._conn.execute(
+                "SELECT length FROM chunks WHERE collection = ? AND chunk_id = ?", (collection, chunk_id)
+            ).fetchone()
+            if row is None:
+                continue
+            self._conn.execute("DELETE FROM chunks WHERE collection = ? AND chunk_id = ?", (collection, chunk_id))
+            self._conn.execute("DELETE FROM postings WHERE collection = ? AND chunk_id = ?", (collection, chunk_id))
+            removed += 1
+            removed_len += row[0]
+        if removed:
+            self._adjust_stats(collection, -removed, -removed_len)
+
+    def _stats(self, collection: str) -> Tuple[int, int]:
+        row = self._conn.execute(
+            "SELECT n_chunks, total_length FROM collection_stats WHERE collection = ?", (collection,)
+        ).fetchone()
+        return row if row else (0, 0)
+
+    def _adjust_stats(self, collection: str, d_chunks: int, d_length: int):
+        self._conn.execute(
+            "INSERT INTO collection_stats (collection, n_chunks, total_length) VALUES (?, ?, ?) "
+            "ON CONFLICT(collection) DO UPDATE SET n_chunks = n_chunks + excluded.n_chunks, "
+            "total_length = total_length + excluded.total_length",
+            (collection, d_chunks, d_length),
+        )
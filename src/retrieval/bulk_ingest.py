@@ -0,0 +1,209 @@
+import gzip
+import hashlib
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from src.retrieval.indexer import Indexer, document_hash
+from src.utils.logging import info, warn
+from src.utils.text import chunk_document
+
+FORMATS = ("auto", "jsonl", "arxiv")
+# Bytes of the input hashed to recognise the same file when resuming
+_FINGERPRINT_BYTES = 64 * 1024
+
+
+def open_records(path: Path) -> BinaryIO:
+    """Opens a JSONL (optionally .gz) file for binary line reading."""
+    return gzip.open(path, "rb") if path.suffix == ".gz" else open(path, "rb")
+
+
+def file_fingerprint(path: Path) -> str:
+    with open_records(path) as f:
+        return hashlib.sha256(f.read(_FINGERPRINT_BYTES)).hexdigest()
+
+
+def _arxiv_date(value: str) -> Optional[str]:
+    try:
+        return parsedate_to_datetime(value).isoformat()
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_record(obj: Dict, fmt: str = "auto") -> Optional[Dict]:
+    """
+    Maps one input record to the item shape the connectors produce.
+
+    "arxiv" is the arXiv metadata snapshot (one JSON object per line with
+    `id`, `abstract`, `versions`, ...); ids match the arXiv connector's
+    (`http://arxiv.org/abs/<id><latest version>`) so both paths share manifest
+    entries. "jsonl" takes id/url, title, text/summary/abstract, url, pdf_url,
+    published, source and type. Records without text are dropped.
+    """
+    if fmt == "auto":
+        fmt = "arxiv" if "abstract" in obj and "versions" in obj else "jsonl"
+
+    if fmt == "arxiv":
+        versions = obj.get("versions") or []
+        latest = versions[-1]["version"] if versions else ""
+        abs_id = f"{obj['id']}{latest}"
+        published = _arxiv_date(versions[0].get("created")) if versions else None
+        item = {
+            "id": f"http://arxiv.org/abs/{abs_id}",
+            "title": " ".join((obj.get("title") or "").split()),
+            "url": f"http://arxiv.org/abs/{abs_id}",
+            "pdf_url": f"http://arxiv.org/pdf/{abs_id}",
+            "published": published or obj.get("update_date"),
+            "summary": (obj.get("abstract") or "").strip(),
+            "source": "arxiv",
+            "type": "preprint",
+        }
+    else:
+        item = {
+            "id": obj.get("id") or obj.get("doc_id") or obj.get("url"),
+            "title": obj.get("title"),
+            "url": obj.get("url"),
+            "pdf_url": obj.get("pdf_url"),
+            "published": obj.get("published"),
+            "summary": obj.get("text") or obj.get("summary") or obj.get("abstract") or "",
+            "source": obj.get("source") or "jsonl",
+            "type": obj.get("type"),
+        }
+
+    if not item["summary"] or not (item["id"] or item["title"]):
+        return None
+    return item
+
+
+def _prepare_batch(
+    lines: List[bytes], fmt: str, chunk_tokens: int, overlap_tokens: int
+) -> Tuple[List[Dict], int]:
+    """
+    Worker-process stage: parse, clean/hash and chunk a batch of input lines.
+
+    Returns:
+        Tuple[List[Dict], int]: prepared documents for `Indexer.add_prepared`,
+        and the number of lines that could not be used.
+    """
+    docs, rejected = [], 0
+    for line in lines:
+        try:
+            item = normalize_record(json.loads(line), fmt)
+        except (ValueError, KeyError, TypeError, IndexError):
+            item = None
+        if item is None:
+            rejected += 1
+            continue
+        text = item["summary"]
+        docs.append({
+            "doc_id": str(item["id"] or item["title"])[:128],
+            "digest": document_hash(text, chunk_tokens, overlap_tokens),
+            "chunks": chunk_document(text, chunk_tokens, overlap_tokens),
+            "meta": {k: item[k] for k in ("title", "url", "pdf_url", "published", "source", "type")},
+        })
+    return docs, rejected
+
+
+def _read_batches(f: BinaryIO, offset: int, batch_docs: int, limit: int) -> Iterator[Tuple[int, List[bytes]]]:
+    """Yields (offset after the batch, non-empty lines) from `offset` on."""
+    if offset:
+        f.seek(offset)
+    batch: List[bytes] = []
+    read = 0
+    for line in f:
+        offset += len(line)
+        if line.strip():
+            batch.append(line)
+            read += 1
+        if len(batch) >= batch_docs or (limit and read >= limit):
+            yield offset, batch
+            batch = []
+            if limit and read >= limit:
+                return
+    if batch:
+        yield offset, batch
+
+
+def bulk_ingest(
+    path: Path,
+    indexer: Indexer,
+    pool: ProcessPoolExecutor,
+    fmt: str = "auto",
+    batch_docs: int = 256,
+    upsert_batch: int = 1000,
+    max_pending: int = 4,
+    restart: bool = False,
+    limit: int = 0,
+) -> Dict[str, int]:
+    """
+    Streams records from `path` through parse → clean/hash → chunk (in `pool`)
+    → embed → upsert (batched `col.upsert` calls via the indexer).
+
+    At most `max_pending` batches are in flight, so memory stays bounded by
+    the batch size rather than the input size. After each batch is committed
+    the input offset is checkpointed in the manifest; a later run on the same
+    file resumes from there unless `restart` is set. `limit` caps the records
+    read in this run (0 = all).
+
+    Returns:
+        Dict[str, int]: counts of "new", "updated", "skipped" and "rejected" records.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {', '.join(FORMATS)}.")
+    path = Path(path).resolve()
+    manifest = indexer.manifest
+    key = f"{indexer.store.name}|{path}"
+    fingerprint = file_fingerprint(path)
+
+    counts = {"new": 0, "updated": 0, "skipped": 0, "rejected": 0}
+    offset = 0
+    checkpoint = None if restart else manifest.get_checkpoint(key)
+    if checkpoint and checkpoint["fingerprint"] == fingerprint:
+        offset = checkpoint["offset"]
+        counts.update(checkpoint["stats"])
+        info(f"Resuming {path.name} at byte {offset:,} ({sum(counts.values()):,} records done).")
+    elif checkpoint:
+        warn(f"{path.name} changed since the last checkpoint; starting over (unchanged documents are still skipped).")
+
+    start = time.perf_counter()
+    done_here = 0
+    pending: List[Tuple[int, int, object]] = []
+
+    def commit(end_offset: int, n_lines: int, fut):
+        nonlocal done_here
+        docs, rejected = fut.result()
+        status = indexer.add_prepared(docs, upsert_batch)
+        for k, v in status.items():
+            counts[k] += v
+        counts["rejected"] += rejected
+        if status["new"] or status["updated"]:
+            indexer.bump_corpus_version()
+        manifest.put_checkpoint(key, end_offset, fingerprint, counts)
+        done_here += n_lines
+        rate = done_here / max(time.perf_counter() - start, 1e-9)
+        info(
+            f"Ingested {sum(counts.values()):,} records ({counts['new']:,} new, {counts['updated']:,} updated, "
+            f"{counts['skipped']:,} skipped, {counts['rejected']:,} rejected) — {rate:,.0f} records/s."
+        )
+
+    with open_records(path) as f:
+        try:
+            for end_offset, lines in _read_batches(f, offset, max(1, batch_docs), limit):
+                fut = pool.submit(_prepare_batch, lines, fmt, indexer.chunk_tokens, indexer.overlap_tokens)
+                pending.append((end_offset, len(lines), fut))
+                # Commit in input order so the checkpoint offset only moves forward
+                while len(pending) >= max(1, max_pending):
+                    commit(*pending.pop(0))
+            while pending:
+                commit(*pending.pop(0))
+        except KeyboardInterrupt:
+            for _, _, fut in pending:
+                fut.cancel()
+            warn("Interrupted; rerun the same command to resume from the last checkpoint.")
+            raise
+
+    info(f"Bulk ingest of {path.name} finished in {time.perf_counter() - start:.1f}s.")
+    return counts
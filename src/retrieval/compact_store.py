@@ -0,0 +1,415 @@
+import json
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+DTYPES = ("float16", "int8")
+# Metadata key mirrored into an indexed column so queries can filter on it
+TIME_KEY = "published_ts"
+# In-memory stand-in for a missing TIME_KEY; fails every `since` filter
+_NO_TS = np.iinfo(np.int64).min
+# Rows added to the matrix file at a time when it fills up
+_GROW_ROWS = 4096
+
+
+class CompactIndex:
+    """
+    Compact on-disk vector index: one memory-mapped embedding matrix per
+    collection (float16, or int8 with a per-row scale), plus a SQLite sidecar
+    holding ids, documents and metadata.
+
+    Vectors are L2-normalized on insert and searched exhaustively with blocked
+    matrix-vector products spread over a thread pool (NumPy releases the GIL);
+    at our corpus sizes that is milliseconds per query and needs no index build. Distances are squared L2 between unit vectors (2 - 2·cos), so
+    they rank like Chroma's default "l2" space.
+
+    Opening only reads the id → row map and the TIME_KEY column; the matrix is
+    paged in on demand. Deleted rows are tombstoned and reused by later inserts
+    until `vacuum()` rewrites the files without them. The sidecar names the
+    matrix files in use, so a rewrite takes effect in the same transaction as
+    the row renumbering.
+    """
+
+    def __init__(self, root: str, dtype: str = "float16", block_rows: int = 4096, threads: int = 0):
+        if dtype not in DTYPES:
+            raise ValueError(f"Unknown compact dtype {dtype!r}; expected one of {', '.join(DTYPES)}.")
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.block_rows = max(256, block_rows)
+        self.threads = threads or os.cpu_count() or 1
+        self._lock = threading.RLock()
+        self._pool = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="compact")
+
+        self._conn = sqlite3.connect(str(self.root / "meta.sqlite3"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS info (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS rows (
+                row INTEGER PRIMARY KEY,
+                id TEXT UNIQUE,
+                document TEXT,
+                metadata TEXT,
+                ts INTEGER
+            )
+            """
+        )
+        # Indexes created before the TIME_KEY column get it (empty) on open
+        columns = {r[1] for r in self._conn.execute("PRAGMA table_info(rows)")}
+        if "ts" not in columns:
+            self._conn.execute("ALTER TABLE rows ADD COLUMN ts INTEGER")
+        self._conn.commit()
+        info = dict(self._conn.execute("SELECT key, value FROM info").fetchall())
+        # An existing index keeps the dtype it was created with
+        self.dtype = info.get("dtype", dtype)
+        self.dim = int(info["dim"]) if "dim" in info else None
+        self._matrix_name = info.get("matrix", f"vectors.{self.dtype}")
+        self._scales_name = info.get("scales", "scales.float32")
+        self._generation = int(info.get("generation", 0))
+        self._remove_stale_files()
+
+        self._row_of: Dict[str, int] = {}
+        self._free: List[int] = []
+        stamps: Dict[int, int] = {}
+        n_rows = 0
+        for row, doc_id, ts in self._conn.execute("SELECT row, id, ts FROM rows"):
+            n_rows = max(n_rows, row + 1)
+            if doc_id is None:
+                self._free.append(row)
+            else:
+                self._row_of[doc_id] = row
+                if ts is not None:
+                    stamps[row] = ts
+        self._n_rows = n_rows
+        self._alive = np.zeros(0, dtype=bool)
+        self._ts = np.zeros(0, dtype=np.int64)
+        self._vectors = None
+        self._scales = None
+        if self.dim is not None:
+            self._open_matrix()
+            if stamps:
+                self._ts[np.fromiter(stamps.keys(), dtype=np.int64)] = np.fromiter(stamps.values(), dtype=np.int64)
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+    @property
+    def _matrix_path(self) -> Path:
+        return self.root / self._matrix_name
+
+    @property
+    def _scales_path(self) -> Path:
+        return self.root / self._scales_name
+
+    def _remove_stale_files(self):
+        """Drops matrix files the sidecar does not name: left over by a vacuum that was interrupted."""
+        for path in [*self.root.glob("vectors.*"), *self.root.glob("scales.*")]:
+            if path.name not in (self._matrix_name, self._scales_name):
+                path.unlink()
+
+    def _capacity(self) -> int:
+        return 0 if self._vectors is None else self._vectors.shape[0]
+
+    def _open_matrix(self, capacity: int | None = None):
+        """(Re)maps the matrix files, growing them to at least `capacity` rows."""
+        itemsize = np.dtype(self.dtype).itemsize
+        path = self._matrix_path
+        have = path.stat().st_size // (self.dim * itemsize) if path.exists() else 0
+        rows = max(have, capacity or 0, self._n_rows, 1)
+        if rows > have:
+            with open(path, "ab") as f:
+                f.truncate(rows * self.dim * itemsize)
+        if self._vectors is not None:
+            self._vectors.flush()
+        self._vectors = np.memmap(path, dtype=self.dtype, mode="r+", shape=(rows, self.dim))
+        if self.dtype == "int8":
+            scale_path = self._scales_path
+            if not scale_path.exists() or scale_path.stat().st_size < rows * 4:
+                with open(scale_path, "ab") as f:
+                    f.truncate(rows * 4)
+            self._scales = np.memmap(scale_path, dtype=np.float32, mode="r+", shape=(rows,))
+        alive = np.zeros(rows, dtype=bool)
+        if self._row_of:
+            alive[np.fromiter(self._row_of.values(), dtype=np.int64)] = True
+        self._alive = alive
+        ts = np.full(rows, _NO_TS, dtype=np.int64)
+        keep = min(rows, len(self._ts))
+        ts[:keep] = self._ts[:keep]
+        self._ts = ts
+
+    def _encode(self, rows: np.ndarray, vectors: np.ndarray):
+        if self.dtype == "int8":
+            scale = np.abs(vectors).max(axis=1) / 127.0
+            scale[scale == 0] = 1.0
+            self._vectors[rows] = np.round(vectors / scale[:, None]).astype(np.int8)
+            self._scales[rows] = scale
+        else:
+            self._vectors[rows] = vectors.astype(np.float16)
+
+    def _decode(self, rows: Sequence[int]) -> np.ndarray:
+        rows = np.asarray(rows, dtype=np.int64)
+        out = np.asarray(self._vectors[rows], dtype=np.float32)
+        if self.dtype == "int8":
+            out *= self._scales[rows][:, None]
+        return out
+
+    # ------------------------------------------------------------------
+    # Collection operations
+    # ------------------------------------------------------------------
+    def count(self) -> int:
+        return len(self._row_of)
+
+    def upsert(self, ids: Sequence[str], embeddings, documents: Sequence[str], metadatas: Sequence[Dict]):
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError("upsert needs one embedding per id")
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1.0, norms)
+
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO info (key, value) VALUES (?, ?)",
+                    [("dim", str(self.dim)), ("dtype", self.dtype)],
+                )
+                self._open_matrix(_GROW_ROWS)
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"embedding dimension {vectors.shape[1]} does not match the index ({self.dim})")
+
+            # Last occurrence wins for ids repeated within one call
+            latest = {doc_id: i for i, doc_id in enumerate(ids)}
+            rows = []
+            for doc_id in latest:
+                row = self._row_of.get(doc_id)
+                if row is None:
+                    if self._free:
+                        row = self._free.pop()
+                    else:
+                        row = self._n_rows
+                        self._n_rows += 1
+                    self._row_of[doc_id] = row
+                rows.append(row)
+            if self._n_rows > self._capacity():
+                self._open_matrix(self._n_rows + _GROW_ROWS)
+
+            order = list(latest.values())
+            rows_arr = np.asarray(rows, dtype=np.int64)
+            self._encode(rows_arr, vectors[order])
+            self._alive[rows_arr] = True
+            stamps = [_timestamp(metadatas[i] if metadatas else None) for i in order]
+            self._ts[rows_arr] = [_NO_TS if t is None else t for t in stamps]
+            self._vectors.flush()
+            if self._scales is not None:
+                self._scales.flush()
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO rows (row, id, document, metadata, ts) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (row, doc_id, documents[i], json.dumps(metadatas[i] if metadatas else None), ts)
+                    for row, (doc_id, i), ts in zip(rows, latest.items(), stamps)
+                ],
+            )
+            self._conn.commit()
+
+    def delete(self, ids: Sequence[str]):
+        with self._lock:
+            rows = [self._row_of.pop(doc_id) for doc_id in ids if doc_id in self._row_of]
+            if not rows:
+                return
+            self._alive[rows] = False
+            self._ts[rows] = _NO_TS
+            self._free.extend(rows)
+            self._conn.executemany(
+                "UPDATE rows SET id = NULL, document = NULL, metadata = NULL, ts = NULL WHERE row = ?",
+                [(r,) for r in rows],
+            )
+            self._conn.commit()
+
+    def update_metadata(self, ids: Sequence[str], metadatas: Sequence[Dict]):
+        """Replaces the metadata of existing ids (unknown ids are ignored)."""
+        with self._lock:
+            updates = []
+            for doc_id, meta in zip(ids, metadatas):
+                row = self._row_of.get(doc_id)
+                if row is None:
+                    continue
+                ts = _timestamp(meta)
+                self._ts[row] = _NO_TS if ts is None else ts
+                updates.append((json.dumps(meta), ts, row))
+            self._conn.executemany("UPDATE rows SET metadata = ?, ts = ? WHERE row = ?", updates)
+            self._conn.commit()
+
+    def ids_older_than(self, ts: int) -> List[str]:
+        """Ids whose TIME_KEY is before `ts` (rows without one are not included)."""
+        with self._lock:
+            return [r[0] for r in self._conn.execute("SELECT id FROM rows WHERE id IS NOT NULL AND ts < ?", (ts,))]
+
+    def _records(self, rows: Sequence[int]) -> Dict[int, Tuple[str, str, Dict]]:
+        records = {}
+        rows = list(rows)
+        for i in range(0, len(rows), 900):
+            part = rows[i:i + 900]
+            marks = ",".join("?" * len(part))
+            for row, doc_id, doc, meta in self._conn.execute(
+                f"SELECT row, id, document, metadata FROM rows WHERE row IN ({marks})", part
+            ):
+                records[row] = (doc_id, doc, json.loads(meta) if meta else None)
+        return records
+
+    def get(self, ids: Sequence[str], include_embeddings: bool = False) -> Dict:
+        with self._lock:
+            rows = [self._row_of[doc_id] for doc_id in dict.fromkeys(ids) if doc_id in self._row_of]
+            records = self._records(rows)
+            out = {
+                "ids": [records[r][0] for r in rows],
+                "documents": [records[r][1] for r in rows],
+                "metadatas": [records[r][2] for r in rows],
+            }
+            if include_embeddings:
+                out["embeddings"] = self._decode(rows) if rows else np.zeros((0, self.dim or 0), dtype=np.float32)
+            return out
+
+    def iter_documents(self, batch_size: int = 1000) -> Iterator[Tuple[List[str], List[str]]]:
+        """Yields (ids, documents) pages over the whole collection."""
+        last = -1
+        while True:
+            with self._lock:
+                page = self._conn.execute(
+                    "SELECT row, id, document FROM rows WHERE row > ? AND id IS NOT NULL ORDER BY row LIMIT ?",
+                    (last, batch_size),
+                ).fetchall()
+            if not page:
+                break
+            last = page[-1][0]
+            yield [r[1] for r in page], [r[2] for r in page]
+
+    def iter_metadatas(self, batch_size: int = 1000) -> Iterator[Tuple[List[str], List[Dict]]]:
+        """Yields (ids, metadatas) pages over the whole collection."""
+        last = -1
+        while True:
+            with self._lock:
+                page = self._conn.execute(
+                    "SELECT row, id, metadata FROM rows WHERE row > ? AND id IS NOT NULL ORDER BY row LIMIT ?",
+                    (last, batch_size),
+                ).fetchall()
+            if not page:
+                break
+            last = page[-1][0]
+            yield [r[1] for r in page], [json.loads(r[2]) if r[2] else None for r in page]
+
+    def query(self, embedding, k: int = 8, include_embeddings: bool = False, since: int | None = None) -> Dict:
+        """
+        Top-k rows by cosine similarity, in Chroma's query result shape. With
+        `since`, only rows whose TIME_KEY is at least `since` are candidates.
+        """
+        with self._lock:
+            n = self._n_rows
+            if not self._row_of or n == 0:
+                out = {"ids": [[]], "documents": [[]], "metadatas": [[]], "distances": [[]]}
+                if include_embeddings:
+                    out["embeddings"] = [np.zeros((0, self.dim or 0), dtype=np.float32)]
+                return out
+
+            q = np.asarray(embedding, dtype=np.float32).reshape(-1)
+            q = q / (np.linalg.norm(q) or 1.0)
+            k = max(1, min(k, len(self._row_of)))
+            blocks = [(s, min(s + self.block_rows, n)) for s in range(0, n, self.block_rows)]
+
+            def top_block(bounds: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray]:
+                start, end = bounds
+                scores = np.asarray(self._vectors[start:end], dtype=np.float32) @ q
+                if self._scales is not None:
+                    scores *= self._scales[start:end]
+                skip = ~self._alive[start:end]
+                if since is not None:
+                    skip |= self._ts[start:end] < since
+                scores[skip] = -np.inf
+                take = min(k, len(scores))
+                idx = np.argpartition(-scores, take - 1)[:take]
+                return idx + start, scores[idx]
+
+            parts = list(self._pool.map(top_block, blocks)) if len(blocks) > 1 else [top_block(blocks[0])]
+            rows = np.concatenate([p[0] for p in parts])
+            scores = np.concatenate([p[1] for p in parts])
+            best = np.argsort(-scores, kind="stable")[:k]
+            rows, scores = rows[best], scores[best]
+            keep = np.isfinite(scores)
+            rows, scores = rows[keep].tolist(), scores[keep]
+
+            records = self._records(rows)
+            out = {
+                "ids": [[records[r][0] for r in rows]],
+                "documents": [[records[r][1] for r in rows]],
+                "metadatas": [[records[r][2] for r in rows]],
+                "distances": [np.maximum(0.0, 2.0 - 2.0 * scores).tolist()],
+            }
+            if include_embeddings:
+                out["embeddings"] = [self._decode(rows)]
+            return out
+
+    def vacuum(self):
+        """
+        Rewrites the matrix files and the sidecar without tombstoned rows, so
+        space freed by deletes goes back to the filesystem.
+
+        The compacted matrix is written under new names, which the sidecar
+        switches to in the transaction that renumbers the rows; the old files
+        are removed after the commit. A crash at any point leaves either the
+        old files and numbering or the new ones, never a mix.
+        """
+        with self._lock:
+            if self.dim is None:
+                return
+            live = sorted(self._row_of.values())
+            if len(live) == self._n_rows and self._capacity() <= self._n_rows + _GROW_ROWS:
+                return
+            old_rows = np.asarray(live, dtype=np.int64)
+            generation = self._generation + 1
+            matrix_name = f"vectors.{self.dtype}.{generation}"
+            scales_name = f"scales.float32.{generation}"
+
+            out = np.memmap(self.root / matrix_name, dtype=self.dtype, mode="w+", shape=(max(1, len(live)), self.dim))
+            for i in range(0, len(live), self.block_rows):
+                out[i:i + self.block_rows] = self._vectors[old_rows[i:i + self.block_rows]]
+            out.flush()
+            del out
+            if self._scales is not None:
+                out = np.memmap(self.root / scales_name, dtype=np.float32, mode="w+", shape=(max(1, len(live)),))
+                out[: len(live)] = self._scales[old_rows]
+                out.flush()
+                del out
+            ts = self._ts[old_rows].copy()
+
+            new_of = {old: new for new, old in enumerate(live)}
+            self._conn.execute("DELETE FROM rows WHERE id IS NULL")
+            # Renumber in ascending order so no new row number collides with an unmoved one
+            self._conn.executemany("UPDATE rows SET row = ? WHERE row = ?", [(new_of[o], o) for o in live if new_of[o] != o])
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO info (key, value) VALUES (?, ?)",
+                [("matrix", matrix_name), ("scales", scales_name), ("generation", str(generation))],
+            )
+            self._conn.commit()
+            self._conn.execute("VACUUM")
+
+            self._vectors = None
+            self._scales = None
+            self._matrix_name, self._scales_name, self._generation = matrix_name, scales_name, generation
+            self._remove_stale_files()
+            self._row_of = {doc_id: new_of[row] for doc_id, row in self._row_of.items()}
+            self._free = []
+            self._n_rows = len(live)
+            self._ts = ts
+            self._open_matrix()
+
+    def disk_bytes(self) -> int:
+        return sum(p.stat().st_size for p in self.root.iterdir() if p.is_file())
+
+
+def _timestamp(meta: Dict | None) -> int | None:
+    value = (meta or {}).get(TIME_KEY)
+    return int(value) if isinstance(value, (int, float)) else None
@@ -0,0 +1,79 @@
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+
+def mmr_select(
+    embeddings: Optional[np.ndarray],
+    relevance: np.ndarray,
+    k: int,
+    lambda_: float = 0.7,
+    groups: Optional[Sequence[str]] = None,
+    max_per_group: int = 0,
+) -> List[int]:
+    """
+    Maximal marginal relevance selection over candidate rows.
+
+    Each step picks the candidate maximizing
+        lambda_ * relevance - (1 - lambda_) * max cosine similarity to the picks so far,
+    skipping candidates whose group (e.g. source document) already has
+    `max_per_group` picks. Without embeddings only the group cap is applied,
+    in relevance order.
+
+    Args:
+        embeddings: (n, d) candidate vectors, or None.
+        relevance: (n,) relevance scores in [0, 1], higher is better.
+        k: Number of rows to select.
+        lambda_: Relevance/diversity trade-off; 1.0 disables the diversity term.
+        groups: Optional group label per candidate.
+        max_per_group: Cap per group; 0 means unlimited.
+
+    Returns:
+        List[int]: Selected row indices in pick order.
+    """
+    n = len(relevance)
+    k = min(k, n)
+    if k <= 0:
+        return []
+
+    group_ids = None
+    if groups is not None and max_per_group > 0:
+        labels, group_ids = np.unique(np.asarray(groups, dtype=object).astype(str), return_inverse=True)
+        group_counts = np.zeros(len(labels), dtype=np.int64)
+
+    available = np.ones(n, dtype=bool)
+    selected: List[int] = []
+
+    if embeddings is None or lambda_ >= 1.0:
+        for i in np.argsort(-relevance, kind="stable"):
+            if len(selected) == k:
+                break
+            if group_ids is not None:
+                if group_counts[group_ids[i]] >= max_per_group:
+                    continue
+                group_counts[group_ids[i]] += 1
+            selected.append(int(i))
+        return selected
+
+    vecs = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+    vecs = vecs / np.maximum(norms, 1e-12)
+    max_sim = np.zeros(n, dtype=np.float32)
+
+    while len(selected) < k:
+        scores = lambda_ * relevance - (1.0 - lambda_) * max_sim
+        scores = np.where(available, scores, -np.inf)
+        best = int(np.argmax(scores))
+        if not np.isfinite(scores[best]):
+            break
+        selected.append(best)
+        available[best] = False
+        if group_ids is not None:
+            g = group_ids[best]
+            group_counts[g] += 1
+            if group_counts[g] >= max_per_group:
+                available &= group_ids != g
+        # One matrix-vector product per pick keeps this O(k * n * d)
+        np.maximum(max_sim, vecs @ vecs[best], out=max_sim)
+
+    return selected
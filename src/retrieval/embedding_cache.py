@@ -0,0 +1,174 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from src.utils.config import settings
+from src.utils.metrics import inc
+
+
+def text_key(text: str) -> str:
+    """Content address of a text: sha256 of its whitespace-normalized form."""
+    normalized = " ".join(text.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Persistent, content-addressed embedding cache stored in SQLite.
+
+    Entries are keyed by (embedding model, text hash) and hold the vector as a
+    float32 blob. When the stored vectors exceed `max_bytes`, the least recently
+    used entries are evicted. Hits, misses and evictions are also exported as
+    `pra_embedding_cache_*` counters.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                key TEXT NOT NULL,
+                vec BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, key)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_lru ON embeddings(last_used)")
+        self._conn.commit()
+        self._total_bytes = self._stored_bytes()
+
+    def get_many(self, model: str, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Return cached vectors for the given keys; missing keys are absent."""
+        found: Dict[str, np.ndarray] = {}
+        unique = list(dict.fromkeys(keys))
+        now = time.time()
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for i in range(0, len(unique), 500):
+                part = unique[i:i + 500]
+                marks = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT key, vec FROM embeddings WHERE model = ? AND key IN ({marks})",
+                    [model, *part],
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+            if found:
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND key = ?",
+                    [(now, model, k) for k in found],
+                )
+                self._conn.commit()
+            hits = sum(1 for k in keys if k in found)
+            self.hits += hits
+            self.misses += len(keys) - hits
+        inc("pra_embedding_cache_lookups_total", hits, result="hit")
+        inc("pra_embedding_cache_lookups_total", len(keys) - hits, result="miss")
+        return found
+
+    def put_many(self, model: str, items: Dict[str, Sequence[float]]):
+        """Store vectors by key, then evict LRU entries beyond the size cap."""
+        if not items:
+            return
+        now = time.time()
+        rows = [
+            (model, key, np.asarray(vec, dtype=np.float32).tobytes(), now)
+            for key, vec in items.items()
+        ]
+        evicted = 0
+        with self._lock:
+            replaced = self._stored_bytes(model, list(items))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, key, vec, last_used) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._total_bytes += sum(len(r[2]) for r in rows) - replaced
+            if self._total_bytes > self.max_bytes:
+                # Other processes may share the file: recount before evicting
+                self._total_bytes = self._stored_bytes()
+                if self._total_bytes > self.max_bytes:
+                    evicted = self._evict()
+            self._conn.commit()
+        if evicted:
+            inc("pra_embedding_cache_evictions_total", evicted)
+
+    def _stored_bytes(self, model: str | None = None, keys: Sequence[str] = ()) -> int:
+        """Bytes of vectors stored, in total or (given a model) for those keys only."""
+        if model is None:
+            return self._conn.execute("SELECT COALESCE(SUM(LENGTH(vec)), 0) FROM embeddings").fetchone()[0]
+        total = 0
+        for i in range(0, len(keys), 500):
+            part = keys[i:i + 500]
+            marks = ",".join("?" * len(part))
+            total += self._conn.execute(
+                f"SELECT COALESCE(SUM(LENGTH(vec)), 0) FROM embeddings WHERE model = ? AND key IN ({marks})",
+                [model, *part],
+            ).fetchone()[0]
+        return total
+
+    def _evict(self) -> int:
+        # Drop oldest entries until ~90% of the cap so eviction isn't triggered on every put
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        while self._total_bytes > target:
+            rows = self._conn.execute(
+                "SELECT rowid, LENGTH(vec) FROM embeddings ORDER BY last_used LIMIT 256"
+            ).fetchall()
+            if not rows:
+                break
+            drop: List[int] = []
+            for rowid, size in rows:
+                drop.append(rowid)
+                self._total_bytes -= size
+                if self._total_bytes <= target:
+                    break
+            self._conn.executemany("DELETE FROM embeddings WHERE rowid = ?", [(r,) for r in drop])
+            evicted += len(drop)
+        self.evictions += evicted
+        self._total_bytes = self._stored_bytes()
+        return evicted
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "bytes": self._total_bytes,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_shared: Optional[EmbeddingCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Process-wide cache instance, or None when disabled in settings."""
+    global _shared
+    if not settings.emb_cache_enabled:
+        return None
+    with _shared_lock:
+        if _shared is None:
+            _shared = EmbeddingCache(settings.emb_cache_path, settings.emb_cache_max_mb * 1024 * 1024)
+        return _shared
@@ -1,26 +1,107 @@
-import requests
-from chromadb.utils.embedding_functions import EmbeddingFunction
-from src.utils.logging import info
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from src.llm.ollama_client import OllamaClient, get_ollama_client
+from src.retrieval.embedding_cache import EmbeddingCache, get_embedding_cache, text_key
+from src.utils.logging import info, warn
 from src.utils.config import settings
+from src.utils.metrics import inc, span
 
 
-class OllamaEmbedding(EmbeddingFunction):
-    def __init__(self, model: str | None = None):
+class OllamaEmbedding:
+    """
+    Embedding function backed by a local Ollama server.
+
+    Texts are sent in batches to the `/api/embed` endpoint through the shared
+    Ollama client, with several batches in flight at once (up to the client's
+    embed limit). Older Ollama builds without `/api/embed` fall back to one
+    `/api/embeddings` call per text.
+    A persistent content-addressed cache answers repeated texts without Ollama.
+    """
+
+    def __init__(
+        self,
+        model: str | None = None,
+        batch_size: int | None = None,
+        concurrency: int | None = None,
+        cache: EmbeddingCache | None = None,
+        client: OllamaClient | None = None,
+    ):
         self.model = model or settings.emb_model
-        self.base = settings.ollama_host
+        self.batch_size = max(1, batch_size or settings.emb_batch_size)
+        self.concurrency = max(1, concurrency or settings.emb_concurrency)
+        self.cache = cache if cache is not None else get_embedding_cache()
+        self.client = client or get_ollama_client()
+
+        # None = not probed yet, True/False once /api/embed has answered
+        self._batch_supported: bool | None = None
 
     def __call__(self, texts):
         if isinstance(texts, str):
             texts = [texts]
+        texts = list(texts)
+        if not texts:
+            return []
+        if self.cache is None:
+            return self._embed(texts)
 
-        out = []
-        for t in texts:
-            resp = requests.post(
-                f"{self.base}/api/embeddings",
-                json={"model": self.model, "prompt": t},
-                timeout=120,
-            )
-            resp.raise_for_status()
-            out.append(resp.json()["embedding"])
+        keys = [text_key(t) for t in texts]
+        found = self.cache.get_many(self.model, keys)
+
+        # Embed each distinct missing text once, even if repeated within the call
+        missing: dict[str, str] = {}
+        for k, t in zip(keys, texts):
+            if k not in found and k not in missing:
+                missing[k] = t
+        if missing:
+            vectors = self._embed(list(missing.values()))
+            fresh = dict(zip(missing.keys(), vectors))
+            self.cache.put_many(self.model, fresh)
+            found.update(fresh)
+
+        return [np.asarray(found[k], dtype=np.float32) for k in keys]
+
+    def cache_stats(self) -> dict:
+        return self.cache.stats() if self.cache is not None else {}
 
+    def _embed(self, texts: list[str]) -> list[list[float]]:
+        inc("pra_embedded_chunks_total", len(texts))
+        with span("embed"):
+            return self._embed_batches(texts)
+
+    def _embed_batches(self, texts: list[str]) -> list[list[float]]:
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if len(batches) == 1:
+            return self._embed_batch(batches[0])
+
+        # Probe the batch endpoint once so parallel workers agree on the path
+        out = self._embed_batch(batches[0])
+        workers = min(self.concurrency, len(batches) - 1)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for vectors in pool.map(self._embed_batch, batches[1:]):
+                out.extend(vectors)
         return out
+
+    def _embed_batch(self, batch: list[str]) -> list[list[float]]:
+        if self._batch_supported is not False:
+            with self.client.request(
+                "embed", "/api/embed", {"model": self.model, "input": batch}, target="ollama_embed", timeout=120
+            ) as resp:
+                # Old builds answer 404 "page not found"; new ones 404 on a missing model
+                if resp.status_code == 404 and "model" not in resp.text.lower():
+                    warn("Ollama /api/embed not available; falling back to /api/embeddings.")
+                    self._batch_supported = False
+                else:
+                    resp.raise_for_status()
+                    if self._batch_supported is None:
+                        info(f"Using batched Ollama embeddings (batch_size={self.batch_size}).")
+                    self._batch_supported = True
+                    return resp.json()["embeddings"]
+
+        return [self._embed_one(t) for t in batch]
+
+    def _embed_one(self, text: str) -> list[float]:
+        with self.client.request(
+            "embed", "/api/embeddings", {"model": self.model, "prompt": text}, target="ollama_embeddings", timeout=120
+        ) as resp:
+            resp.raise_for_status()
+            return resp.json()["embedding"]
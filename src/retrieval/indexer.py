@@ -1,18 +1,435 @@
-from src.utils.text import clean_text, chunk_text
+import gzip
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+from src.utils.config import settings
+from src.utils.logging import info, warn
+from src.utils.metrics import span
+from src.utils.text import chunk_document, clean_text, token_budget
+from src.retrieval.bm25 import BM25Index
+from src.retrieval.compact_store import TIME_KEY
+from src.retrieval.diversify import mmr_select
+from src.retrieval.manifest import IngestManifest, content_hash
 from src.retrieval.vector_store import VectorStore
-from typing import List, Dict
+from typing import List, Dict, Sequence, Tuple
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> List[str]:
+    """Merges ranked id lists: score(id) = sum over lists of 1 / (k + rank)."""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, 1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+# Manifest migration that stamps TIME_KEY on chunks indexed before it existed
+DATES_MIGRATION = "published_ts"
+# Fields written per document to a compaction archive (plus "id" and "text")
+ARCHIVE_FIELDS = ("title", "url", "pdf_url", "published", "source", "type")
+
+
+def published_epoch(value) -> int | None:
+    """Epoch seconds of an ISO-8601 `published` value (naive times are UTC), or None."""
+    if not value:
+        return None
+    text = str(value).strip()
+    for candidate in (text, text[:10]):
+        try:
+            dt = datetime.fromisoformat(candidate)
+        except ValueError:
+            continue
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return int(dt.timestamp())
+    return None
+
+
+def _stamped(meta: Dict, now: float | None = None) -> Dict:
+    """`meta` with TIME_KEY set: the publication time, or the ingestion time when it has none."""
+    if isinstance(meta.get(TIME_KEY), (int, float)):
+        return meta
+    ts = published_epoch(meta.get("published"))
+    return {**meta, TIME_KEY: ts if ts is not None else int(now or time.time())}
+
+
+def _strip_overlap(prev: str, chunk: str, max_chars: int) -> str:
+    """
+    `chunk` without the leading sentences chunk_document repeated from the end
+    of `prev`: the longest suffix of `prev` (at most `max_chars`, starting at a
+    word) that `chunk` starts with.
+    """
+    for i in range(max(0, len(prev) - max_chars), len(prev)):
+        if i and prev[i - 1] != " ":
+            continue
+        n = len(prev) - i
+        if chunk.startswith(prev[i:]) and chunk[n:n + 1] in ("", " "):
+            return chunk[n:].lstrip(" ")
+    return chunk
+
+
+def _split_chunk_id(chunk_id: str) -> Tuple[str, int]:
+    doc_id, _, n = chunk_id.rpartition("::chunk::")
+    return doc_id, int(n) if n.isdigit() else 0
+
+
+def document_hash(text: str, chunk_tokens: int, overlap_tokens: int) -> str:
+    """Manifest hash of a document; chunking settings are included so changing them re-indexes it."""
+    return content_hash(f"{chunk_tokens}/{overlap_tokens}|{clean_text(text)}")
 
 
 class Indexer:
-    def __init__(self, store: VectorStore):
+    def __init__(
+        self,
+        store: VectorStore,
+        manifest: IngestManifest | None = None,
+        lexical: BM25Index | None = None,
+    ):
         self.store = store
+        self.manifest = manifest or IngestManifest(settings.manifest_path)
+        self.lexical = lexical or BM25Index(settings.bm25_path)
+        self._lexical_checked = False
+        self._dates_checked = False
+        self._dates_lock = threading.Lock()
+        self.chunk_tokens = token_budget(store.embed.model, settings.chunk_tokens)
+        self.overlap_tokens = min(settings.chunk_overlap_tokens, self.chunk_tokens // 2)
+
+    def add_document(self, doc_id: str, text: str, meta: Dict) -> str:
+        """
+        Chunks, embeds and upserts a document unless the manifest shows the same
+        text was already indexed with the current embedding model.
+
+        Returns:
+            str: "new", "updated" or "skipped".
+        """
+        digest = document_hash(text, self.chunk_tokens, self.overlap_tokens)
+        prev = self._unchanged(doc_id, digest)
+        if prev is True:
+            return "skipped"
+
+        meta = _stamped(meta)
+        with span("chunk"):
+            chunks = chunk_document(text, self.chunk_tokens, self.overlap_tokens)
+        return self._write(doc_id, digest, chunks, [{**meta, "chunk": i} for i in range(len(chunks))], prev)
+
+    def add_pages(self, doc_id: str, pages: Sequence[Tuple[int, str]], meta: Dict) -> str:
+        """
+        `add_document` for paged text (e.g. a PDF): each page is chunked on its
+        own so every chunk records the page it came from in its "page" metadata.
 
-    def add_document(self, doc_id: str, text: str, meta: Dict):
-        text = clean_text(text)
-        chunks = chunk_text(text)
+        Returns:
+            str: "new", "updated" or "skipped".
+        """
+        digest = document_hash("\n\n".join(f"[{n}] {t}" for n, t in pages), self.chunk_tokens, self.overlap_tokens)
+        prev = self._unchanged(doc_id, digest)
+        if prev is True:
+            return "skipped"
+
+        meta = _stamped(meta)
+        chunks, metas = [], []
+        with span("chunk"):
+            for number, text in pages:
+                for piece in chunk_document(text, self.chunk_tokens, self.overlap_tokens):
+                    metas.append({**meta, "chunk": len(chunks), "page": number})
+                    chunks.append(piece)
+        return self._write(doc_id, digest, chunks, metas, prev)
+
+    def _unchanged(self, doc_id: str, digest: str):
+        """
+        True if the manifest already has this digest for the current model and
+        the store still holds the document, else the previous entry (or None,
+        also when the store lost the document, e.g. a wiped collection).
+        """
+        prev = self.manifest.get(self.store.name, doc_id)
+        if prev and not self._in_store([doc_id]):
+            return None
+        if prev and prev["content_hash"] == digest and prev["emb_model"] == self.store.embed.model:
+            return True
+        return prev
+
+    def _in_store(self, doc_ids: Sequence[str]) -> set:
+        """The doc ids whose first chunk is in the vector store."""
+        got = self.store.get([f"{doc_id}::chunk::0" for doc_id in doc_ids])
+        return {_split_chunk_id(cid)[0] for cid in got["ids"]}
+
+    def _write(self, doc_id: str, digest: str, chunks: List[str], metas: List[Dict], prev) -> str:
+        if not chunks:
+            return "skipped"
         ids = [f"{doc_id}::chunk::{i}" for i in range(len(chunks))]
-        metas = [{**meta, "chunk": i} for i in range(len(chunks))]
         self.store.upsert(ids, chunks, metas)
+        self.lexical.upsert(self.store.name, ids, chunks)
+
+        # Drop trailing chunks from a previous, longer version of the document
+        if prev and prev["chunk_count"] > len(chunks):
+            stale = [f"{doc_id}::chunk::{i}" for i in range(len(chunks), prev["chunk_count"])]
+            self.store.delete(stale)
+            self.lexical.delete(self.store.name, stale)
+
+        self.manifest.put(self.store.name, doc_id, digest, len(chunks), self.store.embed.model)
+        return "updated" if prev else "new"
+
+    def remove_document(self, doc_id: str) -> bool:
+        """Deletes a document's chunks and manifest entry; False if the manifest does not know it."""
+        prev = self.manifest.get(self.store.name, doc_id)
+        if not prev:
+            return False
+        ids = [f"{doc_id}::chunk::{i}" for i in range(prev["chunk_count"])]
+        self.store.delete(ids)
+        self.lexical.delete(self.store.name, ids)
+        self.manifest.remove(self.store.name, doc_id)
+        return True
+
+    def add_prepared(self, docs: List[Dict], upsert_batch: int = 1000) -> Dict[str, int]:
+        """
+        Bulk counterpart of `add_document` for documents already hashed and
+        chunked (see `document_hash` and `chunk_document`): {"doc_id", "digest",
+        "chunks", "meta"} dicts. Unchanged documents still in the store are
+        skipped; the rest are
+        upserted in batches of up to `upsert_batch` chunks and recorded in the
+        manifest in one transaction.
+
+        Returns:
+            Dict[str, int]: counts of "new", "updated" and "skipped" documents.
+        """
+        counts = {"new": 0, "updated": 0, "skipped": 0}
+        model = self.store.embed.model
+        now = time.time()
+        prev = self.manifest.get_many(self.store.name, [d["doc_id"] for d in docs])
+        present = self._in_store(list(prev)) if prev else set()
+        prev = {doc_id: entry for doc_id, entry in prev.items() if doc_id in present}
+
+        ids, texts, metas, stale, recorded = [], [], [], [], []
+        for d in docs:
+            old = prev.get(d["doc_id"])
+            if not d["chunks"] or (old and old["content_hash"] == d["digest"] and old["emb_model"] == model):
+                counts["skipped"] += 1
+                continue
+            counts["updated" if old else "new"] += 1
+            n = len(d["chunks"])
+            ids.extend(f"{d['doc_id']}::chunk::{i}" for i in range(n))
+            texts.extend(d["chunks"])
+            meta = _stamped(d["meta"], now)
+            metas.extend({**meta, "chunk": i} for i in range(n))
+            if old and old["chunk_count"] > n:
+                stale.extend(f"{d['doc_id']}::chunk::{i}" for i in range(n, old["chunk_count"]))
+            recorded.append((d["doc_id"], d["digest"], n, model))
+
+        step = max(1, upsert_batch)
+        for i in range(0, len(ids), step):
+            self.store.upsert(ids[i:i + step], texts[i:i + step], metas[i:i + step])
+            self.lexical.upsert(self.store.name, ids[i:i + step], texts[i:i + step])
+        if stale:
+            self.store.delete(stale)
+            self.lexical.delete(self.store.name, stale)
+        if recorded:
+            self.manifest.put_many(self.store.name, recorded)
+        return counts
+
+    def corpus_version(self) -> int:
+        return self.manifest.corpus_version(self.store.name)
+
+    def bump_corpus_version(self) -> int:
+        return self.manifest.bump_corpus_version(self.store.name)
+
+    def search(self, query: str, k: int = 10, mode: str | None = None, embedding=None, days: int | None = None):
+        """
+        Retrieves the top-k chunks in Chroma's query result shape.
+
+        Over-fetches candidates, then reranks them with maximal marginal
+        relevance and caps chunks per document so near-duplicate neighbours
+        of one paper don't crowd out the rest.
+
+        Modes:
+            "vector": Chroma similarity search only.
+            "lexical": BM25 only; never calls the embedding model.
+            "hybrid": reciprocal-rank fusion of both; falls back to lexical
+                      when the vector search fails (e.g. Ollama is down).
+
+        `embedding` is the query's vector when it was already computed. With
+        `days` (and RETRIEVAL_DATE_FILTER on), only chunks published in that
+        window are searched: the vector engine filters on TIME_KEY itself and
+        lexical candidates are filtered by their metadata.
+        """
+        mode = mode or settings.retrieval_mode
+        fetch = k * max(1, settings.retrieval_fetch_factor)
+        since = None
+        if days and settings.retrieval_date_filter:
+            self._ensure_dates()
+            since = int(time.time() - days * 86400)
+        ranked, known = self._candidates(query, fetch, mode, embedding, since)
+        return self._diversify(ranked, known, k, since)
+
+    def _candidates(self, query: str, fetch: int, mode: str, embedding=None, since: int | None = None):
+        """Returns (ranked candidate ids, id -> {doc, meta, dist, emb} for those already fetched)."""
+        known: Dict[str, Dict] = {}
+        if mode != "vector":
+            self._ensure_lexical()
+            lexical_ids = [cid for cid, _ in self.lexical.search(self.store.name, query, fetch)]
+            if mode == "lexical":
+                return lexical_ids, known
+
+        try:
+            vector = self.store.query(query, fetch, include_embeddings=True, embedding=embedding, since=since)
+        except Exception as e:
+            if mode == "vector":
+                raise
+            warn(f"Vector search failed ({e}); answering from the lexical index only.")
+            return lexical_ids, known
+
+        vector_ids = vector["ids"][0]
+        embeddings = vector.get("embeddings")
+        embeddings = embeddings[0] if embeddings is not None else [None] * len(vector_ids)
+        for cid, doc, meta, dist, emb in zip(
+            vector_ids, vector["documents"][0], vector["metadatas"][0], vector["distances"][0], embeddings
+        ):
+            known[cid] = {"doc": doc, "meta": meta, "dist": dist, "emb": emb}
+        if mode == "vector":
+            return vector_ids, known
+        return reciprocal_rank_fusion([vector_ids, lexical_ids], k=settings.rrf_k), known
+
+    def _diversify(self, ranked: List[str], known: Dict[str, Dict], k: int, since: int | None = None) -> Dict:
+        """
+        Picks k of the ranked candidates with MMR over their stored embeddings
+        and a per-document chunk cap, then builds a Chroma-shaped result.
+        Candidates older than `since` are dropped first.
+        """
+        missing = [cid for cid in ranked if cid not in known]
+        if missing:
+            got = self.store.get(missing, include_embeddings=True)
+            got_embs = got.get("embeddings")
+            got_embs = got_embs if got_embs is not None else [None] * len(got["ids"])
+            for cid, doc, meta, emb in zip(got["ids"], got["documents"], got["metadatas"], got_embs):
+                known[cid] = {"doc": doc, "meta": meta, "dist": None, "emb": emb}
+        ranked = [cid for cid in ranked if cid in known]
+        if since is not None:
+            ranked = [cid for cid in ranked if (known[cid]["meta"] or {}).get(TIME_KEY, 0) >= since]
+        if not ranked:
+            return {"ids": [[]], "documents": [[]], "metadatas": [[]], "distances": [[]]}
+
+        # Rank-based relevance keeps vector, lexical and fused candidates comparable
+        relevance = 1.0 / (settings.rrf_k + np.arange(1, len(ranked) + 1))
+        relevance = relevance / relevance[0]
+        embs = [known[cid]["emb"] for cid in ranked]
+        matrix = np.asarray(embs, dtype=np.float32) if all(e is not None for e in embs) else None
+        groups = [cid.split("::chunk::")[0] for cid in ranked]
+        picks = mmr_select(
+            matrix, relevance, k,
+            lambda_=settings.mmr_lambda,
+            groups=groups,
+            max_per_group=settings.max_chunks_per_doc,
+        )
+
+        ids = [ranked[i] for i in picks]
+        return {
+            "ids": [ids],
+            "documents": [[known[cid]["doc"] for cid in ids]],
+            "metadatas": [[known[cid]["meta"] for cid in ids]],
+            "distances": [[known[cid]["dist"] for cid in ids]],
+        }
+
+    def _ensure_lexical(self):
+        """Backfills the BM25 index from Chroma for collections indexed before it existed."""
+        if self._lexical_checked:
+            return
+        self._lexical_checked = True
+        if self.lexical.count(self.store.name) or not self.store.count():
+            return
+        info(f"Building lexical index for '{self.store.name}' from the vector store...")
+        for ids, docs in self.store.iter_documents():
+            self.lexical.upsert(self.store.name, ids, docs)
+
+    def _ensure_dates(self):
+        """Stamps TIME_KEY on chunks indexed before it existed; once per collection."""
+        with self._dates_lock:
+            if self._dates_checked:
+                return
+            self._dates_checked = True
+            if self.manifest.has_migration(self.store.name, DATES_MIGRATION):
+                return
+            now, updated = time.time(), 0
+            for ids, metas in self.store.iter_metadatas():
+                todo = [(cid, m or {}) for cid, m in zip(ids, metas) if TIME_KEY not in (m or {})]
+                self.store.update_metadata([cid for cid, _ in todo], [_stamped(m, now) for _, m in todo])
+                updated += len(todo)
+            if updated:
+                info(f"Added publication timestamps to {updated} chunks in '{self.store.name}'.")
+            self.manifest.mark_migration(self.store.name, DATES_MIGRATION)
+
+    def disk_bytes(self) -> int:
+        """Size on disk of the vector store and the lexical index."""
+        return self.store.disk_bytes() + self.lexical.disk_bytes()
+
+    def expire(self, before: float, archive_dir: str | None = None, dry_run: bool = False) -> Dict:
+        """
+        Removes every chunk published before `before` (epoch seconds) from the
+        vector store, the lexical index and the manifest, then vacuums both
+        indexes. With `archive_dir`, the affected documents are first written
+        to a gzipped JSONL file that `ingest --format jsonl` can load again.
+
+        Returns:
+            Dict: "chunks" and "documents" removed, the "archive" path (or
+            None), and "bytes_before" / "bytes_after" on disk.
+        """
+        self._ensure_dates()
+        ids = sorted(self.store.ids_older_than(int(before)), key=_split_chunk_id)
+        doc_ids = list(dict.fromkeys(_split_chunk_id(cid)[0] for cid in ids))
+        size = self.disk_bytes()
+        result = {"chunks": len(ids), "documents": len(doc_ids), "archive": None, "bytes_before": size, "bytes_after": size}
+        if dry_run or not ids:
+            return result
+
+        if archive_dir:
+            result["archive"] = self._archive(ids, Path(archive_dir))
+        with span("expire"):
+            for i in range(0, len(ids), 1000):
+                part = ids[i:i + 1000]
+                self.store.delete(part)
+                self.lexical.delete(self.store.name, part)
+            self.manifest.remove_many(self.store.name, doc_ids)
+            self.bump_corpus_version()
+        with span("vacuum"):
+            self.store.vacuum()
+            self.lexical.vacuum()
+        result["bytes_after"] = self.disk_bytes()
+        info(f"Expired {len(ids)} chunks of {len(doc_ids)} documents from '{self.store.name}'.")
+        return result
+
+    def _archive(self, ids: List[str], archive_dir: Path) -> str:
+        """
+        Writes the documents of `ids` (sorted by document, then chunk) as one
+        JSONL line each. Sentences a chunk repeats from the previous one
+        (CHUNK_OVERLAP_TOKENS) are written once.
+        """
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        path = archive_dir / f"{self.store.name}-{time.strftime('%Y%m%d-%H%M%S')}.jsonl.gz"
+        current, meta, texts = None, {}, []
+        # Overlap sentences add up to overlap_tokens by estimate_tokens, plus the spaces between them
+        max_overlap = self.overlap_tokens * 5
+
+        def flush(f):
+            if current is not None:
+                parts = texts
+                if max_overlap:
+                    parts = texts[:1] + [_strip_overlap(p, c, max_overlap) for p, c in zip(texts, texts[1:])]
+                text = "\n\n".join(p for p in parts if p)
+                record = {"id": current, **{k: meta.get(k) for k in ARCHIVE_FIELDS}, "text": text}
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
 
-    def search(self, query: str, k: int = 10):
-        return self.store.query(query, k)
\ No newline at end of file
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            for i in range(0, len(ids), 1000):
+                got = self.store.get(ids[i:i + 1000])
+                chunks = dict(zip(got["ids"], zip(got["documents"], got["metadatas"])))
+                for cid in ids[i:i + 1000]:
+                    if cid not in chunks:
+                        continue
+                    doc_id = _split_chunk_id(cid)[0]
+                    if doc_id != current:
+                        flush(f)
+                        current, meta, texts = doc_id, chunks[cid][1] or {}, []
+                    texts.append(chunks[cid][0] or "")
+            flush(f)
+        return str(path)
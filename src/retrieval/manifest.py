@@ -0,0 +1,187 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class IngestManifest:
+    """
+    Records what has been indexed per collection: doc_id -> content hash,
+    chunk count and embedding model. Lets ingestion skip unchanged documents
+    and clean up chunks left behind when a document shrinks. Also keeps a
+    per-collection corpus version that ingestion bumps whenever content changes,
+    and the one-off collection migrations that have been applied.
+    """
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                collection TEXT NOT NULL,
+                doc_id TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                chunk_count INTEGER NOT NULL,
+                emb_model TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (collection, doc_id)
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS corpus_versions (
+                collection TEXT PRIMARY KEY,
+                version INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS migrations (
+                collection TEXT NOT NULL,
+                name TEXT NOT NULL,
+                applied_at REAL NOT NULL,
+                PRIMARY KEY (collection, name)
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                key TEXT PRIMARY KEY,
+                offset INTEGER NOT NULL,
+                fingerprint TEXT NOT NULL,
+                stats TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def corpus_version(self, collection: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version FROM corpus_versions WHERE collection = ?", (collection,)
+            ).fetchone()
+        return row[0] if row else 0
+
+    def bump_corpus_version(self, collection: str) -> int:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO corpus_versions (collection, version) VALUES (?, 1) "
+                "ON CONFLICT(collection) DO UPDATE SET version = version + 1",
+                (collection,),
+            )
+            self._conn.commit()
+            return self._conn.execute(
+                "SELECT version FROM corpus_versions WHERE collection = ?", (collection,)
+            ).fetchone()[0]
+
+    def get(self, collection: str, doc_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash, chunk_count, emb_model FROM documents "
+                "WHERE collection = ? AND doc_id = ?",
+                (collection, doc_id),
+            ).fetchone()
+        if not row:
+            return None
+        return {"content_hash": row[0], "chunk_count": row[1], "emb_model": row[2]}
+
+    def get_many(self, collection: str, doc_ids: Sequence[str]) -> Dict[str, Dict]:
+        out: Dict[str, Dict] = {}
+        with self._lock:
+            for i in range(0, len(doc_ids), 500):
+                part = list(doc_ids[i:i + 500])
+                rows = self._conn.execute(
+                    "SELECT doc_id, content_hash, chunk_count, emb_model FROM documents "
+                    f"WHERE collection = ? AND doc_id IN ({','.join('?' * len(part))})",
+                    (collection, *part),
+                ).fetchall()
+                for doc_id, digest, chunk_count, model in rows:
+                    out[doc_id] = {"content_hash": digest, "chunk_count": chunk_count, "emb_model": model}
+        return out
+
+    def put(self, collection: str, doc_id: str, content_hash: str, chunk_count: int, emb_model: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents "
+                "(collection, doc_id, content_hash, chunk_count, emb_model, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (collection, doc_id, content_hash, chunk_count, emb_model, time.time()),
+            )
+            self._conn.commit()
+
+    def remove(self, collection: str, doc_id: str):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM documents WHERE collection = ? AND doc_id = ?", (collection, doc_id)
+            )
+            self._conn.commit()
+
+    def remove_many(self, collection: str, doc_ids: Sequence[str]):
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM documents WHERE collection = ? AND doc_id = ?", [(collection, d) for d in doc_ids]
+            )
+            self._conn.commit()
+
+    def has_migration(self, collection: str, name: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM migrations WHERE collection = ? AND name = ?", (collection, name)
+            ).fetchone() is not None
+
+    def mark_migration(self, collection: str, name: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO migrations (collection, name, applied_at) VALUES (?, ?, ?)",
+                (collection, name, time.time()),
+            )
+            self._conn.commit()
+
+    def put_many(self, collection: str, entries: Iterable[Tuple[str, str, int, str]]):
+        """Records (doc_id, content_hash, chunk_count, emb_model) rows in one transaction."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO documents "
+                "(collection, doc_id, content_hash, chunk_count, emb_model, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(collection, *entry, now) for entry in entries],
+            )
+            self._conn.commit()
+
+    def get_checkpoint(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT offset, fingerprint, stats FROM checkpoints WHERE key = ?", (key,)
+            ).fetchone()
+        if not row:
+            return None
+        return {"offset": row[0], "fingerprint": row[1], "stats": json.loads(row[2])}
+
+    def put_checkpoint(self, key: str, offset: int, fingerprint: str, stats: Dict):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (key, offset, fingerprint, stats, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, offset, fingerprint, json.dumps(stats), time.time()),
+            )
+            self._conn.commit()
+
+    def clear_checkpoint(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM checkpoints WHERE key = ?", (key,))
+            self._conn.commit()
@@ -1,23 +1,257 @@
-import chromadb
-from chromadb.config import Settings as ChromaSettings
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence, Tuple
+
 from src.utils.config import settings
+from src.retrieval.compact_store import TIME_KEY
 from src.retrieval.embedding_ollama import OllamaEmbedding
+from src.utils.metrics import span
 
 
-class VectorStore:
-    def __init__(self, collection_name: str = "papers"):
+class VectorBackend(ABC):
+    """
+    Storage engine behind `VectorStore`. Backends receive texts together with
+    their embeddings (computed by the store's embedding client) and return
+    results in Chroma's shapes: `get` -> {"ids", "documents", "metadatas"[,
+    "embeddings"]}, `query` -> the same keys plus "distances", one list per query.
+
+    Chunk metadata carries TIME_KEY (epoch seconds); `query(since=...)` and
+    `ids_older_than` filter on it inside the engine. A backend missing any
+    abstract method fails when it is constructed.
+    """
+
+    # Whether `vacuum` returns freed space to the filesystem
+    supports_vacuum = False
+
+    @abstractmethod
+    def upsert(self, ids: Sequence[str], embeddings, texts: Sequence[str], metadatas: Sequence[Dict]):
+        ...
+
+    @abstractmethod
+    def delete(self, ids: Sequence[str]):
+        ...
+
+    @abstractmethod
+    def get(self, ids: Sequence[str], include_embeddings: bool = False) -> Dict:
+        ...
+
+    @abstractmethod
+    def count(self) -> int:
+        ...
+
+    @abstractmethod
+    def iter_documents(self, batch_size: int = 1000) -> Iterator[Tuple[List[str], List[str]]]:
+        ...
+
+    @abstractmethod
+    def iter_metadatas(self, batch_size: int = 1000) -> Iterator[Tuple[List[str], List[Dict]]]:
+        ...
+
+    @abstractmethod
+    def update_metadata(self, ids: Sequence[str], metadatas: Sequence[Dict]):
+        ...
+
+    @abstractmethod
+    def ids_older_than(self, ts: int) -> List[str]:
+        ...
+
+    @abstractmethod
+    def query(self, embedding, k: int, include_embeddings: bool = False, since: int | None = None) -> Dict:
+        ...
+
+    def vacuum(self):
+        """Returns space freed by deletes to the filesystem, where the engine can (`supports_vacuum`)."""
+
+    @abstractmethod
+    def disk_bytes(self) -> int:
+        ...
+
+
+class ChromaBackend(VectorBackend):
+    """Chroma persistent collection (HNSW index, float32 vectors)."""
+
+    def __init__(self, collection_name: str, embed: OllamaEmbedding):
+        # Imported here: chromadb is slow to load and only this backend needs it
+        import chromadb
+        from chromadb.config import Settings as ChromaSettings
+        from chromadb.utils.embedding_functions import EmbeddingFunction
+
+        class _Embedding(EmbeddingFunction):
+            def __init__(self, fn):
+                self.fn = fn
+
+            def __call__(self, input):
+                return self.fn(input)
+
+        self.path = Path(settings.chroma_dir)
+        self.path.mkdir(parents=True, exist_ok=True)
         self.client = chromadb.PersistentClient(
             path=settings.chroma_dir,
             settings=ChromaSettings(allow_reset=True)
         )
-        self.embed = OllamaEmbedding()
-        self.col = self.client.get_or_create_collection(
-            collection_name,
-            embedding_function=self.embed
+        self.col = self.client.get_or_create_collection(collection_name, embedding_function=_Embedding(embed))
+
+    def upsert(self, ids, embeddings, texts, metadatas):
+        self.col.upsert(ids=ids, embeddings=embeddings, documents=texts, metadatas=metadatas)
+
+    def delete(self, ids):
+        self.col.delete(ids=ids)
+
+    def get(self, ids, include_embeddings: bool = False):
+        include = ["documents", "metadatas"] + (["embeddings"] if include_embeddings else [])
+        return self.col.get(ids=ids, include=include)
+
+    def count(self) -> int:
+        return self.col.count()
+
+    def iter_documents(self, batch_size: int = 1000):
+        for page in self._pages(["documents"], batch_size):
+            yield page["ids"], page["documents"]
+
+    def iter_metadatas(self, batch_size: int = 1000):
+        for page in self._pages(["metadatas"], batch_size):
+            yield page["ids"], page["metadatas"]
+
+    def _pages(self, include, batch_size: int, where=None):
+        offset = 0
+        while True:
+            page = self.col.get(include=include, where=where, limit=batch_size, offset=offset)
+            if not page["ids"]:
+                break
+            yield page
+            offset += len(page["ids"])
+
+    def update_metadata(self, ids, metadatas):
+        self.col.update(ids=list(ids), metadatas=list(metadatas))
+
+    def ids_older_than(self, ts: int):
+        return [i for page in self._pages([], 5000, where={TIME_KEY: {"$lt": ts}}) for i in page["ids"]]
+
+    def query(self, embedding, k: int, include_embeddings: bool = False, since: int | None = None):
+        include = ["documents", "metadatas", "distances"] + (["embeddings"] if include_embeddings else [])
+        where = {TIME_KEY: {"$gte": since}} if since is not None else None
+        return self.col.query(query_embeddings=[embedding], n_results=k, where=where, include=include)
+
+    def disk_bytes(self) -> int:
+        # Chroma keeps all collections under one directory; freed pages are reused, not returned
+        return sum(p.stat().st_size for p in self.path.rglob("*") if p.is_file())
+
+
+class CompactBackend(VectorBackend):
+    """Memory-mapped float16/int8 matrix with exhaustive search (see `CompactIndex`)."""
+
+    supports_vacuum = True
+
+    def __init__(self, collection_name: str, embed: OllamaEmbedding):
+        from src.retrieval.compact_store import CompactIndex
+
+        self.index = CompactIndex(
+            str(Path(settings.compact_dir) / collection_name),
+            dtype=settings.compact_dtype,
+            block_rows=settings.compact_block_rows,
+            threads=settings.compact_threads,
         )
 
+    def upsert(self, ids, embeddings, texts, metadatas):
+        self.index.upsert(ids, embeddings, texts, metadatas)
+
+    def delete(self, ids):
+        self.index.delete(ids)
+
+    def get(self, ids, include_embeddings: bool = False):
+        return self.index.get(ids, include_embeddings)
+
+    def count(self) -> int:
+        return self.index.count()
+
+    def iter_documents(self, batch_size: int = 1000):
+        return self.index.iter_documents(batch_size)
+
+    def iter_metadatas(self, batch_size: int = 1000):
+        return self.index.iter_metadatas(batch_size)
+
+    def update_metadata(self, ids, metadatas):
+        self.index.update_metadata(ids, metadatas)
+
+    def ids_older_than(self, ts: int):
+        return self.index.ids_older_than(ts)
+
+    def query(self, embedding, k: int, include_embeddings: bool = False, since: int | None = None):
+        return self.index.query(embedding, k, include_embeddings, since)
+
+    def vacuum(self):
+        self.index.vacuum()
+
+    def disk_bytes(self) -> int:
+        return self.index.disk_bytes()
+
+
+BACKENDS = {"chroma": ChromaBackend, "compact": CompactBackend}
+
+
+class VectorStore:
+    """
+    A named collection of embedded chunks. Embeddings are computed here with
+    the Ollama client (and its cache); storage and search are delegated to the
+    VECTOR_BACKEND engine ("chroma" or "compact").
+    """
+
+    def __init__(self, collection_name: str = "papers", backend: str | None = None):
+        self.name = collection_name
+        settings.ensure_dirs()
+        self.backend_name = backend or settings.vector_backend
+        if self.backend_name not in BACKENDS:
+            raise ValueError(f"Unknown vector backend {self.backend_name!r}; expected one of {', '.join(BACKENDS)}.")
+        self.embed = OllamaEmbedding()
+        self.backend = BACKENDS[self.backend_name](collection_name, self.embed)
+
     def upsert(self, ids, texts, metadatas):
-        self.col.upsert(ids=ids, documents=texts, metadatas=metadatas)
+        with span("vector.upsert"):
+            self.backend.upsert(ids, self.embed(texts), texts, metadatas)
+
+    def delete(self, ids):
+        if ids:
+            with span("vector.delete"):
+                self.backend.delete(ids)
+
+    def get(self, ids, include_embeddings: bool = False):
+        """Documents and metadata by id, without touching the embedding model."""
+        with span("vector.get"):
+            return self.backend.get(ids, include_embeddings)
+
+    def count(self) -> int:
+        return self.backend.count()
+
+    def iter_documents(self, batch_size: int = 1000):
+        """Yields (ids, documents) pages over the whole collection."""
+        return self.backend.iter_documents(batch_size)
+
+    def iter_metadatas(self, batch_size: int = 1000):
+        """Yields (ids, metadatas) pages over the whole collection."""
+        return self.backend.iter_metadatas(batch_size)
+
+    def update_metadata(self, ids, metadatas):
+        """Replaces the metadata of existing chunks without re-embedding them."""
+        if ids:
+            self.backend.update_metadata(ids, metadatas)
+
+    def ids_older_than(self, ts: int) -> List[str]:
+        """Chunk ids whose TIME_KEY is before `ts` (epoch seconds)."""
+        return self.backend.ids_older_than(ts)
+
+    def vacuum(self):
+        self.backend.vacuum()
+
+    def disk_bytes(self) -> int:
+        return self.backend.disk_bytes()
 
-    def query(self, text: str, k: int = 8):
-        return self.col.query(query_texts=[text], n_results=k)
\ No newline at end of file
+    def query(self, text: str, k: int = 8, include_embeddings: bool = False, embedding=None, since: int | None = None):
+        """
+        Top-k chunks for `text`; pass `embedding` when the query was already
+        embedded, and `since` (epoch seconds) to search only chunks whose
+        TIME_KEY is at least that recent.
+        """
+        with span("vector.query"):
+            if embedding is None:
+                embedding = self.embed([text])[0]
+            return self.backend.query(embedding, k, include_embeddings, since)
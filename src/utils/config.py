@@ -8,18 +8,93 @@ load_dotenv()
 
 class Settings(BaseModel):
     ollama_host: str = os.getenv("OLLAMA_HOST", "http://127.0.0.1:11434")
+    ollama_generate_concurrency: int = int(os.getenv("OLLAMA_GENERATE_CONCURRENCY", "2"))
+    ollama_embed_concurrency: int = int(os.getenv("OLLAMA_EMBED_CONCURRENCY", "4"))
+    ollama_retries: int = int(os.getenv("OLLAMA_RETRIES", "3"))
+    ollama_backoff: float = float(os.getenv("OLLAMA_BACKOFF", "0.5"))
+    ollama_keep_alive: str = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+    ollama_warmup: bool = os.getenv("OLLAMA_WARMUP", "true").lower() in ("1", "true", "yes")
     gen_model: str = os.getenv("GEN_MODEL", "gemma3:270m")
+    gen_num_ctx: int = int(os.getenv("GEN_NUM_CTX", "4096"))
+    gen_reserve_tokens: int = int(os.getenv("GEN_RESERVE_TOKENS", "1024"))
+    summarize_concurrency: int = int(os.getenv("SUMMARIZE_CONCURRENCY", "2"))
+    summarize_max_drop: float = float(os.getenv("SUMMARIZE_MAX_DROP", "0.25"))
+    batch_harvest_concurrency: int = int(os.getenv("BATCH_HARVEST_CONCURRENCY", "4"))
+    batch_summarize_concurrency: int = int(os.getenv("BATCH_SUMMARIZE_CONCURRENCY", "2"))
+    batch_max_queries: int = int(os.getenv("BATCH_MAX_QUERIES", "100"))
     emb_model: str = os.getenv("EMB_MODEL", "nomic-embed-text")
+    emb_batch_size: int = int(os.getenv("EMB_BATCH_SIZE", "32"))
+    emb_concurrency: int = int(os.getenv("EMB_CONCURRENCY", "4"))
+    chunk_tokens: int = int(os.getenv("CHUNK_TOKENS", "300"))
+    chunk_overlap_tokens: int = int(os.getenv("CHUNK_OVERLAP_TOKENS", "0"))
+    emb_cache_enabled: bool = os.getenv("EMB_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+    emb_cache_path: str = os.getenv("EMB_CACHE_PATH", "./data/embeddings.sqlite3")
+    emb_cache_max_mb: int = int(os.getenv("EMB_CACHE_MAX_MB", "512"))
     data_dir: str = os.getenv("DATA_DIR", "./data")
     cache_dir: str = os.getenv("CACHE_DIR", "./data/cache")
     chroma_dir: str = os.getenv("CHROMA_DIR", "./data/chroma")
+    vector_backend: str = os.getenv("VECTOR_BACKEND", "chroma")
+    compact_dir: str = os.getenv("COMPACT_DIR", "./data/compact")
+    compact_dtype: str = os.getenv("COMPACT_DTYPE", "float16")
+    compact_block_rows: int = int(os.getenv("COMPACT_BLOCK_ROWS", "4096"))
+    compact_threads: int = int(os.getenv("COMPACT_THREADS", "0"))
+    harvest_workers: int = int(os.getenv("HARVEST_WORKERS", "8"))
+    harvest_batch_size: int = int(os.getenv("HARVEST_BATCH_SIZE", "25"))
+    arxiv_timeout: float = float(os.getenv("ARXIV_TIMEOUT", "60"))
+    crossref_timeout: float = float(os.getenv("CROSSREF_TIMEOUT", "60"))
+    rss_timeout: float = float(os.getenv("RSS_TIMEOUT", "30"))
+    scrape_workers: int = int(os.getenv("SCRAPE_WORKERS", "8"))
+    scrape_extract_workers: int = int(os.getenv("SCRAPE_EXTRACT_WORKERS", "2"))
+    scrape_host_concurrency: int = int(os.getenv("SCRAPE_HOST_CONCURRENCY", "2"))
+    scrape_host_interval: float = float(os.getenv("SCRAPE_HOST_INTERVAL", "1.0"))
+    scrape_timeout: float = float(os.getenv("SCRAPE_TIMEOUT", "60"))
+    scrape_deadline: float = float(os.getenv("SCRAPE_DEADLINE", "120"))
+    page_cache_ttl_hours: float = float(os.getenv("PAGE_CACHE_TTL_HOURS", "168"))
+    page_cache_max_mb: int = int(os.getenv("PAGE_CACHE_MAX_MB", "1024"))
+    pdf_ingest: bool = os.getenv("PDF_INGEST", "false").lower() in ("1", "true", "yes")
+    pdf_workers: int = int(os.getenv("PDF_WORKERS", "2"))
+    pdf_max_pages: int = int(os.getenv("PDF_MAX_PAGES", "40"))
+    pdf_time_limit: float = float(os.getenv("PDF_TIME_LIMIT", "30"))
+    pdf_max_mb: int = int(os.getenv("PDF_MAX_MB", "25"))
+    pdf_deadline: float = float(os.getenv("PDF_DEADLINE", "180"))
+    job_workers: int = int(os.getenv("JOB_WORKERS", "2"))
+    job_max_queue: int = int(os.getenv("JOB_MAX_QUEUE", "16"))
+    job_ttl: float = float(os.getenv("JOB_TTL", "3600"))
+    report_cache_enabled: bool = os.getenv("REPORT_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+    report_cache_path: str = os.getenv("REPORT_CACHE_PATH", "./data/reports.sqlite3")
+    report_cache_ttl: float = float(os.getenv("REPORT_CACHE_TTL", "21600"))
+    report_cache_swr: float = float(os.getenv("REPORT_CACHE_SWR", "0"))
+    harvest_log_path: str = os.getenv("HARVEST_LOG_PATH", "./data/harvests.sqlite3")
+    harvest_fresh_hours: float = float(os.getenv("HARVEST_FRESH_HOURS", "6"))
+    harvest_match_threshold: float = float(os.getenv("HARVEST_MATCH_THRESHOLD", "0.8"))
+    harvest_log_max_days: float = float(os.getenv("HARVEST_LOG_MAX_DAYS", "90"))
+    response_cache_path: str = os.getenv("RESPONSE_CACHE_PATH", "./data/responses.sqlite3")
+    arxiv_api_url: str = os.getenv("ARXIV_API_URL", "https://export.arxiv.org/api/query")
+    crossref_api_url: str = os.getenv("CROSSREF_API_URL", "https://api.crossref.org/works")
+    arxiv_cache_ttl: float = float(os.getenv("ARXIV_CACHE_TTL", "21600"))
+    crossref_cache_ttl: float = float(os.getenv("CROSSREF_CACHE_TTL", "43200"))
+    arxiv_page_size: int = int(os.getenv("ARXIV_PAGE_SIZE", "100"))
+    crossref_page_size: int = int(os.getenv("CROSSREF_PAGE_SIZE", "100"))
+    retrieval_mode: str = os.getenv("RETRIEVAL_MODE", "hybrid")
+    retrieval_fetch_factor: int = int(os.getenv("RETRIEVAL_FETCH_FACTOR", "3"))
+    rrf_k: int = int(os.getenv("RRF_K", "60"))
+    mmr_lambda: float = float(os.getenv("MMR_LAMBDA", "0.7"))
+    max_chunks_per_doc: int = int(os.getenv("MAX_CHUNKS_PER_DOC", "2"))
+    bm25_path: str = os.getenv("BM25_PATH", "./data/bm25.sqlite3")
+    retrieval_date_filter: bool = os.getenv("RETRIEVAL_DATE_FILTER", "true").lower() in ("1", "true", "yes")
+    index_retention_days: int = int(os.getenv("INDEX_RETENTION_DAYS", "1095"))
+    archive_dir: str = os.getenv("ARCHIVE_DIR", "./data/archive")
+    ingest_workers: int = int(os.getenv("INGEST_WORKERS", "4"))
+    ingest_batch_docs: int = int(os.getenv("INGEST_BATCH_DOCS", "256"))
+    ingest_upsert_batch: int = int(os.getenv("INGEST_UPSERT_BATCH", "1000"))
+    manifest_path: str = os.getenv("MANIFEST_PATH", "./data/manifest.sqlite3")
     memory_file: str = os.getenv("MEMORY_FILE", "./data/memory.yaml")
 
     def ensure_dirs(self):
+        """Creates the data directories; called by components that write there, not at import."""
         Path(self.data_dir).mkdir(parents=True, exist_ok=True)
         Path(self.cache_dir).mkdir(parents=True, exist_ok=True)
         Path(self.chroma_dir).mkdir(parents=True, exist_ok=True)
 
 
 settings = Settings()
-settings.ensure_dirs()
@@ -0,0 +1,139 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Tuple
+
+# Upper bounds (seconds) of the stage latency histogram buckets
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, math.inf)
+
+COUNTER_HELP = {
+    "pra_http_requests_total": "Outbound HTTP requests by target and outcome.",
+    "pra_http_retries_total": "Outbound HTTP requests retried after a connection error or 5xx.",
+    "pra_embedded_chunks_total": "Texts sent to the embedding model.",
+    "pra_embedding_cache_lookups_total": "Embedding cache lookups by result (hit or miss).",
+    "pra_embedding_cache_evictions_total": "Entries evicted from the embedding cache.",
+    "pra_scraped_bytes_total": "Bytes of HTML downloaded by the scraper.",
+    "pra_generated_tokens_total": "Tokens generated by the LLM.",
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "count", "max")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+
+class Metrics:
+    """
+    In-process metrics: a latency histogram per stage plus labelled counters,
+    rendered in the Prometheus text exposition format. Thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, _Histogram] = {}
+        self._counters: Dict[Tuple[str, LabelKey], float] = {}
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """Times the enclosed block into the `stage` histogram, even if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            hist = self._stages.get(stage)
+            if hist is None:
+                hist = self._stages[stage] = _Histogram()
+            hist.observe(seconds)
+
+    def inc(self, name: str, value: float = 1, **labels: str):
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def snapshot(self) -> Dict:
+        """Point-in-time copy: {"stages": {stage: {count, sum, max}}, "counters": {(name, labels): value}}."""
+        with self._lock:
+            return {
+                "stages": {
+                    s: {"count": h.count, "sum": h.total, "max": h.max} for s, h in self._stages.items()
+                },
+                "counters": dict(self._counters),
+            }
+
+    def since(self, before: Dict) -> Dict:
+        """What changed since an earlier `snapshot()`; `max` is the overall max."""
+        now = self.snapshot()
+        stages = {}
+        for s, cur in now["stages"].items():
+            prev = before["stages"].get(s, {"count": 0, "sum": 0.0})
+            if cur["count"] > prev["count"]:
+                stages[s] = {"count": cur["count"] - prev["count"], "sum": cur["sum"] - prev["sum"], "max": cur["max"]}
+        counters = {
+            k: v - before["counters"].get(k, 0)
+            for k, v in now["counters"].items()
+            if v != before["counters"].get(k, 0)
+        }
+        return {"stages": stages, "counters": counters}
+
+    def render_prometheus(self) -> str:
+        with self._lock:
+            stages = {s: (list(h.counts), h.total, h.count) for s, h in sorted(self._stages.items())}
+            counters = sorted(self._counters.items())
+
+        lines = [
+            "# HELP pra_stage_seconds Latency of pipeline stages.",
+            "# TYPE pra_stage_seconds histogram",
+        ]
+        for stage, (counts, total, count) in stages.items():
+            cumulative = 0
+            for bound, n in zip(BUCKETS, counts):
+                cumulative += n
+                le = "+Inf" if bound == math.inf else repr(bound)
+                lines.append(f'pra_stage_seconds_bucket{{stage="{_escape(stage)}",le="{le}"}} {cumulative}')
+            lines.append(f'pra_stage_seconds_sum{{stage="{_escape(stage)}"}} {total}')
+            lines.append(f'pra_stage_seconds_count{{stage="{_escape(stage)}"}} {count}')
+
+        seen = set()
+        for (name, labels), value in counters:
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {COUNTER_HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+            label_str = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+            lines.append(f"{name}{{{label_str}}} {_number(value)}" if label_str else f"{name} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = Metrics()
+span = metrics.span
+observe = metrics.observe
+inc = metrics.inc
@@ -1,4 +1,5 @@
 import re
+from typing import Iterator, List, Tuple
 
 
 def clean_text(t: str) -> str:
@@ -14,3 +15,124 @@ def chunk_text(t: str, chunk_size: int = 1200, overlap: int = 200):
         chunks.append(t[i:i + chunk_size])
         i += (chunk_size - overlap)
     return chunks
+
+
+# ---------------------------------------------------------------------
+# Sentence-aware, token-budgeted chunking
+# ---------------------------------------------------------------------
+_PARA_RE = re.compile(r"\n\s*\n")
+# End of sentence: terminal punctuation, optional closing quotes/brackets, whitespace,
+# then something that looks like the start of the next sentence
+_SENT_END_RE = re.compile(r"(?<=[.!?])([\"'”’)\]]*)\s+(?=[A-Z0-9\"'“‘\[])")
+_WS_RE = re.compile(r"\s+")
+# Abbreviations whose trailing period does not end a sentence
+_ABBREVIATIONS = frozenset(
+    "al. cf. e.g. i.e. etc. vs. fig. figs. eq. eqs. sec. ref. refs. no. dr. prof. mr. ms. approx.".split()
+)
+
+# Context windows of common Ollama embedding models (tokens)
+EMBED_CONTEXT_TOKENS = {
+    "nomic-embed-text": 8192,
+    "mxbai-embed-large": 512,
+    "snowflake-arctic-embed": 512,
+    "all-minilm": 256,
+    "bge-m3": 8192,
+    "bge-large": 512,
+}
+
+
+def estimate_tokens(s: str) -> int:
+    """Rough token count (~4 characters per token for English text)."""
+    return (len(s) + 3) // 4
+
+
+def token_budget(model: str, requested: int) -> int:
+    """Caps the requested chunk size at the embedding model's context window."""
+    ctx = EMBED_CONTEXT_TOKENS.get(model.split(":")[0])
+    return max(1, min(requested, ctx) if ctx else requested)
+
+
+def iter_sentences(text: str) -> Iterator[Tuple[int, str]]:
+    """Yields (paragraph index, whitespace-normalized sentence) in document order."""
+    for p_idx, para in enumerate(_PARA_RE.split(text)):
+        start = 0
+        for m in _SENT_END_RE.finditer(para):
+            word_start = para.rfind(" ", start, m.start()) + 1
+            if para[max(word_start, start):m.start()].lower() in _ABBREVIATIONS:
+                continue
+            sent = _WS_RE.sub(" ", para[start:m.end(1)]).strip()
+            if sent:
+                yield p_idx, sent
+            start = m.end()
+        sent = _WS_RE.sub(" ", para[start:]).strip()
+        if sent:
+            yield p_idx, sent
+
+
+def _split_long(sentence: str, max_tokens: int) -> List[str]:
+    """Hard-wraps a single over-long sentence on word boundaries."""
+    limit = max_tokens * 4
+    pieces, cur, size = [], [], 0
+    for word in sentence.split(" "):
+        if cur and size + len(word) + 1 > limit:
+            pieces.append(" ".join(cur))
+            cur, size = [], 0
+        cur.append(word)
+        size += len(word) + 1
+    if cur:
+        pieces.append(" ".join(cur))
+    return pieces
+
+
+def chunk_document(text: str, max_tokens: int = 300, overlap_tokens: int = 0) -> List[str]:
+    """
+    Splits text into chunks of whole sentences of at most ~`max_tokens` tokens.
+
+    Chunks prefer to end at paragraph breaks once they are half full, and the
+    last sentences of a chunk (up to `overlap_tokens`) are repeated at the start
+    of the next one. Sentences longer than the budget are wrapped on words.
+    Runs in linear time: every sentence is visited once and joined once.
+    """
+    chunks: List[str] = []
+    cur: List[str] = []
+    cur_tokens: List[int] = []
+    total = 0
+    fresh = 0  # sentences in `cur` not carried over as overlap
+    last_para = 0
+
+    def flush():
+        nonlocal cur, cur_tokens, total, fresh
+        if fresh:
+            chunks.append(" ".join(cur))
+        # Carry trailing sentences forward as overlap
+        keep, kept = 0, 0
+        for n in reversed(cur_tokens):
+            if kept + n > overlap_tokens:
+                break
+            kept += n
+            keep += 1
+        cur = cur[len(cur) - keep:] if keep else []
+        cur_tokens = cur_tokens[len(cur_tokens) - keep:] if keep else []
+        total, fresh = kept, 0
+
+    for para, sent in iter_sentences(text):
+        n = estimate_tokens(sent)
+        if n > max_tokens:
+            flush()
+            chunks.extend(_split_long(sent, max_tokens))
+            cur, cur_tokens, total = [], [], 0
+            continue
+        if fresh and (total + n > max_tokens or (para != last_para and total >= max_tokens // 2)):
+            flush()
+        # Drop overlap that would push a fresh chunk over budget
+        while cur and total + n > max_tokens:
+            total -= cur_tokens.pop(0)
+            cur.pop(0)
+        cur.append(sent)
+        cur_tokens.append(n)
+        total += n
+        fresh += 1
+        last_para = para
+
+    flush()
+    return chunks
@@ -0,0 +1,91 @@
+"""
+Offline tests for batch reports (Orchestrator.run_batch and POST /report/batch),
+against the fake Ollama and fixture source servers (the `orch` fixture).
+
+Run:
+    pytest -v tests/batch_test.py
+"""
+
+import json
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from src.api import server
+from src.api.jobs import JobManager
+
+QUERIES = ["graph neural networks", "recommender systems with graphs", "large language models"]
+
+
+def test_batch_shares_harvest_ingest_and_query_embedding(orch, monkeypatch):
+    ingested, embedded = [], []
+    ingest, embed = orch.researcher.ingest, type(orch.store.embed).__call__
+    monkeypatch.setattr(orch.researcher, "ingest", lambda items: ingested.append(items) or ingest(items))
+    monkeypatch.setattr(type(orch.store.embed), "__call__", lambda self, texts: embedded.append(list(texts)) or embed(self, texts))
+    harvested = []
+    harvest = orch.researcher.harvest
+    monkeypatch.setattr(orch.researcher, "harvest", lambda q, **kw: harvested.extend(r := harvest(q, **kw)) or r)
+
+    results = list(orch.run_batch(QUERIES, max_results=5, days=3650, top_k=3))
+
+    assert sorted(r["query"] for r in results) == sorted(QUERIES)
+    assert all(r["report"] and not r["cached"] for r in results)
+    # The fixture sources answer every query with the same works: ingested once
+    assert len(ingested) == 1
+    keys = [it.get("url") or it.get("id") for it in ingested[0]]
+    assert len(keys) == len(set(keys)) < len(harvested)
+    assert [call for call in embedded if set(call) & set(QUERIES)] == [QUERIES]
+
+    # A repeat is answered from the report cache, without harvesting
+    harvested.clear()
+    again = list(orch.run_batch(QUERIES, max_results=5, days=3650, top_k=3))
+    assert all(r["cached"] for r in again) and not harvested
+
+
+def test_reports_arrive_as_they_finish_and_failures_are_reported(orch, monkeypatch):
+    release = threading.Event()
+    summarize = orch.summarizer.summarize
+
+    def summarize_stub(query, hits):
+        if query == QUERIES[0]:
+            release.wait(5)  # the slow one
+        if query == QUERIES[2]:
+            raise RuntimeError("model crashed")
+        return summarize(query, hits)
+
+    monkeypatch.setattr(orch.summarizer, "summarize", summarize_stub)
+    batch = orch.run_batch(QUERIES, max_results=5, days=3650, top_k=3, concurrency=3)
+
+    first = [next(batch), next(batch)]
+    assert not release.is_set()  # yielded while the first query is still generating
+    assert {r["query"] for r in first} == {QUERIES[1], QUERIES[2]}
+    assert next(r for r in first if r["query"] == QUERIES[2]) == {"query": QUERIES[2], "error": "model crashed"}
+    release.set()
+    last = next(batch)
+    assert last["query"] == QUERIES[0] and last["report"]
+
+
+def test_batch_endpoint_streams_events_and_shares_the_job_limit(orch, monkeypatch):
+    monkeypatch.setattr(server, "_orch", orch)
+    jobs = JobManager(server.jobs.run_fn, workers=1, max_queue=0, ttl=60)
+    monkeypatch.setattr(server, "jobs", jobs)
+    client = TestClient(server.app)
+    body = {"queries": QUERIES[:2], "max_results": 5, "days": 3650, "top_k": 3}
+
+    with client.stream("POST", "/report/batch", json=body) as resp:
+        assert resp.status_code == 200
+        text = "".join(resp.iter_text())
+    events = [block.split("\n") for block in text.strip().split("\n\n")]
+    assert [e[0] for e in events] == ["event: report", "event: report", "event: done"]
+    assert json.loads(events[-1][1].removeprefix("data: "))["reports"] == 2
+
+    # With the only worker busy, a batch is turned away like any other job
+    release = threading.Event()
+    jobs.submit({"query": "busy"}, run_fn=lambda params, on_stage: release.wait(5))
+    try:
+        assert client.post("/report/batch", json=body).status_code == 429
+    finally:
+        release.set()
+        time.sleep(0.05)
+        jobs.shutdown()
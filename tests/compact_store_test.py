@@ -0,0 +1,122 @@
+"""
+Offline tests for the compact memory-mapped vector index.
+
+Run:
+    pytest -v tests/compact_store_test.py
+"""
+
+import numpy as np
+import pytest
+
+from src.retrieval.compact_store import CompactIndex
+
+
+def _vectors(n, dim=32, seed=0):
+    return np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+
+
+@pytest.mark.parametrize("dtype", ["float16", "int8"])
+def test_query_matches_exact_search_and_keeps_chroma_shape(tmp_path, dtype):
+    x = _vectors(3000)
+    index = CompactIndex(str(tmp_path), dtype=dtype, block_rows=256)
+    ids = [f"d{i}::chunk::0" for i in range(len(x))]
+    index.upsert(ids, x, [f"text {i}" for i in range(len(x))], [{"title": f"t{i}", "page": i % 5} for i in range(len(x))])
+
+    q = x[42] + 0.05 * _vectors(1, seed=1)[0]
+    res = index.query(q, k=5, include_embeddings=True)
+    assert set(res) == {"ids", "documents", "metadatas", "distances", "embeddings"}
+    assert res["ids"][0][0] == "d42::chunk::0"
+    assert res["documents"][0][0] == "text 42"
+    assert res["metadatas"][0][0] == {"title": "t42", "page": 2}
+    assert res["distances"][0] == sorted(res["distances"][0])
+
+    unit = x / np.linalg.norm(x, axis=1, keepdims=True)
+    exact = np.argsort(-(unit @ (q / np.linalg.norm(q))))[:5]
+    assert {f"d{i}::chunk::0" for i in exact} == set(res["ids"][0])
+    assert np.allclose(res["embeddings"][0][0], unit[42], atol=0.02)
+
+
+def test_upsert_delete_and_reopen(tmp_path):
+    x = _vectors(10)
+    index = CompactIndex(str(tmp_path))
+    index.upsert([f"d{i}" for i in range(10)], x, [str(i) for i in range(10)], [{"i": i} for i in range(10)])
+    index.delete(["d3", "missing"])
+    index.upsert(["d1", "d10"], x[[5, 3]], ["one", "ten"], [{"i": 1}, {"i": 10}])
+
+    assert index.count() == 10
+    assert index.query(x[3], k=1)["ids"] == [["d10"]]  # row of d3 reused for d10
+    assert index.get(["d1", "d3", "d10"])["documents"] == ["one", "ten"]
+
+    reopened = CompactIndex(str(tmp_path), dtype="int8")
+    assert reopened.dtype == "float16"
+    assert reopened.count() == 10
+    assert set(reopened.query(x[5], k=2)["ids"][0]) == {"d1", "d5"}  # same vector
+    pages = [ids for ids, _ in reopened.iter_documents(batch_size=4)]
+    assert [len(p) for p in pages] == [4, 4, 2]
+    assert "d3" not in {i for p in pages for i in p}
+
+
+def test_time_filter_expiry_and_vacuum(tmp_path):
+    x = _vectors(20)
+    index = CompactIndex(str(tmp_path), dtype="int8")
+    ids = [f"d{i}" for i in range(20)]
+    index.upsert(ids, x, ids, [{"published_ts": 1000 * i} for i in range(20)])
+
+    assert set(index.query(x[2], k=20, since=15000)["ids"][0]) == {f"d{i}" for i in range(15, 20)}
+    old = index.ids_older_than(5000)
+    assert sorted(old) == ["d0", "d1", "d2", "d3", "d4"]
+
+    index.delete(old)
+    index.update_metadata(["d19"], [{"published_ts": 0, "note": "backdated"}])
+    size = index.disk_bytes()
+    index.vacuum()
+    assert index.disk_bytes() < size
+    assert index.count() == 15
+
+    reopened = CompactIndex(str(tmp_path))
+    assert reopened.query(x[7], k=1)["ids"] == [["d7"]]
+    assert reopened.get(["d19"])["metadatas"] == [{"published_ts": 0, "note": "backdated"}]
+    assert "d19" not in reopened.query(x[19], k=3, since=1)["ids"][0]
+    assert reopened.ids_older_than(5000) == ["d19"]
+
+
+class _Crash(Exception):
+    pass
+
+
+class _CrashOnCommit:
+    """Connection stand-in whose commit fails, as if the process died before it."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+    def commit(self):
+        self.conn.rollback()
+        raise _Crash
+
+
+@pytest.mark.parametrize("crash", ["before_commit", "after_commit"])
+def test_interrupted_vacuum_leaves_a_consistent_index(tmp_path, crash):
+    x = _vectors(20)
+    index = CompactIndex(str(tmp_path), dtype="int8")
+    ids = [f"d{i}" for i in range(20)]
+    index.upsert(ids, x, ids, [{"i": i} for i in range(20)])
+    index.delete(ids[:5])
+
+    if crash == "before_commit":
+        index._conn = _CrashOnCommit(index._conn)
+    else:
+        index._remove_stale_files = lambda: (_ for _ in ()).throw(_Crash())
+    with pytest.raises(_Crash):
+        index.vacuum()
+
+    reopened = CompactIndex(str(tmp_path))
+    assert reopened.count() == 15
+    for i in range(5, 20):
+        assert reopened.query(x[i], k=1)["ids"] == [[f"d{i}"]]
+    # Only the files the sidecar names are left
+    matrices = sorted(p.name for p in tmp_path.iterdir() if p.name.startswith(("vectors.", "scales.")))
+    assert matrices == sorted([reopened._matrix_name, reopened._scales_name])
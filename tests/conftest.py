@@ -0,0 +1,56 @@
+"""
+Shared fixtures: an Orchestrator wired to the fake Ollama and fixture source
+servers, with every path and process-wide cache under tmp_path.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from benchmarks.fake_ollama import FakeOllama
+from benchmarks.fixtures import FixtureServer
+from src.connectors import response_cache, web_scraper
+from src.llm import ollama_client
+from src.retrieval import embedding_cache
+from src.utils.config import settings
+
+
+@pytest.fixture
+def fake_ollama():
+    with FakeOllama() as ollama:
+        yield ollama
+
+
+@pytest.fixture
+def orch(tmp_path, monkeypatch, fake_ollama):
+    from src.agents.orchestrator import Orchestrator
+
+    with FixtureServer() as sources:
+        for name, value in {
+            "ollama_host": fake_ollama.url,
+            "ollama_warmup": False,
+            "arxiv_api_url": sources.arxiv_url,
+            "crossref_api_url": sources.crossref_url,
+            "data_dir": str(tmp_path),
+            "cache_dir": str(tmp_path / "cache"),
+            "chroma_dir": str(tmp_path / "chroma"),
+            "compact_dir": str(tmp_path / "compact"),
+            "vector_backend": "compact",
+            "emb_cache_path": str(tmp_path / "embeddings.sqlite3"),
+            "manifest_path": str(tmp_path / "manifest.sqlite3"),
+            "bm25_path": str(tmp_path / "bm25.sqlite3"),
+            "response_cache_path": str(tmp_path / "responses.sqlite3"),
+            "report_cache_path": str(tmp_path / "reports.sqlite3"),
+            "harvest_log_path": str(tmp_path / "harvests.sqlite3"),
+            "scrape_host_interval": 0.0,
+        }.items():
+            monkeypatch.setattr(settings, name, value)
+        monkeypatch.setattr(web_scraper, "CACHE_DIR", Path(tmp_path / "cache"))
+        for module, name in (
+            (ollama_client, "_shared"),
+            (embedding_cache, "_shared"),
+            (response_cache, "_cache"),
+            (web_scraper, "_page_cache"),
+        ):
+            monkeypatch.setattr(module, name, None)
+        yield Orchestrator()
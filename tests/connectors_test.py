@@ -0,0 +1,79 @@
+"""
+Offline tests for paged connectors, against the fixture source server.
+
+Run:
+    pytest -v tests/connectors_test.py
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from benchmarks.fixtures import FixtureServer
+from src.connectors import crossref_conn, response_cache
+
+
+@pytest.fixture
+def sources(tmp_path, monkeypatch):
+    monkeypatch.setattr(response_cache, "_cache", response_cache.ResponseCache(str(tmp_path / "responses.sqlite3")))
+    with FixtureServer(scale=3) as server:
+        monkeypatch.setattr(crossref_conn.settings, "crossref_api_url", server.crossref_url)
+        yield server
+
+
+def test_crossref_cursor_paging_and_projection(sources, monkeypatch):
+    monkeypatch.setattr(crossref_conn.settings, "crossref_page_size", 3)
+    seen = {}
+    get_page = crossref_conn._get_page
+
+    def spy(session, params):
+        message = get_page(session, params)
+        seen[params["cursor"]] = (params["rows"], params["select"], message["items"])
+        return message
+
+    monkeypatch.setattr(crossref_conn, "_get_page", spy)
+    stream = crossref_conn.stream_crossref("graph neural networks", max_results=7, days=3650, refresh=True)
+    first = next(stream)
+    assert first["source"] == "crossref"
+    results = [first, *stream]
+
+    assert len(results) == 7
+    assert len({r["id"] for r in results}) == 7
+    assert [rows for rows, _, _ in seen.values()] == [3, 3, 1]
+    assert all(set(it) <= set(crossref_conn.SELECT_FIELDS) for _, _, items in seen.values() for it in items)
+
+    # A repeat is served from the response cache without paging again
+    seen.clear()
+    assert crossref_conn.search_crossref("graph neural networks", max_results=7, days=3650) == results
+    assert not seen
+
+
+def test_crossref_stops_once_a_page_is_past_the_cutoff(sources, monkeypatch):
+    monkeypatch.setattr(crossref_conn.settings, "crossref_page_size", 2)
+    calls = []
+    get_page = crossref_conn._get_page
+    monkeypatch.setattr(crossref_conn, "_get_page", lambda s, p: calls.append(p["cursor"]) or get_page(s, p))
+
+    # Fixture works are 1, 2, 3, 7, 8... days old: nine works, five pages of two
+    results = crossref_conn.search_crossref("graph neural networks", max_results=50, days=2, refresh=True)
+    assert 1 <= len(results) <= 2
+    assert len(calls) <= 3
+
+
+def test_crossref_cutoff_uses_the_publication_date(sources, monkeypatch):
+    today = datetime.utcnow()
+    recent, old = today - timedelta(days=3), today - timedelta(days=400)
+    page = {"items": [
+        # Deposited long ago, published online this week: in the window
+        {"DOI": "10.1/a", "created": {"date-time": old.isoformat() + "Z"},
+         "published-online": {"date-parts": [[recent.year, recent.month, recent.day]]}},
+        # Deposited this week, printed long ago: out
+        {"DOI": "10.1/b", "created": {"date-time": recent.isoformat() + "Z"},
+         "published-print": {"date-parts": [[old.year, old.month]]}},
+        # No publication date: the server's filter is trusted
+        {"DOI": "10.1/c", "created": {"date-time": old.isoformat() + "Z"}},
+    ]}
+    monkeypatch.setattr(crossref_conn, "_get_page", lambda session, params: page)
+
+    results = crossref_conn.search_crossref("graph neural networks", max_results=3, days=30, refresh=True)
+    assert [r["id"] for r in results] == ["10.1/a", "10.1/c"]
@@ -0,0 +1,73 @@
+"""
+Offline tests for the persistent embedding cache.
+
+Run:
+    pytest -v tests/embedding_cache_test.py
+"""
+
+from src.retrieval.embedding_cache import EmbeddingCache, text_key
+from src.retrieval.embedding_ollama import OllamaEmbedding
+from src.utils.metrics import metrics
+
+
+def _fake_embedding(cache: EmbeddingCache, calls: list) -> OllamaEmbedding:
+    emb = OllamaEmbedding(model="fake-embed", cache=cache)
+    emb._embed = lambda texts: (calls.append(list(texts)) or [[float(len(t))] * 4 for t in texts])
+    return emb
+
+
+def test_repeated_texts_skip_ollama(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "emb.sqlite3"), max_bytes=1024 * 1024)
+    calls = []
+    emb = _fake_embedding(cache, calls)
+
+    first = emb(["graph neural networks", "graph  neural\nnetworks", "transformers"])
+    second = emb(["transformers", "graph neural networks"])
+
+    assert calls == [["graph neural networks", "transformers"]]
+    assert list(first[0]) == list(second[1])
+    assert cache.stats()["hits"] == 2
+    assert text_key("a  b") == text_key(" a b ")
+
+
+def test_cache_persists_and_evicts_lru(tmp_path):
+    path = str(tmp_path / "emb.sqlite3")
+    cache = EmbeddingCache(path, max_bytes=16 * 10)  # room for ten 4-dim vectors
+    calls = []
+    emb = _fake_embedding(cache, calls)
+    for i in range(20):
+        emb([f"text {i}"])
+
+    assert cache.stats()["evictions"] > 0
+    assert cache.stats()["bytes"] <= 16 * 10
+    cache.close()
+
+    reopened = EmbeddingCache(path, max_bytes=16 * 10)
+    assert text_key("text 19") in reopened.get_many("fake-embed", [text_key("text 19")])
+    assert reopened.get_many("fake-embed", [text_key("text 0")]) == {}
+
+
+def test_byte_count_matches_the_stored_vectors(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "emb.sqlite3"), max_bytes=16 * 10)
+    for _ in range(3):  # replacing a vector must not count its bytes again
+        cache.put_many("fake-embed", {text_key(f"text {i}"): [1.0] * 4 for i in range(4)})
+    assert cache.stats()["bytes"] == 16 * 4 and cache.stats()["evictions"] == 0
+
+    cache.put_many("fake-embed", {text_key(f"more {i}"): [1.0] * 4 for i in range(8)})
+
+    stored = cache._conn.execute("SELECT SUM(LENGTH(vec)) FROM embeddings").fetchone()[0]
+    assert cache.stats()["bytes"] == stored <= 16 * 10
+    assert cache.stats()["evictions"] > 0
+
+
+def test_lookups_and_evictions_are_exported_as_counters(tmp_path):
+    before = metrics.snapshot()
+    cache = EmbeddingCache(str(tmp_path / "emb.sqlite3"), max_bytes=16 * 2)
+    cache.put_many("fake-embed", {text_key(f"text {i}"): [1.0] * 4 for i in range(3)})
+    cache.get_many("fake-embed", [text_key("text 2"), text_key("text 0")])
+
+    counters = metrics.since(before)["counters"]
+    assert counters[("pra_embedding_cache_lookups_total", (("result", "hit"),))] == 1
+    assert counters[("pra_embedding_cache_lookups_total", (("result", "miss"),))] == 1
+    assert counters[("pra_embedding_cache_evictions_total", ())] >= 1
+    assert 'pra_embedding_cache_lookups_total{result="hit"}' in metrics.render_prometheus()
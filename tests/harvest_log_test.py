@@ -0,0 +1,57 @@
+"""
+Offline tests for the harvest log's freshness policy.
+
+Run:
+    pytest -v tests/harvest_log_test.py
+"""
+
+import time
+
+from src.agents.harvest_log import HarvestLog
+
+
+def _log(tmp_path) -> HarvestLog:
+    return HarvestLog(str(tmp_path / "harvests.sqlite3"), fresh_s=6 * 3600, min_similarity=0.8)
+
+
+def test_recent_close_query_skips_harvest(tmp_path):
+    log = _log(tmp_path)
+    log.record("Graph neural networks for recommender systems", 365, 20, None, ["a", "b", "a"])
+
+    plan = log.plan("graph neural network recommender system", 365, 20, None)
+    assert plan["action"] == "skip"
+    assert plan["entry"]["doc_ids"] == ["a", "b"]
+
+    # Different topic, feeds or a larger request still harvest
+    assert log.plan("diffusion models for audio", 365, 20, None)["action"] == "full"
+    assert log.plan("graph neural networks for recommender systems", 365, 20, ["http://feed"])["action"] == "full"
+    assert log.plan("graph neural networks for recommender systems", 365, 50, None)["action"] == "full"
+
+
+def test_older_harvest_fetches_only_the_delta(tmp_path):
+    log = _log(tmp_path)
+    three_days_ago = time.time() - 3 * 86400 + 60
+    log.record("large language models in education", 180, 20, None, ["x"], harvested_at=three_days_ago)
+
+    plan = log.plan("large language models in education", 90, 20, None)
+    assert plan["action"] == "delta"
+    assert plan["days"] == 3
+
+    # The old harvest's window does not reach back far enough for a longer request
+    assert log.plan("large language models in education", 365, 20, None)["action"] == "full"
+
+
+def test_entries_older_than_the_max_age_are_pruned(tmp_path):
+    path = str(tmp_path / "harvests.sqlite3")
+    forty_days_ago = time.time() - 40 * 86400
+    log = HarvestLog(path, fresh_s=6 * 3600)  # no max age: keeps everything
+    log.record("protein folding", 3650, 20, None, ["old"], harvested_at=forty_days_ago)
+    log.record("graph neural networks", 365, 20, None, ["new"])
+    assert log.plan("protein folding", 3650, 20, None)["action"] == "delta"
+
+    # Opening with a max age prunes, and so does every record
+    log = HarvestLog(path, fresh_s=6 * 3600, max_age_s=30 * 86400)
+    assert log.plan("protein folding", 3650, 20, None)["action"] == "full"
+    assert log.plan("graph neural networks", 365, 20, None)["action"] == "skip"
+    log.record("protein folding", 3650, 20, None, ["old"], harvested_at=forty_days_ago)
+    assert log.plan("protein folding", 3650, 20, None)["action"] == "full"
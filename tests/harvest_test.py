@@ -0,0 +1,85 @@
+"""
+Offline tests for the concurrent harvest's dedup across sources, with stub
+connectors.
+
+Run:
+    pytest -v tests/harvest_test.py
+"""
+
+import time
+
+from src.agents import researcher
+from src.agents.researcher import ResearcherAgent
+from src.utils.config import settings
+
+SHARED_URL = "http://example.org/paper"
+
+
+def _item(source, doc_id, url=SHARED_URL):
+    return {"id": doc_id, "url": url, "title": f"{source} title", "summary": "x" * 600, "source": source}
+
+
+def _stub_sources(monkeypatch, arxiv_delay):
+    def arxiv(query, **kw):
+        time.sleep(arxiv_delay)
+        yield _item("arxiv", "http://arxiv.org/abs/1")
+
+    def crossref(query, **kw):
+        yield _item("crossref", "10.1/paper")
+        yield _item("crossref", "10.1/other", url="http://example.org/other")
+
+    monkeypatch.setattr(researcher, "stream_arxiv", arxiv)
+    monkeypatch.setattr(researcher, "stream_crossref", crossref)
+    monkeypatch.setattr(settings, "harvest_batch_size", 1)
+
+
+def test_higher_priority_source_wins_even_when_it_answers_last(monkeypatch):
+    _stub_sources(monkeypatch, arxiv_delay=0.2)
+    agent = ResearcherAgent(indexer=None)
+
+    batches = list(agent.harvest_stream("q"))
+    streamed = [it for batch in batches for it in batch]
+    assert [it["source"] for it in streamed] == ["crossref", "crossref", "arxiv"]
+    assert streamed[-1]["replaces"] == "10.1/paper"
+
+    by_url = {it["url"]: it["source"] for it in agent.harvest("q")}
+    assert by_url == {SHARED_URL: "arxiv", "http://example.org/other": "crossref"}
+
+
+def test_lower_priority_duplicate_is_dropped_when_it_answers_last(monkeypatch):
+    _stub_sources(monkeypatch, arxiv_delay=0.0)
+
+    def slow_crossref(query, **kw):
+        time.sleep(0.2)
+        yield _item("crossref", "10.1/paper")
+
+    monkeypatch.setattr(researcher, "stream_crossref", slow_crossref)
+
+    streamed = [it for batch in ResearcherAgent(indexer=None).harvest_stream("q") for it in batch]
+    assert [(it["source"], "replaces" in it) for it in streamed] == [("arxiv", False)]
+
+
+class _Indexer:
+    def __init__(self):
+        self.calls = []
+
+    def add_document(self, doc_id, text, meta):
+        self.calls.append(("add", doc_id))
+        return "new"
+
+    def remove_document(self, doc_id):
+        self.calls.append(("remove", doc_id))
+        return True
+
+    def bump_corpus_version(self):
+        return 1
+
+
+def test_ingest_removes_the_replaced_document(monkeypatch):
+    monkeypatch.setattr(settings, "pdf_ingest", False)
+    indexer = _Indexer()
+    ResearcherAgent(indexer).ingest([
+        _item("crossref", "10.1/paper"),
+        {**_item("arxiv", "http://arxiv.org/abs/1"), "replaces": "10.1/paper"},
+    ])
+    assert indexer.calls == [("add", "10.1/paper"), ("add", "http://arxiv.org/abs/1"), ("remove", "10.1/paper")]
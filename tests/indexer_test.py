@@ -0,0 +1,181 @@
+"""
+Offline tests for the Indexer on the compact backend, with a stub embedder
+in place of Ollama: incremental re-ingest against the manifest, and expiry
+(removal from every index, the archive round-trip, the timestamp migration).
+
+Run:
+    pytest -v tests/indexer_test.py
+"""
+
+import gzip
+import json
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.retrieval import embedding_cache
+from src.retrieval.bm25 import BM25Index
+from src.retrieval.bulk_ingest import bulk_ingest
+from src.retrieval.compact_store import TIME_KEY
+from src.retrieval.indexer import DATES_MIGRATION, Indexer
+from src.retrieval.manifest import IngestManifest
+from src.retrieval.vector_store import VectorStore
+from src.utils.config import settings
+
+RECENT = (datetime.now(timezone.utc) - timedelta(days=10)).isoformat()
+DOCS = {
+    "old-1": ("The perceptron learns linear separators.", "2001-01-01T00:00:00+00:00"),
+    "old-2": ("Backpropagation trains multilayer networks.", "2002-05-01T00:00:00+00:00"),
+    "new": ("Graph transformers attend over node neighbourhoods.", RECENT),
+}
+
+
+class StubEmbedder:
+    """Hashed bag of words: deterministic vectors, no Ollama. Counts embedded texts."""
+
+    model = "stub-embed"
+
+    def __init__(self):
+        self.embedded = 0
+
+    def __call__(self, texts):
+        self.embedded += len(texts)
+        out = np.zeros((len(texts), 32), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in text.lower().split():
+                out[i, zlib.crc32(word.encode()) % 32] += 1.0
+        return out
+
+    def cache_stats(self):
+        return {}
+
+
+@pytest.fixture
+def build(tmp_path, monkeypatch):
+    """Makes Indexers over one compact store, manifest and BM25 index in tmp_path."""
+    for name in ("data_dir", "cache_dir", "chroma_dir", "compact_dir"):
+        monkeypatch.setattr(settings, name, str(tmp_path / name))
+    monkeypatch.setattr(settings, "emb_cache_path", str(tmp_path / "embeddings.sqlite3"))
+    monkeypatch.setattr(embedding_cache, "_shared", None)
+    store = VectorStore("papers", backend="compact")
+    store.embed = StubEmbedder()
+    return lambda: Indexer(store, IngestManifest(str(tmp_path / "manifest.sqlite3")), BM25Index(str(tmp_path / "bm25.sqlite3")))
+
+
+@pytest.fixture
+def indexer(build):
+    first = build()
+    store = first.store
+    for doc_id, (text, published) in DOCS.items():
+        first.add_document(doc_id, text, {"title": doc_id, "url": f"http://example.org/{doc_id}", "published": published})
+    # "old-2" was indexed before chunks carried TIME_KEY
+    chunk = "old-2::chunk::0"
+    meta = store.get([chunk])["metadatas"][0]
+    store.backend.update_metadata([chunk], [{k: v for k, v in meta.items() if k != TIME_KEY}])
+    return build()
+
+
+def test_expire_removes_old_documents_everywhere_and_archives_them(indexer, tmp_path):
+    store, name = indexer.store, indexer.store.name
+    version = indexer.corpus_version()
+    assert not indexer.manifest.has_migration(name, DATES_MIGRATION)
+
+    result = indexer.expire(time.time() - 365 * 86400, archive_dir=str(tmp_path / "archive"))
+
+    assert (result["chunks"], result["documents"]) == (2, 2)
+    assert indexer.manifest.has_migration(name, DATES_MIGRATION)  # stamped "old-2" so it could expire
+    assert store.count() == 1 and store.get(["old-1::chunk::0", "old-2::chunk::0"])["ids"] == []
+    assert indexer.lexical.search(name, "perceptron backpropagation", 5) == []
+    assert [cid for cid, _ in indexer.lexical.search(name, "graph", 5)] == ["new::chunk::0"]
+    assert indexer.manifest.get(name, "old-1") is None and indexer.manifest.get(name, "new") is not None
+    assert indexer.corpus_version() == version + 1
+
+    with gzip.open(result["archive"], "rt", encoding="utf-8") as f:
+        records = {r["id"]: r for r in map(json.loads, f)}
+    assert {k: (r["text"], r["published"]) for k, r in records.items()} == {k: DOCS[k] for k in ("old-1", "old-2")}
+
+    # The archive loads back with `ingest --format jsonl`
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        counts = bulk_ingest(Path(result["archive"]), indexer, pool, fmt="jsonl")
+    assert counts["new"] == 2 and counts["rejected"] == 0
+    assert store.count() == 3
+    restored = store.get(["old-1::chunk::0"])["metadatas"][0]
+    assert restored["url"] == "http://example.org/old-1" and restored["published"] == DOCS["old-1"][1]
+    assert [cid for cid, _ in indexer.lexical.search(name, "perceptron", 5)] == ["old-1::chunk::0"]
+    assert indexer.corpus_version() == version + 2
+
+
+def test_dry_run_changes_nothing(indexer):
+    result = indexer.expire(time.time() - 365 * 86400, dry_run=True)
+    assert (result["chunks"], result["archive"]) == (2, None)
+    assert indexer.store.count() == 3
+    assert indexer.manifest.get(indexer.store.name, "old-1") is not None
+
+
+def _long_text(n_sentences: int, topic: str) -> str:
+    return " ".join(f"Sentence {i} about {topic} and its many experimental results in detail." for i in range(n_sentences))
+
+
+def test_reingest_skips_unchanged_text_and_replaces_changed_chunks(build):
+    indexer = build()
+    store, name = indexer.store, indexer.store.name
+    meta = {"title": "t", "url": "http://example.org/t"}
+
+    assert indexer.add_document("doc", _long_text(120, "graphs"), meta) == "new"
+    chunks = indexer.manifest.get(name, "doc")["chunk_count"]
+    assert chunks >= 3
+    embedded = store.embed.embedded
+
+    assert indexer.add_document("doc", _long_text(120, "graphs"), meta) == "skipped"
+    assert store.embed.embedded == embedded
+
+    # Changed and shorter: the new chunks replace the old ones, none are left behind
+    assert indexer.add_document("doc", _long_text(10, "proteins"), meta) == "updated"
+    assert indexer.manifest.get(name, "doc")["chunk_count"] == 1
+    ids = [f"doc::chunk::{i}" for i in range(chunks)]
+    assert store.get(ids)["ids"] == ["doc::chunk::0"]
+    assert "proteins" in store.get(["doc::chunk::0"])["documents"][0]
+    assert [cid for cid, _ in indexer.lexical.search(name, "graphs", 10)] == []
+    assert store.count() == 1
+
+    assert indexer.remove_document("doc") is True
+    assert store.count() == 0 and indexer.manifest.get(name, "doc") is None
+    assert indexer.remove_document("doc") is False
+
+
+def test_document_missing_from_the_store_is_reindexed(build):
+    indexer = build()
+    text = _long_text(5, "graphs")
+    assert indexer.add_document("doc", text, {"title": "t"}) == "new"
+
+    # The collection was wiped but the manifest survived
+    indexer.store.delete(["doc::chunk::0"])
+    assert indexer.add_document("doc", text, {"title": "t"}) == "new"
+    assert indexer.store.get(["doc::chunk::0"])["ids"] == ["doc::chunk::0"]
+
+    indexer.store.delete(["doc::chunk::0"])
+    prepared = {"doc_id": "doc", "digest": indexer.manifest.get(indexer.store.name, "doc")["content_hash"],
+                "chunks": [text], "meta": {"title": "t"}}
+    assert indexer.add_prepared([prepared]) == {"new": 1, "updated": 0, "skipped": 0}
+    assert indexer.add_prepared([prepared]) == {"new": 0, "updated": 0, "skipped": 1}
+
+
+def test_archive_writes_overlapping_sentences_once(build, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "chunk_tokens", 60)
+    monkeypatch.setattr(settings, "chunk_overlap_tokens", 20)
+    indexer = build()
+    text = _long_text(20, "graphs")
+    indexer.add_document("doc", text, {"title": "t", "published": "2001-01-01T00:00:00+00:00"})
+    chunks = indexer.store.get([f"doc::chunk::{i}" for i in range(50)])["documents"]
+    assert len(chunks) > 2 and chunks[1].startswith("Sentence 2 ")  # repeats the last sentence of chunks[0]
+
+    result = indexer.expire(time.time() - 365 * 86400, archive_dir=str(tmp_path / "archive"))
+
+    with gzip.open(result["archive"], "rt", encoding="utf-8") as f:
+        archived = json.loads(f.readline())["text"]
+    assert " ".join(archived.split()) == text
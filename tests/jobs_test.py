@@ -0,0 +1,54 @@
+"""
+Offline tests for the API job manager.
+
+Run:
+    pytest -v tests/jobs_test.py
+"""
+
+import asyncio
+import threading
+
+from src.api.jobs import JobManager
+
+
+def _manager(release: threading.Event) -> JobManager:
+    return JobManager(lambda params, on_stage: release.wait(5) and "report", workers=1, max_queue=0, ttl=60)
+
+
+def test_cancelled_waiter_does_not_cancel_a_coalesced_job():
+    release = threading.Event()
+    jobs = _manager(release)
+
+    async def scenario():
+        first, coalesced_first = jobs.submit({"query": "graph neural networks"})
+        second, coalesced_second = jobs.submit({"query": "Graph  Neural Networks"})
+        assert first is second and not coalesced_first and coalesced_second
+
+        # Each waiter awaits the shared future the way /report does
+        gone = asyncio.ensure_future(asyncio.shield(asyncio.wrap_future(first.future)))
+        waiting = asyncio.ensure_future(asyncio.shield(asyncio.wrap_future(second.future)))
+        await asyncio.sleep(0.01)
+        gone.cancel()  # the first client disconnects
+        release.set()
+        return await waiting, first
+
+    try:
+        report, job = asyncio.run(scenario())
+        assert report == "report"
+        assert job.status == "done" and job.result == "report" and job.error is None
+    finally:
+        jobs.shutdown()
+
+
+def test_cancelled_future_still_records_the_result():
+    release = threading.Event()
+    jobs = _manager(release)
+    try:
+        job, _ = jobs.submit({"query": "graph neural networks"})
+        job.future.cancel()
+        release.set()
+        jobs._pool.shutdown(wait=True)
+        assert job.status == "done" and job.result == "report" and job.error is None
+        assert jobs.get(job.id) is job
+    finally:
+        jobs.shutdown()
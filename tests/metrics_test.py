@@ -0,0 +1,56 @@
+"""
+Offline tests for the span/counter metrics and their Prometheus rendering.
+
+Run:
+    pytest -v tests/metrics_test.py
+"""
+
+import pytest
+from src.utils.metrics import Metrics
+
+
+def test_span_records_latency_even_on_error():
+    m = Metrics()
+    with m.span("harvest"):
+        pass
+    with pytest.raises(ValueError):
+        with m.span("harvest"):
+            raise ValueError("boom")
+
+    stages = m.snapshot()["stages"]
+    assert stages["harvest"]["count"] == 2
+    assert stages["harvest"]["sum"] >= 0
+
+
+def test_since_reports_only_new_activity():
+    m = Metrics()
+    m.observe("embed", 0.5)
+    m.inc("pra_http_requests_total", target="ollama_embed", status=200)
+    before = m.snapshot()
+
+    m.observe("embed", 0.25)
+    m.inc("pra_http_requests_total", target="ollama_embed", status=200)
+    m.inc("pra_scraped_bytes_total", 1000)
+    delta = m.since(before)
+
+    assert delta["stages"]["embed"]["count"] == 1
+    assert delta["stages"]["embed"]["sum"] == pytest.approx(0.25)
+    assert delta["counters"][("pra_http_requests_total", (("status", "200"), ("target", "ollama_embed")))] == 1
+    assert delta["counters"][("pra_scraped_bytes_total", ())] == 1000
+
+
+def test_prometheus_text_format():
+    m = Metrics()
+    m.observe("llm.generate", 0.3)
+    m.observe("llm.generate", 12.0)
+    m.inc("pra_scraped_bytes_total", 2_500_000)
+    m.inc("pra_http_requests_total", target="crossref", status=200)
+    text = m.render_prometheus()
+
+    assert "# TYPE pra_stage_seconds histogram" in text
+    assert 'pra_stage_seconds_bucket{stage="llm.generate",le="0.5"} 1' in text
+    assert 'pra_stage_seconds_bucket{stage="llm.generate",le="30.0"} 2' in text
+    assert 'pra_stage_seconds_bucket{stage="llm.generate",le="+Inf"} 2' in text
+    assert 'pra_stage_seconds_count{stage="llm.generate"} 2' in text
+    assert "pra_scraped_bytes_total 2500000" in text
+    assert 'pra_http_requests_total{status="200",target="crossref"} 1' in text
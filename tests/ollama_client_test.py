@@ -0,0 +1,77 @@
+"""
+Offline tests for the shared Ollama client, against the fake Ollama server.
+
+Run:
+    pytest -v tests/ollama_client_test.py
+"""
+
+import threading
+import time
+
+from benchmarks.fake_ollama import FakeOllama
+from src.llm.ollama_client import OllamaClient, _Slots
+from src.llm.ollama_llm import OllamaLLM
+from src.retrieval.embedding_cache import EmbeddingCache
+from src.retrieval.embedding_ollama import OllamaEmbedding
+
+
+def test_retries_5xx_and_sends_keep_alive(tmp_path):
+    with FakeOllama(fail_first=2) as fake:
+        client = OllamaClient(base=fake.url, retries=3, backoff=0.01, keep_alive="-1")
+        llm = OllamaLLM("fake-gen", client=client)
+        emb = OllamaEmbedding("fake-embed", cache=EmbeddingCache(str(tmp_path / "emb.sqlite3"), 1 << 20), client=client)
+
+        assert "Summary" in llm.generate("User Query:\n\"q\"\nTITLE: t\nURL: u\n")
+        assert len(emb(["a", "b"])) == 2
+        assert fake.requests["/api/generate"] == 3
+        assert fake.bodies["/api/generate"]["keep_alive"] == -1
+        assert fake.bodies["/api/embed"]["keep_alive"] == -1
+
+        client.warm_up("fake-gen", "fake-embed", wait=True)
+        client.warm_up("fake-gen", "fake-embed", wait=True)
+        assert fake.requests["/api/generate"] == 4
+        assert fake.bodies["/api/generate"]["prompt"] == ""
+
+
+def test_queued_generation_goes_before_new_embeds():
+    slots = _Slots({"embed": 1, "generate": 1}, priority="generate")
+    order = []
+
+    def worker(kind, name):
+        with slots.hold(kind):
+            order.append(name)
+            time.sleep(0.05)
+
+    with slots.hold("generate"):
+        gen = threading.Thread(target=worker, args=("generate", "generate"))
+        gen.start()
+        while not slots.waiting["generate"]:
+            time.sleep(0.001)
+        embed = threading.Thread(target=worker, args=("embed", "embed"))
+        embed.start()
+        time.sleep(0.05)
+        # The embed slot is free, but a generation request is queued
+        assert order == []
+    gen.join()
+    embed.join()
+    assert order == ["generate", "embed"]
+
+
+def test_retry_backoff_releases_the_slot(monkeypatch):
+    with FakeOllama(fail_first=1) as fake:
+        client = OllamaClient(base=fake.url, generate_concurrency=1, retries=1, backoff=0.01)
+        held = []
+        sleep, caller = time.sleep, threading.current_thread()
+
+        def backoff(seconds):
+            if threading.current_thread() is caller:
+                held.append(client.slots.active["generate"])
+            sleep(seconds)
+
+        monkeypatch.setattr("src.llm.ollama_client.time.sleep", backoff)
+        with client.request("generate", "/api/generate", {"model": "fake-gen", "prompt": "hi", "stream": False},
+                            target="ollama_generate") as resp:
+            assert resp.status_code == 200
+            assert client.slots.active["generate"] == 1
+        assert held == [0]
+        assert client.slots.active["generate"] == 0
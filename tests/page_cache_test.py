@@ -0,0 +1,37 @@
+"""
+Offline tests for the scraped-page cache.
+
+Run:
+    pytest -v tests/page_cache_test.py
+"""
+
+from src.connectors.page_cache import PageCache
+
+
+def test_text_hit_and_invalidation(tmp_path):
+    cache = PageCache(str(tmp_path), max_bytes=1024 * 1024, ttl=3600)
+    url = "https://example.org/" + "x" * 300  # longer than the old filename cut-off
+
+    assert cache.lookup(url) is None
+    cache.put_raw(url, b"<html><p>hello</p></html>", etag='"v1"')
+    entry = cache.lookup(url)
+    assert entry["fresh"] and not entry["has_text"] and entry["etag"] == '"v1"'
+
+    cache.put_text(url, "hello")
+    assert cache.lookup(url)["has_text"]
+    assert cache.read_text(url) == "hello"
+    assert cache.read_raw(url) == b"<html><p>hello</p></html>"
+
+    # A new download replaces the raw page and drops the stale extraction
+    cache.put_raw(url, b"<html><p>changed</p></html>")
+    assert not cache.lookup(url)["has_text"]
+
+
+def test_ttl_and_lru_eviction(tmp_path):
+    cache = PageCache(str(tmp_path), max_bytes=2000, ttl=0)
+    for i in range(40):
+        cache.put_raw(f"https://example.org/{i}", bytes(range(256)) * 2)
+
+    assert cache.stats()["bytes"] <= 2000
+    assert cache.lookup("https://example.org/0") is None
+    assert cache.lookup("https://example.org/39")["fresh"] is False
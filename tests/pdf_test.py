@@ -0,0 +1,69 @@
+"""
+Offline tests for PDF download and page-by-page extraction.
+
+Run:
+    pytest -v tests/pdf_test.py
+"""
+
+import pytest
+
+from benchmarks.fixtures import FixtureServer, minimal_pdf
+from src.connectors.pdf_fetcher import download_pdf, extract_pdf_pages
+
+
+def test_extraction_keeps_page_numbers_and_stops_at_the_page_limit(tmp_path):
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(minimal_pdf(["First page about graphs.", "", "Third page (results).", "Fourth page."]))
+
+    pages = extract_pdf_pages(str(path), max_pages=3, time_limit=30)
+    assert [n for n, _ in pages] == [1, 3]  # the blank page yields nothing
+    assert "Third page (results)." in pages[1][1]
+
+    assert extract_pdf_pages(str(path), max_pages=10, time_limit=0) == []
+
+
+def test_download_streams_to_cache_and_rejects_non_pdfs(tmp_path, monkeypatch):
+    from src.connectors import pdf_fetcher
+
+    monkeypatch.setattr(pdf_fetcher.settings, "cache_dir", str(tmp_path))
+    with FixtureServer() as server:
+        url = f"{server.url}/pdf/0000.00000"
+        path = download_pdf(url)
+        assert path.read_bytes() == server.fixtures["pdfs"]["/pdf/0000.00000"]
+        assert download_pdf(url) == path
+        assert server.requests["pdf"] == 1
+
+        with pytest.raises(ValueError):
+            download_pdf(f"{server.url}/pdf/0000.00001", max_bytes=100)
+        with pytest.raises(ValueError):
+            download_pdf(f"{server.url}/abs/0000.00000")
+    assert sorted(p.name for p in (tmp_path / "pdfs").iterdir()) == [path.name]
+
+
+def _stuck_extraction(path, max_pages, time_limit):
+    """Stands in for pypdf looping on a malformed page: never checks its time limit."""
+    import time
+
+    while True:
+        time.sleep(1)
+
+
+def test_stuck_extraction_is_killed_at_the_deadline(tmp_path, monkeypatch):
+    import time
+
+    from src.connectors import pdf_fetcher
+
+    monkeypatch.setattr(pdf_fetcher.settings, "cache_dir", str(tmp_path))
+    monkeypatch.setattr(pdf_fetcher.settings, "pdf_workers", 1)
+    monkeypatch.setattr(pdf_fetcher.settings, "pdf_time_limit", 0.5)
+    monkeypatch.setattr(pdf_fetcher.settings, "scrape_host_interval", 0.0)
+    monkeypatch.setattr(pdf_fetcher, "extract_pdf_pages", _stuck_extraction)
+    monkeypatch.setattr(pdf_fetcher, "_pdf_pool", None)
+    workers = list(pdf_fetcher._get_pdf_pool()._processes.values())
+
+    with FixtureServer() as server:
+        start = time.monotonic()
+        assert pdf_fetcher.fetch_pdfs([f"{server.url}/pdf/0000.00000"], deadline=1) == {}
+    assert time.monotonic() - start < 10
+    assert workers and not any(proc.is_alive() for proc in workers)
+    assert pdf_fetcher._pdf_pool is None
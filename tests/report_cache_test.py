@@ -0,0 +1,33 @@
+"""
+Offline tests for the report cache and its stale-while-revalidate window.
+
+Run:
+    pytest -v tests/report_cache_test.py
+"""
+
+from src.agents import report_cache
+from src.agents.report_cache import ReportCache
+
+PARAMS = {"query": "graph neural networks", "max_results": 5, "days": 30, "top_k": 5}
+
+
+def test_new_corpus_version_is_a_miss_without_swr(tmp_path):
+    cache = ReportCache(str(tmp_path / "reports.sqlite3"), ttl=3600, swr=0)
+    cache.put(PARAMS, corpus_version=1, report="old report")
+
+    assert cache.get({**PARAMS, "query": "Graph  Neural Networks"}, corpus_version=1)["fresh"] is True
+    assert cache.get(PARAMS, corpus_version=2) is None
+    assert cache.stats() == {"hits": 1, "stale_hits": 0, "misses": 1}
+
+
+def test_new_corpus_version_is_stale_with_swr(tmp_path, monkeypatch):
+    cache = ReportCache(str(tmp_path / "reports.sqlite3"), ttl=60, swr=600)
+    cache.put(PARAMS, corpus_version=1, report="old report")
+
+    stale = cache.get(PARAMS, corpus_version=2)
+    assert stale["report"] == "old report" and stale["fresh"] is False
+
+    # Past ttl + swr the entry is gone whatever the version
+    now = report_cache.time.time()
+    monkeypatch.setattr(report_cache.time, "time", lambda: now + 700)
+    assert cache.get(PARAMS, corpus_version=1) is None
@@ -0,0 +1,81 @@
+"""
+Offline tests for the connector response cache.
+
+Run:
+    pytest -v tests/response_cache_test.py
+"""
+
+import pytest
+
+from src.connectors import response_cache
+from src.connectors.response_cache import ResponseCache, cached_stream
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"))
+    monkeypatch.setattr(response_cache, "_cache", cache)
+    return cache
+
+
+class Upstream:
+    """Stands in for a connector: counts calls, fails while `down` is set."""
+
+    def __init__(self, results):
+        self.results = results
+        self.calls = 0
+        self.down = False
+
+    def __call__(self):
+        self.calls += 1
+        if self.down:
+            raise ConnectionError("upstream down")
+        yield from self.results
+
+
+def _search(upstream, ttl=60, refresh=False, query="Graph  Neural Networks"):
+    return list(cached_stream("arxiv", query, 30, 10, ttl=ttl, fetch=upstream, refresh=refresh))
+
+
+def test_fresh_entry_is_served_without_a_request(cache):
+    upstream = Upstream([{"id": "a"}, {"id": "b"}])
+    assert _search(upstream) == [{"id": "a"}, {"id": "b"}]
+    # Same normalized query: answered from the cache
+    assert _search(upstream, query="graph neural networks") == [{"id": "a"}, {"id": "b"}]
+    assert upstream.calls == 1
+    assert cache.stats["arxiv"]["hit"] == 1 and cache.stats["arxiv"]["miss"] == 1
+
+    # Past the TTL the source is asked again
+    assert _search(upstream, ttl=0) == [{"id": "a"}, {"id": "b"}]
+    assert upstream.calls == 2
+
+
+def test_expired_entry_is_served_when_the_upstream_fails(cache):
+    upstream = Upstream([{"id": "a"}])
+    _search(upstream)
+    upstream.down = True
+
+    assert _search(upstream, ttl=0) == [{"id": "a"}]
+    assert cache.stats["arxiv"]["stale"] == 1
+    with pytest.raises(ConnectionError):
+        _search(upstream, query="never cached")
+
+
+def test_refresh_bypasses_a_fresh_entry_and_updates_it(cache):
+    upstream = Upstream([{"id": "a"}])
+    _search(upstream)
+    upstream.results = [{"id": "c"}]
+
+    assert _search(upstream, refresh=True) == [{"id": "c"}]
+    assert upstream.calls == 2 and cache.stats["arxiv"]["refresh"] == 1
+    assert _search(upstream) == [{"id": "c"}]
+    assert upstream.calls == 2
+
+
+def test_failure_part_way_keeps_what_was_yielded_and_caches_nothing(cache):
+    def flaky():
+        yield {"id": "a"}
+        raise ConnectionError("reset")
+
+    assert _search(flaky) == [{"id": "a"}]
+    assert _search(Upstream([{"id": "b"}])) == [{"id": "b"}]
@@ -0,0 +1,68 @@
+"""
+Offline tests for lexical retrieval and rank fusion.
+
+Run:
+    pytest -v tests/retrieval_test.py
+"""
+
+from src.retrieval.bm25 import BM25Index, tokenize
+from src.retrieval.indexer import published_epoch, reciprocal_rank_fusion
+
+
+def test_bm25_exact_terms_and_incremental_updates(tmp_path):
+    index = BM25Index(str(tmp_path / "bm25.sqlite3"))
+    index.upsert("papers", ["a::chunk::0", "b::chunk::0", "c::chunk::0"], [
+        "We fine-tune GPT-4 on the MMLU benchmark.",
+        "Graph neural networks for recommender systems.",
+        "Recommender systems with matrix factorization.",
+    ])
+
+    assert "gpt-4" in tokenize("Fine-tuning GPT-4")
+    assert index.search("papers", "GPT-4 MMLU", 3)[0][0] == "a::chunk::0"
+    assert [cid for cid, _ in index.search("papers", "graph recommender", 3)][0] == "b::chunk::0"
+
+    index.upsert("papers", ["b::chunk::0"], ["Transformers for vision."])
+    index.delete("papers", ["c::chunk::0"])
+    assert index.count("papers") == 2
+    assert index.search("papers", "recommender", 3) == []
+    assert index.search("other", "transformers", 3) == []
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["x", "y", "z"], ["y", "w"]])
+    assert fused[0] == "y"
+    assert set(fused) == {"x", "y", "z", "w"}
+
+
+def test_published_epoch_parses_connector_dates():
+    assert published_epoch("2024-01-02T00:00:00+00:00") == 1704153600
+    assert published_epoch("2024-01-02T00:00:00Z") == 1704153600
+    assert published_epoch("2024-01-02T00:00:00") == 1704153600  # naive times are UTC
+    assert published_epoch("2024-01-02 weird suffix") == 1704153600
+    assert published_epoch(None) is None
+    assert published_epoch("n.d.") is None
+
+
+def test_mmr_prefers_diverse_chunks_and_caps_per_document():
+    import numpy as np
+    from src.retrieval.diversify import mmr_select
+
+    embeddings = np.array([[1.0, 0.0], [0.99, 0.1], [0.0, 1.0], [0.98, 0.05]])
+    relevance = np.array([1.0, 0.9, 0.8, 0.7])
+
+    assert mmr_select(embeddings, relevance, 2, lambda_=0.5) == [0, 2]
+    assert mmr_select(embeddings, relevance, 3, lambda_=1.0) == [0, 1, 2]
+    assert mmr_select(None, relevance, 3, groups=["a", "a", "b", "a"], max_per_group=1) == [0, 2]
+
+
+def test_vector_backend_missing_a_method_fails_on_construction():
+    import pytest
+    from src.retrieval.vector_store import BACKENDS, VectorBackend
+
+    class Partial(VectorBackend):
+        def upsert(self, ids, embeddings, texts, metadatas):
+            pass
+
+    with pytest.raises(TypeError, match="abstract"):
+        Partial()
+    assert all(not backend.__abstractmethods__ for backend in BACKENDS.values())
@@ -0,0 +1,54 @@
+"""
+Offline tests for concurrent scraping limits, against the fixture source
+server reached under two hostnames (a fast and a slow "host").
+
+Run:
+    pytest -v tests/scraper_test.py
+"""
+
+import time
+from pathlib import Path
+
+import pytest
+
+from benchmarks.fixtures import FixtureServer
+from src.connectors import web_scraper
+from src.utils.config import settings
+
+
+@pytest.fixture
+def scraper(tmp_path, monkeypatch):
+    monkeypatch.setattr(web_scraper, "CACHE_DIR", Path(tmp_path))
+    monkeypatch.setattr(web_scraper, "_page_cache", None)
+    monkeypatch.setattr(settings, "scrape_workers", 8)
+    monkeypatch.setattr(settings, "scrape_host_interval", 0.0)
+    # Start the extraction workers outside the timed part
+    web_scraper._get_extract_pool()
+    return web_scraper
+
+
+def _page_urls(server: FixtureServer, host: str):
+    port = server.url.rsplit(":", 1)[1]
+    return [f"http://{host}:{port}{path}" for path in server.fixtures["pages"]]
+
+
+def test_deadline_drops_slow_hosts(scraper, monkeypatch):
+    monkeypatch.setattr(settings, "scrape_host_concurrency", 4)
+    with FixtureServer(page_delay={"localhost": 5.0}) as server:
+        fast, slow = _page_urls(server, "127.0.0.1")[:3], _page_urls(server, "localhost")[3:5]
+        start = time.monotonic()
+        results = scraper.scrape_many(fast + slow, deadline=2.0)
+        elapsed = time.monotonic() - start
+
+    assert set(results) == set(fast)
+    assert elapsed < 4.0
+
+
+def test_per_host_concurrency_stays_within_the_limit(scraper, monkeypatch):
+    monkeypatch.setattr(settings, "scrape_host_concurrency", 2)
+    with FixtureServer(page_delay={"127.0.0.1": 0.2, "localhost": 0.2}) as server:
+        urls = _page_urls(server, "127.0.0.1") + _page_urls(server, "localhost")
+        results = scraper.scrape_many(urls, deadline=30)
+
+    assert len(results) == len(urls)
+    assert server.max_in_flight == {"127.0.0.1": 2, "localhost": 2}
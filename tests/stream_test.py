@@ -0,0 +1,107 @@
+"""
+Offline tests for token streaming (OllamaLLM.generate_stream,
+Orchestrator.run_stream and POST /report/stream) against the fake Ollama
+and fixture source servers, and for the job limit the stream shares with
+the other report endpoints.
+
+Run:
+    pytest -v tests/stream_test.py
+"""
+
+import json
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from benchmarks.fake_ollama import fake_report
+from src.api import server
+from src.api.jobs import JobManager
+from src.llm.ollama_client import OllamaClient
+from src.llm.ollama_llm import OllamaLLM
+from src.utils.config import settings
+
+QUERY = "graph neural networks"
+BODY = {"query": QUERY, "max_results": 5, "days": 3650, "top_k": 3, "use_cache": False}
+
+
+def _events(text: str):
+    """Parses an SSE body into (event, data) pairs; unnamed events are "message"."""
+    out = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n"))
+        out.append((fields.get("event", "message"), json.loads(fields["data"])))
+    return out
+
+
+def test_generate_stream_yields_tokens_as_they_are_produced(fake_ollama):
+    fake_ollama.tokens_per_s = 50
+    llm = OllamaLLM(client=OllamaClient(base=fake_ollama.url, retries=0))
+
+    prompt = "".join(f"TITLE: Paper {i}\nURL: http://example.org/{i}\n\n" for i in range(5)) + "Bullet points:"
+    arrivals, tokens, stats = [], [], {}
+    start = time.perf_counter()
+    for token in llm.generate_stream(prompt, stats=stats):
+        arrivals.append(time.perf_counter() - start)
+        tokens.append(token)
+
+    assert "".join(tokens) == fake_report(prompt)
+    assert len(tokens) > 10
+    # Paced at 50 tok/s: the first token lands long before the last
+    assert arrivals[0] < arrivals[-1] / 2
+    assert stats["tokens"] == len(tokens) and stats["ttft_s"] <= stats["total_s"]
+
+
+def test_run_stream_and_endpoint_end_with_the_complete_report(orch, monkeypatch):
+    tokens = list(orch.run_stream(QUERY, max_results=5, days=3650, top_k=3, use_cache=False))
+    assert len(tokens) > 1 and "## Summary" in "".join(tokens)
+
+    monkeypatch.setattr(server, "_orch", orch)
+    with TestClient(server.app).stream("POST", "/report/stream", json=BODY) as resp:
+        assert resp.status_code == 200
+        events = _events("".join(resp.iter_text()))
+
+    (*streamed, (last, done)) = events
+    assert last == "done" and len(streamed) > 1
+    assert all(event == "message" for event, _ in streamed)
+    assert done["query"] == QUERY
+    assert done["report"] == "".join(data["token"] for _, data in streamed)
+    assert "## Summary" in done["report"]
+    assert done["tokens"] > 0 and "ttft_s" in done
+
+
+def test_upstream_failure_ends_the_stream_with_an_error_event(orch, fake_ollama, monkeypatch):
+    monkeypatch.setattr(settings, "ollama_retries", 0)
+    fake_ollama.drop_stream_after = 3
+    monkeypatch.setattr(server, "_orch", orch)
+
+    start = time.perf_counter()
+    with TestClient(server.app).stream("POST", "/report/stream", json=BODY) as resp:
+        events = _events("".join(resp.iter_text()))
+
+    assert time.perf_counter() - start < 30
+    (*streamed, (last, error)) = events
+    assert [event for event, _ in streamed] == ["message"] * 3
+    assert last == "error" and error["detail"]
+
+
+def test_stream_shares_the_job_limit_and_jobs_show_in_metrics(orch, monkeypatch):
+    monkeypatch.setattr(server, "_orch", orch)
+    jobs = JobManager(server.jobs.run_fn, workers=1, max_queue=0, ttl=60)
+    monkeypatch.setattr(server, "jobs", jobs)
+    release = threading.Event()
+    jobs.submit({"query": "busy"}, run_fn=lambda params, on_stage: release.wait(5))
+
+    # The lifespan shuts the manager down on exit
+    with TestClient(server.app) as client:
+        try:
+            assert client.post("/report/stream", json=BODY).status_code == 429
+            assert "pra_jobs_in_flight 1" in client.get("/metrics").text.splitlines()
+        finally:
+            release.set()
+        time.sleep(0.05)
+        assert "pra_jobs_in_flight 0" in client.get("/metrics").text.splitlines()
+        with client.stream("POST", "/report/stream", json=BODY) as resp:
+            assert _events("".join(resp.iter_text()))[-1][0] == "done"
+
+    assert jobs._pool._shutdown
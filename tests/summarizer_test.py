@@ -0,0 +1,126 @@
+"""
+Offline tests for the summarizer's passage packing and map-reduce, with a
+stub LLM in place of Ollama.
+
+Run:
+    pytest -v tests/summarizer_test.py
+"""
+
+import threading
+
+from src.agents.summarizer import SummarizerAgent
+from src.utils.config import settings
+from src.utils.text import estimate_tokens
+
+
+class StubLLM:
+    """
+    Answers map prompts with a numbered partial summary; `barrier` makes map
+    calls wait for each other, and map prompts containing `fail_on` raise.
+    """
+
+    model = "stub"
+    num_ctx = 4096
+
+    def __init__(self, barrier: threading.Barrier | None = None, fail_on: str | None = None):
+        self.barrier = barrier
+        self.fail_on = fail_on
+        self.prompts = []
+        self._lock = threading.Lock()
+
+    def generate(self, prompt: str, temperature: float = 0.2, stats=None) -> str:
+        with self._lock:
+            self.prompts.append(prompt)
+            n = len(self.prompts)
+        if prompt.lstrip().startswith("You are a research assistant. Extract"):
+            if self.barrier is not None:
+                self.barrier.wait()
+            if self.fail_on and self.fail_on in prompt:
+                raise RuntimeError("map call failed")
+            return f"partial-{n}"
+        return "final report"
+
+
+def _agent(budget: int, llm: StubLLM | None = None) -> SummarizerAgent:
+    agent = SummarizerAgent()
+    agent.llm = llm or StubLLM()
+    agent.passage_budget = budget
+    return agent
+
+
+def _retrieved(n: int, words: int = 120):
+    docs = [f"passage {i} " + "word " * words for i in range(n)]
+    metas = [{"title": f"Paper {i}", "url": f"http://example.org/{i}"} for i in range(n)]
+    return {"documents": [docs], "metadatas": [metas]}
+
+
+def _block(tokens: int, tag: str) -> str:
+    return tag + " " + "x" * (tokens * 4 - len(tag) - 1)
+
+
+def test_pack_respects_the_budget_and_keeps_every_block():
+    agent = _agent(budget=100)
+    blocks = [_block(n, f"b{i}") for i, n in enumerate([30, 40, 20, 60, 10, 90, 5, 5])]
+
+    groups = agent._pack(blocks)
+
+    assert [b for g in groups for b in g] == blocks
+    for group in groups:
+        assert sum(estimate_tokens(b) + 1 for b in group) <= agent.passage_budget
+    assert len(groups) > 1
+
+
+def test_oversize_block_gets_a_group_of_its_own():
+    agent = _agent(budget=100)
+    small, huge, tail = _block(10, "small"), _block(500, "huge"), _block(10, "tail")
+
+    assert agent._pack([small, huge, tail]) == [[small], [huge], [tail]]
+    assert agent._pack([huge]) == [[huge]]
+    assert agent._pack([]) == []
+
+
+def test_map_runs_groups_in_parallel_and_reduce_sees_every_partial(monkeypatch):
+    monkeypatch.setattr(settings, "summarize_concurrency", 3)
+    # Each map call waits until all three are in flight; a serial map would time out
+    llm = StubLLM(barrier=threading.Barrier(3, timeout=5))
+    agent = _agent(budget=200, llm=llm)
+
+    stats = {}
+    report = agent.summarize("graph neural networks", _retrieved(3), stats=stats)
+
+    assert report == "final report"
+    assert stats["groups"] == 3
+    map_prompts, reduce_prompt = llm.prompts[:3], llm.prompts[3]
+    assert all(f"Paper {i}" in "".join(map_prompts) for i in range(3))
+    for n in (1, 2, 3):
+        assert f"partial-{n}" in reduce_prompt
+    assert reduce_prompt.count("PARTIAL SUMMARY") == 3
+
+
+def test_single_pass_when_only_a_small_share_of_passages_does_not_fit(monkeypatch):
+    monkeypatch.setattr(settings, "summarize_max_drop", 0.25)
+    llm = StubLLM()
+    agent = _agent(budget=10_000, llm=llm)
+    retrieved = _retrieved(10)
+    blocks = agent._passages(retrieved)
+    # Room for 8 of the 10 passages, like the default context window and top_k
+    agent.passage_budget = sum(estimate_tokens(b) + 1 for b in blocks[:8])
+
+    stats = {}
+    agent.summarize("graph neural networks", retrieved, stats=stats)
+
+    assert stats["groups"] == 1 and len(llm.prompts) == 1
+    assert "Paper 7" in llm.prompts[0] and "Paper 8" not in llm.prompts[0]
+
+
+def test_partials_keep_their_group_number_when_a_map_call_fails(monkeypatch):
+    monkeypatch.setattr(settings, "summarize_concurrency", 1)
+    llm = StubLLM(fail_on="Paper 1")
+    agent = _agent(budget=200, llm=llm)
+
+    agent.summarize("graph neural networks", _retrieved(3))
+
+    reduce_prompt = llm.prompts[-1]
+    assert "PARTIAL SUMMARY 1 (passage group 1)" in reduce_prompt
+    assert "PARTIAL SUMMARY 2 (passage group 3)" in reduce_prompt
+    assert "passage group 2" not in reduce_prompt
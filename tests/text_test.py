@@ -0,0 +1,41 @@
+"""
+Offline tests for the sentence-aware chunker.
+
+Run:
+    pytest -v tests/text_test.py
+"""
+
+from src.utils.text import chunk_document, estimate_tokens, iter_sentences, token_budget
+
+
+def test_sentences_respect_abbreviations_and_paragraphs():
+    text = "GNNs are popular, cf. Kipf et al. (2017). See Fig. 2.\n\nA new paragraph starts."
+    assert list(iter_sentences(text)) == [
+        (0, "GNNs are popular, cf. Kipf et al. (2017)."),
+        (0, "See Fig. 2."),
+        (1, "A new paragraph starts."),
+    ]
+
+
+def test_chunks_keep_whole_sentences_within_budget():
+    sentences = [f"Sentence number {i} talks about graph neural networks." for i in range(200)]
+    chunks = chunk_document(" ".join(sentences), max_tokens=60)
+
+    assert all(estimate_tokens(c) <= 60 for c in chunks)
+    assert all(c.endswith(".") for c in chunks)
+    assert " ".join(chunks) == " ".join(sentences)  # no overlap, nothing lost
+
+
+def test_overlap_and_long_sentences():
+    sentences = [f"Short sentence {i}." for i in range(30)]
+    chunks = chunk_document(" ".join(sentences), max_tokens=20, overlap_tokens=6)
+    assert chunks[1].startswith(chunks[0].split(". ")[-1].rstrip(".") + ".")
+
+    long_chunks = chunk_document("word " * 1000, max_tokens=50)
+    assert len(long_chunks) > 1 and all(len(c) <= 200 for c in long_chunks)
+
+
+def test_budget_capped_by_model_context():
+    assert token_budget("all-minilm:latest", 300) == 256
+    assert token_budget("nomic-embed-text", 300) == 300
+    assert token_budget("unknown-model", 300) == 300